@@ -1,16 +1,206 @@
+import discord
+import os
+import sys
 import utils.application
 
 from client.discord_client import DiscordClient
 from gateways.bno_news_gateway import BnoNewsGateway
+from gateways.recording_gateway import RecordingGateway, ReplayGateway
+from services.alert_service import AlertService
+from services.api_service import ApiService
+from services.chart_service import ChartService
 from services.data_parser_service import DataParserService
+from services.debounce_service import DebounceService
+from services.delivery_service import DeliveryService
+from services.feed_service import FeedService
+from services.history_service import HistoryService
+from services.leaderboard_service import LeaderboardService
+from services.memory_watchdog_service import MemoryWatchdogService
+from services.metrics_service import MetricsService
+from services.outbox_service import OutboxService
+from services.parse_cache_service import ParseCacheService
+from services.profiling_service import ProfilingService
+from services.query_service import QueryService
+from services.region_service import RegionService
+from services.sanity_service import SanityService
+from services.scheduler_service import AdaptiveScheduler, ExponentialBackoff, FixedScheduler
+from services.send_cache_service import SendCacheService
+from services.shared_fetch_service import SharedFetchService
 from services.updater_service import UpdaterService
+from services.worker_pool_service import WorkerPoolService
+from utils.clock import Clock, VirtualClock
 
 if __name__ == "__main__":
     args = utils.application.parse_args()
 
     utils.application.init_logger(args.severity)
 
-    updater_service = UpdaterService(BnoNewsGateway(), DataParserService(), args.frequency, args.channel, args.output,)
+    metrics_service = MetricsService()
+    profiling_service = ProfilingService(args.profile_directory)
 
-    discord = DiscordClient(updater_service)
-    discord.run(args.token)
+    if args.profile:
+        profiling_service.request(args.profile)
+
+    outbox_service = OutboxService(args.outbox_file) if args.outbox_file else None
+    send_cache_service = (
+        SendCacheService(args.send_cache_window, outbox_service=outbox_service) if args.send_cache_window else None
+    )
+    delivery_service = DeliveryService(
+        metrics_service,
+        send_cache_service=send_cache_service,
+        outbox_service=outbox_service,
+        max_age=args.max_message_age,
+    )
+    worker_pool_service = WorkerPoolService(args.workers, args.max_workers)
+    history_service = HistoryService(args.history_size)
+    leaderboard_service = LeaderboardService()
+    region_service = RegionService()
+    query_service = QueryService(leaderboard_service, region_service)
+    chart_service = (
+        ChartService(history_service, worker_pool_service, metrics_service=metrics_service) if args.charts else None
+    )
+    api_service = ApiService(history_service) if args.api_port else None
+    feed_service = FeedService(args.feed_buffer, metrics_service=metrics_service) if args.feed_port else None
+    parse_cache_service = ParseCacheService(args.parse_cache_size, metrics_service) if args.parse_cache_size else None
+    clock = Clock()
+
+    if args.replay:
+        bno_news_gateway = ReplayGateway(args.replay)
+        clock = VirtualClock(bno_news_gateway.first_timestamp(), args.replay_speed if args.replay_speed else None)
+        bno_news_gateway.clock = clock
+    else:
+        bno_news_gateway = BnoNewsGateway(
+            metrics_service, args.source_url, args.sheet_host, max_concurrency=args.sheet_concurrency
+        )
+
+        if args.record:
+            bno_news_gateway = RecordingGateway(bno_news_gateway, args.record)
+
+    memory_watchdog_service = MemoryWatchdogService(
+        args.memory_sample_every,
+        args.memory_soft_limit,
+        args.memory_hard_limit,
+        trimmables=[
+            trimmable
+            for trimmable in [
+                query_service,
+                bno_news_gateway,
+                parse_cache_service,
+                chart_service,
+                api_service,
+            ]
+            if trimmable
+        ],
+        persist=lambda: updater_service.save_state(args.state_file) if args.state_file else None,
+        metrics_service=metrics_service,
+        clock=clock,
+    )
+
+    if args.adaptive:
+        scheduler = AdaptiveScheduler(
+            args.frequency, args.min_frequency, args.max_frequency, metrics_service=metrics_service, clock=clock
+        )
+        backoff = ExponentialBackoff(min_delay=args.min_frequency)
+    else:
+        scheduler = FixedScheduler(args.frequency)
+        backoff = None
+
+    fetch_service = SharedFetchService(bno_news_gateway, args.fetch_freshness, clock, metrics_service)
+
+    updater_service = UpdaterService(
+        bno_news_gateway,
+        DataParserService(),
+        args.frequency,
+        args.channel,
+        args.output,
+        subscribers=[
+            subscriber
+            for subscriber in [
+                history_service,
+                leaderboard_service,
+                region_service,
+                query_service,
+                chart_service,
+                api_service,
+                feed_service,
+            ]
+            if subscriber
+        ],
+        leaderboard_service=leaderboard_service,
+        leaderboard_size=args.leaderboard_size,
+        delivery_service=delivery_service,
+        alert_service=AlertService(history_service) if args.alerts else None,
+        debounce_service=DebounceService(args.debounce) if args.debounce else None,
+        digest_threshold=args.digest_threshold,
+        metrics_service=metrics_service,
+        profiling_service=profiling_service,
+        memory_watchdog_service=memory_watchdog_service,
+        clock=clock,
+        scheduler=scheduler,
+        backoff=backoff,
+        worker_pool_service=worker_pool_service,
+        parse_cache_service=parse_cache_service,
+        fetch_service=fetch_service,
+        sanity_service=None if args.no_sanity_checks else SanityService(metrics_service=metrics_service),
+        chart_service=chart_service,
+        region_service=region_service,
+    )
+
+    # Extra pipelines share the fetch, parse cache and delivery queue, while the first pipeline keeps the subscribers,
+    # alerts and memory watchdog so those only see each snapshot once
+    updater_services = [updater_service] + [
+        UpdaterService(
+            bno_news_gateway,
+            DataParserService(),
+            pipeline["frequency"],
+            pipeline["channels"],
+            pipeline["output"],
+            leaderboard_service=leaderboard_service,
+            leaderboard_size=pipeline["leaderboard_size"],
+            delivery_service=delivery_service,
+            debounce_service=DebounceService(pipeline["debounce"]) if pipeline["debounce"] else None,
+            digest_threshold=pipeline["digest_threshold"],
+            metrics_service=metrics_service,
+            profiling_service=profiling_service,
+            clock=clock,
+            worker_pool_service=worker_pool_service,
+            parse_cache_service=parse_cache_service,
+            fetch_service=fetch_service,
+            location_filter=pipeline["locations"],
+            sanity_service=None if args.no_sanity_checks else SanityService(metrics_service=metrics_service),
+            chart_service=chart_service,
+            region_service=region_service,
+        )
+        for pipeline in args.pipelines
+    ]
+
+    if args.state_file and os.path.exists(args.state_file):
+        updater_service.load_state(args.state_file)
+
+    background_tasks = []
+
+    if args.metrics_port:
+        background_tasks.append(metrics_service.serve(args.metrics_port))
+
+    if args.api_port:
+        background_tasks.append(api_service.serve(args.api_port))
+
+    if args.feed_port:
+        background_tasks.append(feed_service.serve(args.feed_port))
+
+    if args.discord_api_url:
+        discord.http.Route.BASE = args.discord_api_url
+
+    discord_client = DiscordClient(
+        updater_services, query_service, background_tasks, chart_service=chart_service, max_messages=None
+    )
+    discord_client.run(args.token)
+    worker_pool_service.shutdown()
+
+    if args.state_file:
+        updater_service.save_state(args.state_file)
+
+    if outbox_service:
+        outbox_service.close()
+
+    sys.exit(memory_watchdog_service.exit_code)
@@ -0,0 +1,149 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_rows, mutate_rows, render_sheet
+from services.data_parser_service import DataParserService
+from services.updater_service import UpdaterService
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def measure(function, *args, repeat=1):
+    """
+    Runs a stage and reports its best wall time and its peak traced memory. Timing runs are kept separate from
+    the traced run, as tracemalloc slows allocation-heavy code down considerably.
+
+    Returns:
+    (result, seconds, peak_bytes)
+    """
+    best = None
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, best, peak
+
+
+def run_case(row_count, churn, repeat):
+    parser = DataParserService()
+    updater_services = {
+        output: UpdaterService(None, parser, 0, 0, output, logging.getLogger("benchmarks"))
+        for output in ["table", "text", "embed"]
+    }
+
+    before_rows = generate_rows(row_count)
+    before_html = render_sheet(before_rows)
+    after_html = render_sheet(mutate_rows(before_rows, churn))
+
+    previous_data = parser.create_dataframe_from_bno_data(before_html)
+
+    results = {}
+
+    parse = parser.create_dataframe_from_bno_data
+    data, results["parse"], results["parse_peak"] = measure(parse, after_html, repeat=repeat)
+
+    diff = lambda: pd.concat([previous_data, data]).drop_duplicates(keep=False)
+    data_diff, results["diff"], results["diff_peak"] = measure(diff, repeat=repeat)
+
+    collect = updater_services["table"]._collect_differences
+    _, results["collect"], results["collect_peak"] = measure(collect, data_diff, repeat=repeat)
+
+    timestamp = datetime.datetime.utcnow()
+
+    for output, updater_service in updater_services.items():
+        render = updater_service._make_update_message
+        _, results[f"render_{output}"], results[f"render_{output}_peak"] = measure(
+            render, data_diff, timestamp, repeat=repeat
+        )
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+
+    for case, stages in results.items():
+        for stage, value in stages.items():
+            expected = baseline.get(case, {}).get(stage)
+
+            if expected and value > expected * (1 + tolerance):
+                regressions.append(f"{case} {stage}: {value:.4g} vs baseline {expected:.4g}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the parse -> diff -> render pipeline on synthetic sheets")
+
+    parser.add_argument("--rows", nargs="+", type=int, default=[200, 1000, 10000], help="Sheet sizes to benchmark")
+    parser.add_argument("--churn", nargs="+", type=float, default=[0.01, 0.1], help="Fraction of rows changed")
+    parser.add_argument("--repeat", type=int, default=3, help="How many times each stage is run (best time is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Where the baseline results are stored")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown (or memory growth) before failing",
+    )
+
+    args = parser.parse_args()
+
+    results = {}
+
+    for row_count in args.rows:
+        for churn in args.churn:
+            case = f"rows={row_count},churn={churn}"
+            results[case] = run_case(row_count, churn, args.repeat)
+
+            stages = ", ".join(
+                f"{stage} {value * 1000:.1f}ms/{results[case][f'{stage}_peak'] / 1024 / 1024:.1f}MiB"
+                for stage, value in results[case].items()
+                if not stage.endswith("_peak")
+            )
+            print(f"{case}: {stages}")
+
+    if args.update_baseline:
+        baseline = {}
+
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        baseline.update(results)
+
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file), args.tolerance)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import random
+
+from html import escape
+
+from models.snapshot import DATAFRAME_COLUMNS
+
+
+def generate_rows(row_count, seed=0):
+    """
+    Creates a synthetic set of sheet rows, shaped like the 'OTHER PLACES' section of the BNO sheet
+
+    Params:
+    row_count (int) -> how many locations to generate
+    seed (int) -> seed for the random number generator
+
+    Returns:
+    list of rows, each a list of strings in DATAFRAME_COLUMNS order
+    """
+    rng = random.Random(seed)
+    rows = []
+
+    for index in range(row_count):
+        cases = rng.randint(0, 100000)
+        rows.append(
+            [
+                f"Location {index:06d}",
+                f"{cases:,}",
+                str(rng.randint(0, cases // 20 + 1)),
+                str(rng.randint(0, cases // 50 + 1)),
+                str(rng.randint(0, cases // 100 + 1)),
+                str(rng.randint(0, cases // 2 + 1)),
+                "",
+            ]
+        )
+
+    return rows
+
+
+def mutate_rows(rows, churn, seed=0):
+    """
+    Returns a copy of the rows where a fraction of the locations have had their counts edited
+
+    Params:
+    rows (list) -> rows created by generate_rows
+    churn (float) -> the fraction of locations to change, between 0 and 1
+    seed (int) -> seed for the random number generator
+
+    Returns:
+    list of rows
+    """
+    rng = random.Random(seed)
+    mutated = [list(row) for row in rows]
+
+    for index in rng.sample(range(len(rows)), int(len(rows) * churn)):
+        cases = int(mutated[index][1].replace(",", "")) + rng.randint(1, 500)
+        mutated[index][1] = f"{cases:,}"
+        mutated[index][2] = str(int(mutated[index][2]) + rng.randint(0, 5))
+
+    return mutated
+
+
+def render_sheet(rows):
+    """
+    Renders rows as the HTML served by the published Google sheet, including the section markers the
+    DataParserService looks for
+
+    Params:
+    rows (list) -> rows created by generate_rows or mutate_rows
+
+    Returns:
+    str
+    """
+    header = "".join(f"<td>{escape(column)}</td>" for column in DATAFRAME_COLUMNS)
+    body = [
+        f"<tr>{header}</tr>",
+        "<tr><td>CHINA</td></tr>",
+        "<tr><td>Hubei</td><td>67,000</td><td>3,000</td><td>0</td><td>0</td><td>50,000</td><td></td></tr>",
+        "<tr><td>OTHER PLACES</td></tr>",
+    ]
+
+    for row in rows:
+        body.append("<tr>" + "".join(f"<td>{escape(value)}</td>" for value in row) + "</tr>")
+
+    totals = [sum(int(row[column].replace(",", "")) for row in rows) for column in range(1, 6)]
+    body.append("<tr><td>TOTAL</td>" + "".join(f"<td>{total:,}</td>" for total in totals) + "<td></td></tr>")
+
+    return "<html><body><table><tbody>" + "".join(body) + "</tbody></table></body></html>"
@@ -1,12 +1,21 @@
 import discord
+import io
 import logging
+import signal
 
 
 class DiscordClient(discord.Client):
-    def __init__(self, updater_service, loop=None, **options):
+    def __init__(
+        self, updater_service, query_service=None, background_tasks=None, chart_service=None, loop=None, **options
+    ):
         super().__init__(loop=loop, **options)
 
-        self.updater_service = updater_service
+        self.updater_services = updater_service if type(updater_service) == list else [updater_service]
+        self.updater_service = self.updater_services[0]
+        self.query_service = query_service
+        self.chart_service = chart_service
+        self.background_tasks = background_tasks if background_tasks else []
+        self.tasks_started = False
         self.logger = logging.getLogger(__name__)
 
     async def on_ready(self):
@@ -16,4 +25,79 @@ class DiscordClient(discord.Client):
         await self.wait_until_ready()
         await self.change_presence(activity=discord.Game("😷"))
 
-        self.loop.create_task(self.updater_service.update_loop(self))
+        # on_ready runs again whenever a resume fails and the client reconnects, and the loops are still running
+        if not self.tasks_started:
+            self.tasks_started = True
+            self._start_tasks()
+
+        try:
+            self.loop.add_signal_handler(signal.SIGUSR1, self._request_profile)
+        except (AttributeError, NotImplementedError):
+            self.logger.debug("Signals aren't supported on this platform - profiling can only be started by command")
+
+    def _start_tasks(self):
+        delivery_services = []
+
+        for updater_service in self.updater_services:
+            if updater_service.delivery_service not in delivery_services:
+                delivery_services.append(updater_service.delivery_service)
+                self.loop.create_task(updater_service.delivery_service.run(self))
+
+            self.loop.create_task(updater_service.update_loop(self))
+
+        for background_task in self.background_tasks:
+            self.loop.create_task(background_task)
+
+    def _request_profile(self, cycles=5):
+        self.updater_service.profiling_service.request(cycles)
+
+    async def on_message(self, message):
+        if message.author == self.user:
+            return
+
+        if message.content.startswith("!profile"):
+            await self._handle_profile_command(message)
+            return
+
+        if message.content.startswith("!chart") and self.chart_service:
+            await self._handle_chart_command(message)
+            return
+
+        if not self.query_service:
+            return
+
+        response = self.query_service.handle_command(message.content)
+
+        if response is None:
+            return
+
+        if type(response) == discord.Embed:
+            await message.channel.send(embed=response)
+        else:
+            await message.channel.send(response)
+
+    async def _handle_chart_command(self, message):
+        _, _, location = message.content.partition(" ")
+
+        if not location.strip():
+            await message.channel.send("Usage: `!chart <location>`")
+            return
+
+        chart = await self.chart_service.chart(location)
+
+        if chart is None:
+            await message.channel.send(f"No data found for **{location.strip()}**")
+            return
+
+        await message.channel.send(file=discord.File(io.BytesIO(chart), self.chart_service.FILENAME))
+
+    async def _handle_profile_command(self, message):
+        permissions = getattr(message.author, "guild_permissions", None)
+
+        if not permissions or not permissions.administrator:
+            return
+
+        _, _, cycles = message.content.partition(" ")
+        self._request_profile(int(cycles) if cycles.strip().isdigit() else 5)
+
+        await message.channel.send("Profiling the next update cycle(s)")
@@ -0,0 +1,23 @@
+# Each rule is evaluated for every location in one pass over the snapshot's count matrix.
+#
+# growth -> fires when a statistic rises by more than `threshold` (a fraction) compared to the snapshot
+#           `window` seconds ago, ignoring locations below `minimum` (at least 1) at the start of the window
+# first  -> fires when a statistic goes from zero to non-zero for a location seen in the previous snapshot
+ALERT_RULES = [
+    {"type": "growth", "metric": "cases", "threshold": 0.2, "window": 3600, "minimum": 50},
+    {"type": "first", "metric": "cases"},
+    {"type": "first", "metric": "deaths"},
+]
+
+ALERT_TEMPLATES = {
+    "growth": "**ALERT:** {metric} in **{location}** are up {percent}% in the last {window} minutes, now {current}",
+    "first": "**ALERT:** first {singular} recorded in **{location}**",
+}
+
+METRIC_SINGULAR = {
+    "cases": "case",
+    "deaths": "death",
+    "serious": "serious patient",
+    "critical": "critical patient",
+    "recovered": "recovery",
+}
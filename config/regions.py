@@ -0,0 +1,285 @@
+# The continent each location is in. Locations not listed here take the continent of the sheet region they're in,
+# e.g. the states on the United States tab.
+CONTINENTS = {
+    "Africa": [
+        "Algeria",
+        "Angola",
+        "Benin",
+        "Botswana",
+        "Burkina Faso",
+        "Burundi",
+        "Cameroon",
+        "Cape Verde",
+        "Central African Republic",
+        "Chad",
+        "Comoros",
+        "Congo",
+        "Congo Kinshasa",
+        "Djibouti",
+        "Egypt",
+        "Equatorial Guinea",
+        "Eritrea",
+        "Ethiopia",
+        "Gabon",
+        "Gambia",
+        "Ghana",
+        "Guinea",
+        "Guinea Bissau",
+        "Ivory Coast",
+        "Kenya",
+        "Lesotho",
+        "Liberia",
+        "Libya",
+        "Madagascar",
+        "Malawi",
+        "Mali",
+        "Mauritania",
+        "Mauritius",
+        "Mayotte",
+        "Morocco",
+        "Mozambique",
+        "Namibia",
+        "Niger",
+        "Nigeria",
+        "Reunion",
+        "Rwanda",
+        "Sao Tome and Principe",
+        "Senegal",
+        "Seychelles",
+        "Sierra Leone",
+        "Somalia",
+        "South Africa",
+        "Sudan",
+        "Swaziland",
+        "Tanzania",
+        "Togo",
+        "Tunisia",
+        "Uganda",
+        "Western Sahara",
+        "Zambia",
+        "Zimbabwe",
+    ],
+    "Antarctica": ["Antarctica", "Bouvet Island", "British Antarctic Territory", "French Southern Territories"],
+    "Asia": [
+        "Afghanistan",
+        "Armenia",
+        "Azerbaijan",
+        "Bahrain",
+        "Bangladesh",
+        "Bhutan",
+        "BIOT",
+        "Brunei",
+        "Burma",
+        "Cambodia",
+        "China",
+        "East Timor",
+        "Georgia",
+        "Hong Kong",
+        "India",
+        "Indonesia",
+        "Iran",
+        "Iraq",
+        "Israel",
+        "Japan",
+        "Jordan",
+        "Kazakhstan",
+        "Kuwait",
+        "Kyrgyzstan",
+        "Laos",
+        "Lebanon",
+        "Macau",
+        "Mainland China",
+        "Malaysia",
+        "Maldives",
+        "Mongolia",
+        "Myanmar",
+        "Nepal",
+        "North Korea",
+        "Oman",
+        "Pakistan",
+        "Palestinian Territory",
+        "Philippines",
+        "Qatar",
+        "Saudi Arabia",
+        "Singapore",
+        "South Korea",
+        "Sri Lanka",
+        "Syria",
+        "Taiwan",
+        "Tajikistan",
+        "Thailand",
+        "Timor Leste",
+        "Turkey",
+        "Turkmenistan",
+        "United Arab Emirates",
+        "Uzbekistan",
+        "Vietnam",
+        "Yemen",
+    ],
+    "Europe": [
+        "Albania",
+        "Andorra",
+        "Austria",
+        "Belarus",
+        "Belgium",
+        "Bosnia",
+        "Bulgaria",
+        "Croatia",
+        "Cyprus",
+        "Czech Republic",
+        "Denmark",
+        "England",
+        "Estonia",
+        "Ex Yugoslavia",
+        "Faroe Islands",
+        "Finland",
+        "France",
+        "Germany",
+        "Gibraltar",
+        "Greece",
+        "Guernsey",
+        "Holy See",
+        "Hungary",
+        "Iceland",
+        "Ireland",
+        "Isle of Man",
+        "Italy",
+        "Jan Mayen",
+        "Jersey",
+        "Latvia",
+        "Liechtenstein",
+        "Lithuania",
+        "Luxembourg",
+        "Macedonia",
+        "Malta",
+        "Moldova",
+        "Monaco",
+        "Montenegro",
+        "Netherlands",
+        "Northern Ireland",
+        "Norway",
+        "Poland",
+        "Portugal",
+        "Romania",
+        "Russia",
+        "San Marino",
+        "Scotland",
+        "Serbia",
+        "Slovakia",
+        "Slovenia",
+        "SMOM",
+        "Spain",
+        "Svalbard",
+        "Sweden",
+        "Switzerland",
+        "Ukraine",
+        "United Kingdom",
+        "Vatican City",
+        "Wales",
+    ],
+    "North America": [
+        "Anguilla",
+        "Antigua and Barbuda",
+        "Aruba",
+        "Bahamas",
+        "Barbados",
+        "Belize",
+        "Bermuda",
+        "British Virgin Islands",
+        "Canada",
+        "Cayman Islands",
+        "Costa Rica",
+        "Cuba",
+        "Dominican Republic",
+        "Dominicana",
+        "El Salvador",
+        "Greenland",
+        "Grenada",
+        "Guadeloupe",
+        "Guatemala",
+        "Haiti",
+        "Honduras",
+        "Jamaica",
+        "Martinique",
+        "Mexico",
+        "Montserrat",
+        "Netherlands Antilles",
+        "Nicaragua",
+        "Panama",
+        "Puerto Rico",
+        "Saint Barthelemy",
+        "Saint Pierre and Miquelon",
+        "Saint Vincent and the Grenadines",
+        "SPM",
+        "SVG",
+        "Trinidad and Tobago",
+        "Turks and Caicos Islands",
+        "United States",
+        "Virgin Islands",
+    ],
+    "Oceania": [
+        "American Samoa",
+        "Australia",
+        "Christmas Island",
+        "Cocos Islands",
+        "Cook Islands",
+        "Fiji",
+        "French Polynesia",
+        "Guam",
+        "Jarvis Island",
+        "Kiribati",
+        "Marshall Islands",
+        "Micronesia",
+        "Nauru",
+        "New Caledonia",
+        "New Zealand",
+        "Niue",
+        "Norfolk Island",
+        "Northern Mariana Islands",
+        "Palau",
+        "Papua New Guinea",
+        "Pitcairn",
+        "Samoa",
+        "Solomon Islands",
+        "Tokelau",
+        "Tonga",
+        "Tuvalu",
+        "Vanuatu",
+        "Wallis and Futuna",
+    ],
+    "South America": [
+        "Argentina",
+        "Bolivia",
+        "Brazil",
+        "Chile",
+        "Colombia",
+        "Ecuador",
+        "Falkland Islands",
+        "Guyana",
+        "Paraguay",
+        "Peru",
+        "South Georgia",
+        "Suriname",
+        "Uruguay",
+        "Venezuela",
+    ],
+}
+
+# Other names people use for a location, mapped to the name BNO uses
+ALIASES = {
+    "Britain": "United Kingdom",
+    "Czechia": "Czech Republic",
+    "Cote d'Ivoire": "Ivory Coast",
+    "DRC": "Congo Kinshasa",
+    "Eswatini": "Swaziland",
+    "Great Britain": "United Kingdom",
+    "Holland": "Netherlands",
+    "Korea": "South Korea",
+    "North Macedonia": "Macedonia",
+    "Republic of Korea": "South Korea",
+    "UAE": "United Arab Emirates",
+    "UK": "United Kingdom",
+    "US": "United States",
+    "USA": "United States",
+    "Vatican": "Vatican City",
+}
@@ -0,0 +1,17 @@
+# Thresholds for the sanity checks run on every snapshot before it's broadcast. A snapshot failing any of them is
+# quarantined until CONFIRMATIONS later fetches fail the same checks in the same way, or hold nearly the same data.
+# Confirmed problems are then accepted for as long as they persist, rather than quarantining every cycle.
+#
+# MIN_ROW_FRACTION     -> fewest locations, as a fraction of the previous snapshot's, before the load looks partial
+# TOTAL_TOLERANCE      -> how far a region's summed counts may drift from its TOTAL row, as a fraction of the total,
+#                         and how far a later fetch's counts may drift from the quarantined snapshot's to confirm it
+# MAX_CHANGED_FRACTION -> most locations that may change in one cycle, as a fraction of the previous snapshot's
+# MIN_LOCATIONS        -> sheets smaller than this skip the changed fraction check, where a few edits are a big share
+SANITY_THRESHOLDS = {
+    "min_row_fraction": 0.9,
+    "total_tolerance": 0.01,
+    "max_changed_fraction": 0.5,
+    "min_locations": 20,
+}
+
+CONFIRMATIONS = 1
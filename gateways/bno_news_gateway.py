@@ -1,15 +1,91 @@
 import requests
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 from re import sub
 
 from bs4 import BeautifulSoup
 from requests_html import HTMLSession
 
+from gateways.circuit_breaker import CircuitBreaker
+from services.metrics_service import MetricsService
+
+DEFAULT_SOURCE_URL = "https://bnonews.com/index.php/2020/02/the-latest-coronavirus-cases/"
+DEFAULT_SHEET_HOST = "https://docs.google.com"
+
 
 class BnoNewsGateway:
-    @staticmethod
-    def fetch_raw():
-        original_source = "https://bnonews.com/index.php/2020/02/the-latest-coronavirus-cases/"
+    TAB_REFRESH_EVERY = 30
+
+    def __init__(
+        self,
+        metrics_service=None,
+        source_url=DEFAULT_SOURCE_URL,
+        sheet_host=DEFAULT_SHEET_HOST,
+        page_breaker=None,
+        sheet_breaker=None,
+        max_concurrency=4,
+    ):
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.source_url = source_url
+        self.sheet_host = sheet_host
+        self.page_breaker = page_breaker if page_breaker else CircuitBreaker("the BNO page")
+        self.sheet_breaker = sheet_breaker if sheet_breaker else CircuitBreaker("the sheet")
+        self.max_concurrency = max_concurrency
+        self.executor = None
+        self.local = threading.local()
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+        self.sheet_url = None
+        self.tabs = None
+        self.tabs_source = None
+        self.fetches_since_discovery = 0
+
+    def fetch_raw(self):
+        """
+        Fetches every tab of the sheet, going through the BNO page to find its address. The page and the sheet each
+        have their own circuit breaker - while the page's is open the last known sheet address is used instead.
+
+        Returns:
+        the sheet's HTML (str) if it has a single tab, otherwise a dict of tab name to HTML
+
+        Raises:
+        BnoNewsGatewayUnavailableError -> if the circuit for a source we can't do without is open
+        BnoNewsGatewayError -> if a request fails
+        """
+        if self.page_breaker.allow():
+            try:
+                with self.metrics_service.time("fetch_page"):
+                    self.sheet_url = self._fetch_sheet_url(self.source_url, self.sheet_host)
+            except BnoNewsGatewayError:
+                self.page_breaker.record_failure()
 
+                if self.sheet_url is None:
+                    raise
+            else:
+                self.page_breaker.record_success()
+        elif self.sheet_url is None:
+            raise BnoNewsGatewayUnavailableError("The circuit for the BNO page is open")
+
+        if not self.sheet_breaker.allow():
+            raise BnoNewsGatewayUnavailableError("The circuit for the sheet is open")
+
+        try:
+            with self.metrics_service.time("fetch_sheet"):
+                sheet = self._fetch_tabs(self.sheet_url)
+        except BnoNewsGatewayError:
+            self.sheet_breaker.record_failure()
+            raise
+        finally:
+            for endpoint, breaker in [("page", self.page_breaker), ("sheet", self.sheet_breaker)]:
+                self.metrics_service.set_gauge("circuit_open", int(breaker.state != breaker.CLOSED), endpoint=endpoint)
+
+        self.sheet_breaker.record_success()
+
+        return sheet
+
+    @staticmethod
+    def _fetch_sheet_url(original_source, sheet_host):
         try:
             response = requests.get(original_source, timeout=60)
         except requests.Timeout:
@@ -25,19 +101,136 @@ class BnoNewsGateway:
         soup = BeautifulSoup(response.text, features="html.parser")
 
         iframe_sources = soup.findAll("iframe")
+        real_data_source = None
 
         for iframe in iframe_sources:
-            if "https://docs.google.com" in iframe.get("src"):
+            if sheet_host in iframe.get("src", ""):
                 real_data_source = sub(r"(\?gid).+", "/sheet?headers=false&gid=0", iframe.get("src"))
                 break
 
         if not real_data_source:
             raise BnoNewsGatewayError("Couldn't find the source for the latest Coronavirus data")
 
-        session = HTMLSession()
+        return real_data_source
 
+    def _fetch_tabs(self, sheet_url):
+        """
+        Fetches all tabs of the sheet concurrently, at most max_concurrency at a time. The tabs are found again when
+        the sheet's address changes, every TAB_REFRESH_EVERY fetches and after a tab fails to load.
+
+        Params:
+        sheet_url (str) -> the address of the sheet's first tab
+
+        Returns:
+        str or dict, as returned by fetch_raw
+        """
+        if self.tabs_source != sheet_url or self.fetches_since_discovery >= self.TAB_REFRESH_EVERY:
+            self._discover_tabs(sheet_url)
+
+        self.fetches_since_discovery += 1
+
+        try:
+            if len(self.tabs) == 1:
+                return self._fetch_sheet(self.tabs[0][1])
+
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+            pages = list(self.executor.map(self._fetch_sheet, [url for _, url in self.tabs]))
+        except BnoNewsGatewayError:
+            self.fetches_since_discovery = self.TAB_REFRESH_EVERY
+            raise
+
+        return dict(zip([name for name, _ in self.tabs], pages))
+
+    def _discover_tabs(self, sheet_url):
+        """
+        Finds the sheet's tabs, keeping the last known tabs of the same sheet if the menu can't be fetched
+
+        Raises:
+        BnoNewsGatewayError -> if the menu can't be fetched and the sheet's tabs aren't known yet
+        """
         try:
-            r = session.get(real_data_source)
+            with self.metrics_service.time("fetch_tabs"):
+                tabs = self._find_tabs(sheet_url)
+        except BnoNewsGatewayError:
+            self.metrics_service.increment("tab_discovery_failures_total")
+
+            if self.tabs_source != sheet_url:
+                raise
+
+            tabs = self.tabs
+
+        self.tabs = tabs
+        self.tabs_source = sheet_url
+        self.fetches_since_discovery = 0
+
+    def _find_tabs(self, sheet_url):
+        """
+        Reads the tab names and gids from the published sheet's menu
+
+        Params:
+        sheet_url (str) -> the address of the sheet's first tab
+
+        Returns:
+        list of (name, url), just the first tab if the sheet has no menu
+
+        Raises:
+        BnoNewsGatewayError -> if the menu can't be fetched
+        """
+        first_tab = [("", sheet_url)]
+
+        try:
+            response = self._session().get(sheet_url.split("/sheet?")[0], timeout=60)
+        except requests.RequestException as re:
+            raise BnoNewsGatewayError(f"Error occurred whilst fetching the sheet's tabs from Google Docs ({str(re)})")
+
+        if response.status_code != 200:
+            raise BnoNewsGatewayError("Non-200 status code returned whilst fetching the sheet's tabs from Google Docs")
+
+        soup = BeautifulSoup(response.text, features="html.parser")
+        buttons = soup.select('li[id^="sheet-button-"]')
+
+        if not buttons:
+            return first_tab
+
+        tabs = []
+
+        for button in buttons:
+            gid = button["id"][len("sheet-button-") :]
+            tabs.append((button.get_text(strip=True), sub(r"gid=\d+$", f"gid={gid}", sheet_url)))
+
+        return tabs
+
+    def trim(self):
+        """
+        Closes the HTML sessions, releasing their connection pools and cookies. New ones are created on the next fetch.
+        """
+        with self.sessions_lock:
+            for session in self.sessions:
+                session.close()
+
+            self.sessions = []
+            self.local = threading.local()
+
+    def _session(self):
+        """
+        Returns:
+        HTMLSession for the calling thread, as sessions aren't safe to share between the tab fetching threads
+        """
+        session = getattr(self.local, "session", None)
+
+        if session is None:
+            session = self.local.session = HTMLSession()
+
+            with self.sessions_lock:
+                self.sessions.append(session)
+
+        return session
+
+    def _fetch_sheet(self, real_data_source):
+        try:
+            r = self._session().get(real_data_source)
         except requests.Timeout:
             raise BnoNewsGatewayError("Timed out whilst fetching data from Google Docs")
         except requests.RequestException as re:
@@ -48,3 +241,11 @@ class BnoNewsGateway:
 
 class BnoNewsGatewayError(Exception):
     pass
+
+
+class BnoNewsGatewayExhaustedError(BnoNewsGatewayError):
+    pass
+
+
+class BnoNewsGatewayUnavailableError(BnoNewsGatewayError):
+    pass
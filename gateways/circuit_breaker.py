@@ -0,0 +1,48 @@
+import logging
+
+from utils.clock import Clock
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=300, clock=None, logger=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock if clock else Clock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def allow(self):
+        """
+        Returns:
+        bool -> False while the circuit is open. Once the reset timeout has passed a single trial request is let
+        through, and its outcome decides whether the circuit closes again
+        """
+        if self.state == self.OPEN and self.clock.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.logger.info(f"Circuit for {self.name} is half open, trying a request")
+
+        return self.state != self.OPEN
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            self.logger.info(f"Circuit for {self.name} closed")
+
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.logger.warning(f"Circuit for {self.name} opened after {self.failures} failure(s)")
+
+            self.state = self.OPEN
+            self.opened_at = self.clock.monotonic()
@@ -0,0 +1,115 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import time
+
+from gateways.bno_news_gateway import BnoNewsGatewayExhaustedError
+
+
+class PayloadArchive:
+    """
+    An append-only, gzip compressed archive of fetched payloads (the HTML of a sheet, or a dict of tab name to HTML),
+    one JSON record per line. A payload identical to the one before it is stored as a reference rather than again in
+    full.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def writer(self):
+        return _ArchiveWriter(self.path)
+
+    def records(self):
+        """
+        Yields:
+        (timestamp, payload) for every record in the archive, in the order they were recorded
+        """
+        payload = None
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as archive:
+            try:
+                for line in archive:
+                    record = json.loads(line)
+
+                    if "payload" in record:
+                        payload = record["payload"]
+
+                    yield record["timestamp"], payload
+            except (EOFError, ValueError):
+                # The last record of an archive that was being written when the process died may be truncated
+                return
+
+
+class _ArchiveWriter:
+    def __init__(self, path):
+        self.archive = gzip.open(path, "at", encoding="utf-8")
+        self.previous_digest = None
+
+    def write(self, timestamp, payload):
+        # A sheet with several tabs is a dict of tab name to HTML, hashed as JSON in tab order (the first tab is the
+        # top level, so the same tabs in another order are a different payload)
+        canonical = json.dumps(payload) if isinstance(payload, dict) else payload
+        digest = hashlib.blake2b(canonical.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+        if digest == self.previous_digest:
+            record = {"timestamp": timestamp, "repeat": True}
+        else:
+            record = {"timestamp": timestamp, "payload": payload}
+
+        self.archive.write(json.dumps(record) + "\n")
+        self.archive.flush()
+        self.previous_digest = digest
+
+    def close(self):
+        self.archive.close()
+
+
+class RecordingGateway:
+    def __init__(self, gateway, archive_path, logger=None):
+        self.gateway = gateway
+        self.writer = PayloadArchive(archive_path).writer()
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def fetch_raw(self):
+        payload = self.gateway.fetch_raw()
+        self.writer.write(time.time(), payload)
+
+        return payload
+
+    def trim(self):
+        if hasattr(self.gateway, "trim"):
+            self.gateway.trim()
+
+
+class ReplayGateway:
+    def __init__(self, archive_path, clock=None, logger=None):
+        self.archive_path = archive_path
+        self.records = PayloadArchive(archive_path).records()
+        self.clock = clock
+        self.timestamp = None
+        self.replayed = 0
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def fetch_raw(self):
+        try:
+            self.timestamp, payload = next(self.records)
+        except StopIteration:
+            raise BnoNewsGatewayExhaustedError(f"Replay finished after {self.replayed} payload(s)")
+
+        self.replayed += 1
+
+        if self.clock:
+            self.clock.advance_to(datetime.datetime.utcfromtimestamp(self.timestamp))
+
+        return payload
+
+    def first_timestamp(self):
+        for timestamp, _ in PayloadArchive(self.archive_path).records():
+            return datetime.datetime.utcfromtimestamp(timestamp)
+
+        return None
+
+    def trim(self):
+        pass
@@ -0,0 +1,98 @@
+import html
+import os
+
+from aiohttp import web
+
+from benchmarks.synthetic import generate_rows, mutate_rows, render_sheet
+from gateways.recording_gateway import PayloadArchive
+
+SHEET_PATH = "/spreadsheets/d/e/fake/pubhtml"
+
+
+class FakeBnoServer:
+    """
+    Serves a BNO News page that embeds a sheet, and the sheet itself. Every request for the sheet returns the next
+    version of it, either replayed from an archive recorded with --record, from a directory of HTML files, or
+    generated by mutating synthetic rows. An archive of a sheet with several tabs is served with a tab menu, and
+    each tab's n-th request returns that tab from the n-th recording.
+    """
+
+    def __init__(self, rows=200, churn=0.05, recording_directory=None, archive_path=None, port=0):
+        self.port = port
+        self.churn = churn
+        self.rows = generate_rows(rows)
+        self.recordings = []
+        self.tabs = []
+        self.sheet_requests = 0
+        self.tab_requests = {}
+        self.runner = None
+
+        if recording_directory:
+            for name in sorted(os.listdir(recording_directory)):
+                if name.endswith(".html"):
+                    with open(os.path.join(recording_directory, name)) as recording:
+                        self.recordings.append(recording.read())
+
+        if archive_path:
+            self.recordings = [payload for _, payload in PayloadArchive(archive_path).records()]
+
+        for recording in self.recordings:
+            if isinstance(recording, dict):
+                self.tabs = list(recording)
+                break
+
+    @property
+    def source_url(self):
+        return f"http://127.0.0.1:{self.port}/bno"
+
+    @property
+    def sheet_host(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/bno", self._handle_page)
+        app.router.add_get(SHEET_PATH, self._handle_menu)
+        app.router.add_get(SHEET_PATH + "/sheet", self._handle_sheet)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+
+        site = web.TCPSite(self.runner, "127.0.0.1", self.port)
+        await site.start()
+
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle_page(self, request):
+        iframe = f'<iframe src="{self.sheet_host}{SHEET_PATH}?gid=0&amp;single=true"></iframe>'
+
+        return web.Response(text=f"<html><body>{iframe}</body></html>", content_type="text/html")
+
+    async def _handle_menu(self, request):
+        # A published sheet with a single tab has no tab menu
+        buttons = "".join(f'<li id="sheet-button-{gid}">{html.escape(name)}</li>' for gid, name in enumerate(self.tabs))
+
+        return web.Response(text=f"<html><body><ul>{buttons}</ul></body></html>", content_type="text/html")
+
+    async def _handle_sheet(self, request):
+        gid = int(request.query.get("gid", "0"))
+        self.tab_requests[gid] = self.tab_requests.get(gid, 0) + 1
+
+        # Tabs are fetched concurrently, so each tab keeps its own count and the first tab's counts the cycles
+        if gid == 0:
+            self.sheet_requests += 1
+
+        if self.recordings:
+            recording = self.recordings[min(self.tab_requests[gid], len(self.recordings)) - 1]
+
+            if isinstance(recording, dict):
+                recording = recording.get(self.tabs[gid], "") if gid < len(self.tabs) else ""
+
+            return web.Response(text=recording, content_type="text/html")
+
+        self.rows = mutate_rows(self.rows, self.churn, seed=self.sheet_requests)
+
+        return web.Response(text=render_sheet(self.rows), content_type="text/html")
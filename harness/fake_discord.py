@@ -0,0 +1,240 @@
+import asyncio
+import datetime
+import itertools
+import json
+import time
+
+from aiohttp import WSMsgType, web
+
+CHANNELS_PER_GUILD = 500
+
+
+class FakeDiscordServer:
+    """
+    A minimal stand-in for the Discord REST API and gateway, enough for the bot to log in, see its channels and
+    send messages. Message sends are rate limited per channel (and globally), answering with 429s the way Discord
+    does, and every request can be delayed by a fixed latency.
+    """
+
+    def __init__(self, channel_count=1, per_channel_limit=5, per_channel_window=5.0, global_limit=50, latency=0.0):
+        self.channel_ids = [1000000 + index for index in range(channel_count)]
+        self.per_channel_limit = per_channel_limit
+        self.per_channel_window = per_channel_window
+        self.global_limit = global_limit
+        self.latency = latency
+        self.port = 0
+        self.runner = None
+        self.ids = itertools.count(10**17)
+        self.channel_sends = {}
+        self.global_sends = []
+        self.messages = []
+        self.rate_limited = 0
+        self.rate_limited_global = 0
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.port}/api/v6"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/api/v6/users/@me", self._handle_me)
+        app.router.add_get("/api/v6/gateway", self._handle_gateway)
+        app.router.add_get("/api/v6/gateway/bot", self._handle_gateway)
+        app.router.add_post("/api/v6/channels/{channel_id}/messages", self._handle_send)
+        app.router.add_get("/ws", self._handle_websocket)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+
+        site = web.TCPSite(self.runner, "127.0.0.1", self.port)
+        await site.start()
+
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def write_channels_file(self, path):
+        with open(path, "w") as channels_file:
+            channels_file.write("\n".join(str(channel_id) for channel_id in self.channel_ids))
+
+    async def _handle_me(self, request):
+        return self._json(self._user())
+
+    async def _handle_gateway(self, request):
+        return self._json({"url": f"ws://127.0.0.1:{self.port}/ws", "shards": 1})
+
+    async def _handle_send(self, request):
+        await asyncio.sleep(self.latency)
+
+        channel_id = int(request.match_info["channel_id"])
+        now = time.monotonic()
+
+        self.global_sends = [sent for sent in self.global_sends if now - sent < 1]
+        sends = [sent for sent in self.channel_sends.get(channel_id, []) if now - sent < self.per_channel_window]
+        self.channel_sends[channel_id] = sends
+
+        if len(self.global_sends) >= self.global_limit:
+            return self._rate_limited(1 - (now - self.global_sends[0]), is_global=True)
+
+        if len(sends) >= self.per_channel_limit:
+            return self._rate_limited(self.per_channel_window - (now - sends[0]), is_global=False)
+
+        sends.append(now)
+        self.global_sends.append(now)
+
+        if request.content_type == "application/json":
+            payload = await request.json()
+        else:
+            payload = json.loads((await request.post()).get("payload_json", "{}"))
+
+        self.messages.append((now, channel_id))
+
+        return self._json(self._message(channel_id, payload), headers=self._rate_limit_headers(sends))
+
+    def _rate_limited(self, retry_after, is_global):
+        self.rate_limited += 1
+        self.rate_limited_global += int(is_global)
+
+        body = {
+            "message": "You are being rate limited.",
+            "retry_after": int(retry_after * 1000) + 1,
+            "global": is_global,
+        }
+        headers = {"Retry-After": str(int(retry_after * 1000) + 1)}
+
+        if is_global:
+            headers["X-RateLimit-Global"] = "true"
+
+        return self._json(body, status=429, headers=headers)
+
+    def _rate_limit_headers(self, sends):
+        return {
+            "X-RateLimit-Limit": str(self.per_channel_limit),
+            "X-RateLimit-Remaining": str(self.per_channel_limit - len(sends)),
+            "X-RateLimit-Reset": str(time.time() + self.per_channel_window),
+            "X-RateLimit-Reset-After": str(self.per_channel_window),
+        }
+
+    async def _handle_websocket(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+
+        sequence = itertools.count(1)
+
+        await websocket.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+
+        async for message in websocket:
+            if message.type != WSMsgType.TEXT:
+                continue
+
+            payload = json.loads(message.data)
+
+            if payload["op"] == 1:
+                await websocket.send_json({"op": 11})
+            elif payload["op"] == 2:
+                await self._send_ready(websocket, sequence)
+
+        return websocket
+
+    async def _send_ready(self, websocket, sequence):
+        guild_ids = [str(900 + index) for index in range(len(self._guild_channels()))]
+
+        ready = {
+            "v": 6,
+            "user": self._user(),
+            "guilds": [{"id": guild_id, "unavailable": True} for guild_id in guild_ids],
+            "session_id": "fake-session",
+            "private_channels": [],
+            "relationships": [],
+        }
+
+        await websocket.send_json({"op": 0, "t": "READY", "s": next(sequence), "d": ready})
+
+        for guild_id, channel_ids in zip(guild_ids, self._guild_channels()):
+            await websocket.send_json(
+                {"op": 0, "t": "GUILD_CREATE", "s": next(sequence), "d": self._guild(guild_id, channel_ids)}
+            )
+
+    def _guild_channels(self):
+        return [
+            self.channel_ids[start : start + CHANNELS_PER_GUILD]
+            for start in range(0, len(self.channel_ids), CHANNELS_PER_GUILD)
+        ]
+
+    def _guild(self, guild_id, channel_ids):
+        return {
+            "id": guild_id,
+            "name": f"Fake Guild {guild_id}",
+            "unavailable": False,
+            "owner_id": "1",
+            "region": "local",
+            "large": False,
+            "member_count": 1,
+            "members": [],
+            "presences": [],
+            "voice_states": [],
+            "emojis": [],
+            "features": [],
+            "verification_level": 0,
+            "default_message_notifications": 0,
+            "explicit_content_filter": 0,
+            "mfa_level": 0,
+            "premium_tier": 0,
+            "roles": [
+                {
+                    "id": guild_id,
+                    "name": "@everyone",
+                    "permissions": 2048,
+                    "position": 0,
+                    "color": 0,
+                    "hoist": False,
+                    "managed": False,
+                    "mentionable": False,
+                }
+            ],
+            "channels": [
+                {
+                    "id": str(channel_id),
+                    "type": 0,
+                    "name": f"updates-{channel_id}",
+                    "position": position,
+                    "permission_overwrites": [],
+                    "nsfw": False,
+                    "parent_id": None,
+                    "topic": None,
+                    "rate_limit_per_user": 0,
+                    "last_message_id": None,
+                }
+                for position, channel_id in enumerate(channel_ids)
+            ],
+        }
+
+    def _message(self, channel_id, payload):
+        return {
+            "id": str(next(self.ids)),
+            "channel_id": str(channel_id),
+            "content": payload.get("content") or "",
+            "author": self._user(),
+            "attachments": [],
+            "embeds": [payload["embed"]] if payload.get("embed") else [],
+            "mentions": [],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "pinned": False,
+            "tts": False,
+            "type": 0,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "edited_timestamp": None,
+        }
+
+    @staticmethod
+    def _json(body, status=200, headers=None):
+        # discord.py only decodes JSON when the content type is exactly application/json, without a charset
+        return web.Response(
+            body=json.dumps(body).encode(), status=status, headers={"Content-Type": "application/json", **(headers or {})}
+        )
+
+    @staticmethod
+    def _user():
+        return {"id": "1", "username": "Coronavirus Updater", "discriminator": "0001", "avatar": None, "bot": True}
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+
+import aiohttp
+
+from harness.fake_bno import FakeBnoServer
+from harness.fake_discord import FakeDiscordServer
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+METRIC_LINE = re.compile(r"^(?P<name>[a-z_]+)(?P<labels>\{[^}]*\})? (?P<value>\S+)$")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_metrics(text):
+    metrics = {}
+
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+
+        if match:
+            metrics[(match.group("name"), match.group("labels") or "")] = float(match.group("value"))
+
+    return metrics
+
+
+async def scrape_metrics(port):
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                return parse_metrics(await response.text())
+    except aiohttp.ClientError:
+        return {}
+
+
+async def run_scenario(channel_count, args):
+    fake_bno = FakeBnoServer(args.rows, args.churn, args.recording_directory, args.archive)
+    fake_discord = FakeDiscordServer(
+        channel_count, args.per_channel_limit, args.per_channel_window, args.global_limit, args.latency
+    )
+
+    await fake_bno.start()
+    await fake_discord.start()
+
+    metrics_port = free_port()
+
+    with tempfile.TemporaryDirectory() as directory:
+        channels_file = os.path.join(directory, "channels.txt")
+        fake_discord.write_channels_file(channels_file)
+
+        command = [
+            sys.executable,
+            APP,
+            "--token",
+            "fake-token",
+            "--channels-file",
+            channels_file,
+            "--frequency",
+            str(args.frequency),
+            "--output",
+            args.output,
+            "--severity",
+            args.severity,
+            "--source-url",
+            fake_bno.source_url,
+            "--sheet-host",
+            fake_bno.sheet_host,
+            "--discord-api-url",
+            fake_discord.api_url,
+            "--metrics-port",
+            str(metrics_port),
+            # Every cycle should reach the fake sheet, however short the frequency
+            "--fetch-freshness",
+            "0",
+        ] + args.extra
+
+        process = subprocess.Popen(command)
+
+        try:
+            await asyncio.sleep(args.duration)
+            metrics = await scrape_metrics(metrics_port)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    await fake_bno.stop()
+    await fake_discord.stop()
+
+    return report(channel_count, args.duration, metrics, fake_bno, fake_discord)
+
+
+def report(channel_count, duration, metrics, fake_bno, fake_discord):
+    def stage_mean(stage):
+        labels = f'{{stage="{stage}"}}'
+        count = metrics.get(("coronavirus_bot_stage_duration_seconds_count", labels), 0)
+        total = metrics.get(("coronavirus_bot_stage_duration_seconds_sum", labels), 0)
+
+        return total / count * 1000 if count else float("nan")
+
+    cycle_stages = ["fetch", "parse", "snapshot_diff", "diff", "render"]
+
+    return {
+        "channels": channel_count,
+        "cycles": int(metrics.get(("coronavirus_bot_cycles_total", ""), 0)),
+        "sheet_requests": fake_bno.sheet_requests,
+        "cycle_ms": sum(stage_mean(stage) for stage in cycle_stages if stage_mean(stage) == stage_mean(stage)),
+        "send_ms": stage_mean("send"),
+        "messages": len(fake_discord.messages),
+        "messages_per_second": len(fake_discord.messages) / duration,
+        # Counted by the fake server, as discord.py retries 429s itself and the bot only sees those it gives up on
+        "429s_served": fake_discord.rate_limited,
+        "global_429s_served": fake_discord.rate_limited_global,
+        "429s_given_up": int(metrics.get(("coronavirus_bot_rate_limited_total", ""), 0)),
+        "queue_depth": int(metrics.get(("coronavirus_bot_delivery_queue_depth", ""), 0)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the bot end to end against fake BNO and Discord servers")
+
+    parser.add_argument("--channels", nargs="+", type=int, default=[1, 100, 10000], help="Subscribed channel counts")
+    parser.add_argument("--rows", type=int, default=200, help="Rows in the synthetic sheet")
+    parser.add_argument("--churn", type=float, default=0.05, help="Fraction of rows changed between fetches")
+    parser.add_argument("--recording-directory", default=None, help="Replay recorded sheet HTML files in order")
+    parser.add_argument("--archive", default=None, help="Replay an archive recorded by app.py --record")
+    parser.add_argument("--frequency", type=int, default=5, help="The bot's update frequency (in seconds)")
+    parser.add_argument("--duration", type=int, default=60, help="How long to run each scenario for (in seconds)")
+    parser.add_argument("--output", default="embed", choices=["table", "text", "embed", "leaderboard", "chart"])
+    parser.add_argument("--per-channel-limit", type=int, default=5, help="Messages allowed per channel per window")
+    parser.add_argument("--per-channel-window", type=float, default=5.0, help="Per channel rate limit window")
+    parser.add_argument("--global-limit", type=int, default=50, help="Messages allowed per second across channels")
+    parser.add_argument("--latency", type=float, default=0.05, help="Added latency for each Discord request")
+    parser.add_argument("--severity", default="warning", help="The bot's logging severity")
+    parser.add_argument("extra", nargs=argparse.REMAINDER, help="Extra arguments passed to app.py (after --)")
+
+    args = parser.parse_args()
+    args.extra = [arg for arg in args.extra if arg != "--"]
+
+    results = [asyncio.get_event_loop().run_until_complete(run_scenario(count, args)) for count in args.channels]
+
+    columns = list(results[0])
+    print(" | ".join(columns))
+
+    for result in results:
+        print(
+            " | ".join(
+                f"{result[column]:.1f}" if type(result[column]) == float else str(result[column]) for column in columns
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
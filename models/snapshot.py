@@ -0,0 +1,175 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import remove_non_integers_from_string
+
+COUNT_COLUMNS = ["Cases", "Deaths", "Serious", "Critical", "Recovered"]
+DATAFRAME_COLUMNS = ["Location"] + COUNT_COLUMNS + ["Source"]
+
+LocationDelta = namedtuple("LocationDelta", ["location", "before", "after", "source"])
+
+
+class Snapshot:
+    def __init__(self, locations, counts, sources, timestamp=None, regions=None, totals=None, parents=None):
+        self.locations = list(locations)
+        self.counts = counts
+        self.sources = list(sources)
+        self.timestamp = timestamp
+        self.regions = list(regions) if regions is not None else [""] * len(self.locations)
+        self.totals = totals if totals else {}
+        self.parents = list(parents) if parents is not None else [""] * len(self.locations)
+        self.top_level = np.array([not parent for parent in self.parents], dtype=bool)
+        self.index = {location.lower(): position for position, location in enumerate(self.locations)}
+
+    @classmethod
+    def from_dataframe(cls, data, timestamp=None):
+        """
+        Builds a typed snapshot from a DataFrame created by the DataParserService
+
+        Params:
+        data (DataFrame) -> parsed BNO data
+        timestamp (datetime) -> when the data was fetched
+
+        Returns:
+        Snapshot, with the regions, parents and TOTAL rows found by the parser if it's the DataFrame it returned
+        """
+        counts = np.zeros((len(data), len(COUNT_COLUMNS)), dtype=np.int64)
+
+        for column_index, column in enumerate(COUNT_COLUMNS):
+            counts[:, column_index] = [int(remove_non_integers_from_string(value)) for value in data[column]]
+
+        sources = data["Source"] if "Source" in data.columns else [""] * len(data)
+        attrs = data.attrs if hasattr(data, "attrs") else {}
+        regions = attrs.get("regions")
+        parents = attrs.get("parents")
+
+        if regions is not None and len(regions) != len(data):
+            regions = None
+
+        if parents is not None and len(parents) != len(data):
+            parents = None
+
+        return cls(data["Location"], counts, sources, timestamp, regions, attrs.get("totals"), parents)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def find(self, location):
+        return self.index.get(location.strip().lower())
+
+    def row(self, location):
+        position = self.find(location)
+
+        if position is None:
+            return None
+
+        return tuple(int(count) for count in self.counts[position])
+
+    def is_top_level(self, location):
+        """
+        Returns:
+        bool -> False for locations breaking another one down (e.g. a country's states), which are already counted
+        in their parent's row and must be left out of totals
+        """
+        position = self.find(location)
+
+        return position is not None and bool(self.top_level[position])
+
+    def total(self):
+        """
+        Returns:
+        array of the summed counts of the top level locations
+        """
+        return self.counts[self.top_level].sum(axis=0)
+
+    def hierarchy(self):
+        """
+        Returns:
+        dict of region to the list of its locations, in sheet order
+        """
+        hierarchy = {}
+
+        for region, location in zip(self.regions, self.locations):
+            hierarchy.setdefault(region, []).append(location)
+
+        return hierarchy
+
+    def align(self, other):
+        """
+        Lines another snapshot's counts up against this snapshot's locations
+
+        Params:
+        other (Snapshot) -> the snapshot to align
+
+        Returns:
+        (counts, present) -> counts shaped like self.counts (zero where missing) and a boolean mask of locations
+        present in the other snapshot
+        """
+        positions = np.array([other.index.get(location.lower(), -1) for location in self.locations], dtype=np.int64)
+        present = positions >= 0
+
+        counts = np.zeros_like(self.counts)
+        counts[present] = other.counts[positions[present]]
+
+        return counts, present
+
+    def diff(self, previous):
+        """
+        Compares this snapshot against a previous one
+
+        Params:
+        previous (Snapshot) -> the snapshot from the last cycle
+
+        Returns:
+        list of LocationDelta, with before set to None for new locations and after set to None for removed ones
+        """
+        if previous is None:
+            return [
+                LocationDelta(location, None, tuple(int(c) for c in self.counts[position]), self.sources[position])
+                for position, location in enumerate(self.locations)
+            ]
+
+        previous_counts, existing = self.align(previous)
+
+        changed = ~existing | (previous_counts != self.counts).any(axis=1)
+
+        deltas = []
+
+        for position in np.flatnonzero(changed):
+            before = tuple(int(c) for c in previous_counts[position]) if existing[position] else None
+            after = tuple(int(c) for c in self.counts[position])
+            deltas.append(LocationDelta(self.locations[position], before, after, self.sources[position]))
+
+        for position, location in enumerate(previous.locations):
+            if location.lower() not in self.index:
+                before = tuple(int(c) for c in previous.counts[position])
+                deltas.append(LocationDelta(location, before, None, previous.sources[position]))
+
+        return deltas
+
+
+def deltas_to_dataframe(deltas):
+    """
+    Turns deltas back into the 'before and after rows' shape produced by diffing two DataFrames, so they can be
+    rendered by the UpdaterService. Removed locations are left out.
+
+    Params:
+    deltas (list of LocationDelta) -> the changes to render
+
+    Returns:
+    DataFrame
+    """
+    rows = []
+
+    for delta in deltas:
+        if delta.after is None:
+            continue
+
+        if delta.before is not None:
+            rows.append([delta.location] + [str(count) for count in delta.before] + [delta.source])
+
+        rows.append([delta.location] + [str(count) for count in delta.after] + [delta.source])
+
+    return pd.DataFrame(rows, columns=DATAFRAME_COLUMNS)
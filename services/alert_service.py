@@ -0,0 +1,105 @@
+import datetime
+import logging
+
+import numpy as np
+
+from config import alerts as alerts_config
+from models.snapshot import COUNT_COLUMNS
+
+
+class AlertService:
+    METRICS = [column.lower() for column in COUNT_COLUMNS]
+
+    def __init__(self, history_service, rules=None, logger=None):
+        self.history_service = history_service
+        self.rules = rules if rules is not None else alerts_config.ALERT_RULES
+        self.last_fired = {}
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def evaluate(self, snapshot):
+        """
+        Checks every rule against every location, using array operations over the count matrix rather than
+        iterating over rows. Must be called before the snapshot is added to the history.
+
+        Params:
+        snapshot (Snapshot) -> the snapshot for this cycle
+
+        Returns:
+        list of alert messages (str)
+        """
+        previous = self.history_service.latest()
+
+        if previous is None:
+            return []
+
+        references = {}
+        aligned_previous = None
+        messages = []
+
+        for rule_index, rule in enumerate(self.rules):
+            metric = self.METRICS.index(rule["metric"])
+
+            if rule["type"] == "growth":
+                if rule["window"] not in references:
+                    window_start = snapshot.timestamp - datetime.timedelta(seconds=rule["window"])
+                    reference = self.history_service.at_or_before(window_start)
+                    references[rule["window"]] = snapshot.align(reference) if reference else None
+
+                if references[rule["window"]] is None:
+                    continue
+
+                before, present = references[rule["window"]]
+                before = before[:, metric]
+                after = snapshot.counts[:, metric]
+
+                # Growth from zero has no percentage, and is covered by the first rule instead
+                minimum = max(rule.get("minimum", 0), 1)
+                matches = present & (before >= minimum) & (after - before > rule["threshold"] * before)
+            elif rule["type"] == "first":
+                # Shared by every first rule, like the growth references for each window
+                if aligned_previous is None:
+                    aligned_previous = snapshot.align(previous)
+
+                before, present = aligned_previous
+                before = before[:, metric]
+                after = snapshot.counts[:, metric]
+
+                matches = present & (before == 0) & (after > 0)
+            else:
+                self.logger.warning(f"Unknown alert rule type '{rule['type']}' - skipping")
+                continue
+
+            for position in np.flatnonzero(matches):
+                location = snapshot.locations[position]
+
+                if self._in_cooldown(rule_index, rule, location, snapshot.timestamp):
+                    continue
+
+                messages.append(self._format(rule, location, int(before[position]), int(after[position])))
+
+        return messages
+
+    def _in_cooldown(self, rule_index, rule, location, timestamp):
+        key = (rule_index, location.lower())
+        last_fired = self.last_fired.get(key)
+
+        if last_fired and (timestamp - last_fired).total_seconds() < rule.get("window", 0):
+            return True
+
+        self.last_fired[key] = timestamp
+
+        return False
+
+    def _format(self, rule, location, before, after):
+        if rule["type"] == "growth":
+            return alerts_config.ALERT_TEMPLATES["growth"].format(
+                metric=rule["metric"].capitalize(),
+                location=location,
+                percent=round((after - before) * 100 / before),
+                window=rule["window"] // 60,
+                current=after,
+            )
+
+        return alerts_config.ALERT_TEMPLATES["first"].format(
+            singular=alerts_config.METRIC_SINGULAR[rule["metric"]], location=location
+        )
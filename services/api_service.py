@@ -0,0 +1,200 @@
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import logging
+
+from aiohttp import web
+from collections import namedtuple
+
+from models.snapshot import COUNT_COLUMNS
+
+Body = namedtuple("Body", ["data", "gzipped", "etag", "content_type"])
+
+
+def make_body(data, content_type):
+    """
+    Params:
+    data (str) -> the response body
+    content_type (str) -> its MIME type
+
+    Returns:
+    Body, holding both the plain and gzipped forms and an ETag, so repeated requests cost no serialisation
+    """
+    encoded = data.encode()
+
+    return Body(
+        encoded, gzip.compress(encoded), f'"{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"', content_type
+    )
+
+
+class ApiService:
+    MAX_CACHED_RESPONSES = 256
+
+    def __init__(self, history_service, logger=None):
+        self.history_service = history_service
+        self.snapshot = None
+        self.snapshot_json = None
+        self.snapshot_csv = None
+        self.responses = {}
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def on_snapshot(self, snapshot, deltas):
+        """
+        Serialises the snapshot once per data change. History gains a point every cycle, so history responses are
+        dropped every time, but everything else is kept - with its ETag - until a location changes.
+        """
+        self.snapshot = snapshot
+
+        if self.snapshot_json is not None and not deltas:
+            self.responses = {key: body for key, body in self.responses.items() if key[0] != "history"}
+            return
+
+        self.responses = {}
+
+        rows = [self._location_dict(position) for position in range(len(snapshot))]
+        updated = snapshot.timestamp.isoformat() if snapshot.timestamp else None
+
+        self.snapshot_json = make_body(json.dumps({"updated": updated, "locations": rows}), "application/json")
+
+        csv_data = io.StringIO()
+        writer = csv.DictWriter(csv_data, fieldnames=list(rows[0]) if rows else ["location"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+        self.snapshot_csv = make_body(csv_data.getvalue(), "text/csv")
+
+    def trim(self):
+        self.responses = {}
+
+    async def serve(self, port, host="127.0.0.1"):
+        app = web.Application()
+        app.router.add_get("/api/snapshot", self._handle_snapshot)
+        app.router.add_get("/api/snapshot.csv", self._handle_snapshot_csv)
+        app.router.add_get("/api/locations/{location}", self._handle_location)
+        app.router.add_get("/api/locations/{location}/history", self._handle_history)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+
+        self.logger.info(f"Serving the API on http://{host}:{port}/api/snapshot")
+
+    async def _handle_snapshot(self, request):
+        if self.snapshot_json is None:
+            return self._not_ready()
+
+        return self._respond(request, self.snapshot_json)
+
+    async def _handle_snapshot_csv(self, request):
+        if self.snapshot_csv is None:
+            return self._not_ready()
+
+        return self._respond(request, self.snapshot_csv)
+
+    async def _handle_location(self, request):
+        if self.snapshot is None:
+            return self._not_ready()
+
+        position = self.snapshot.find(request.match_info["location"])
+
+        if position is None:
+            raise web.HTTPNotFound(text="Unknown location")
+
+        key = ("location", position)
+
+        if key not in self.responses:
+            self._cache(key, make_body(json.dumps(self._location_dict(position)), "application/json"))
+
+        return self._respond(request, self.responses[key])
+
+    async def _handle_history(self, request):
+        if self.snapshot is None:
+            return self._not_ready()
+
+        location = request.match_info["location"]
+
+        if self.snapshot.find(location) is None:
+            raise web.HTTPNotFound(text="Unknown location")
+
+        try:
+            since = self._parse_time(request.query.get("since"))
+            until = self._parse_time(request.query.get("until"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="since and until should be ISO 8601 timestamps")
+
+        key = ("history", location.strip().lower(), since, until)
+
+        if key not in self.responses:
+            self._cache(key, make_body(json.dumps(self._history(location, since, until)), "application/json"))
+
+        return self._respond(request, self.responses[key])
+
+    def _history(self, location, since, until):
+        points = []
+
+        for snapshot in self.history_service.snapshots:
+            if (since and snapshot.timestamp < since) or (until and snapshot.timestamp > until):
+                continue
+
+            position = snapshot.find(location)
+
+            if position is not None:
+                counts = dict(zip([c.lower() for c in COUNT_COLUMNS], (int(c) for c in snapshot.counts[position])))
+                points.append({"timestamp": snapshot.timestamp.isoformat(), **counts})
+
+        return {"location": self.snapshot.locations[self.snapshot.find(location)], "points": points}
+
+    def _location_dict(self, position):
+        snapshot = self.snapshot
+
+        return {
+            "location": snapshot.locations[position],
+            "region": snapshot.regions[position],
+            "parent": snapshot.parents[position],
+            **dict(zip([c.lower() for c in COUNT_COLUMNS], (int(c) for c in snapshot.counts[position]))),
+            "source": snapshot.sources[position],
+        }
+
+    def _cache(self, key, body):
+        # History ranges are chosen by clients, so this is bounded rather than trusting them to reuse a few ranges
+        if len(self.responses) >= self.MAX_CACHED_RESPONSES:
+            self.responses.pop(next(iter(self.responses)))
+
+        self.responses[key] = body
+
+    @staticmethod
+    def _respond(request, body):
+        if body.etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers={"ETag": body.etag})
+
+        headers = {"ETag": body.etag, "Vary": "Accept-Encoding"}
+
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return web.Response(body=body.gzipped, content_type=body.content_type, headers=headers)
+
+        return web.Response(body=body.data, content_type=body.content_type, headers=headers)
+
+    @staticmethod
+    def _not_ready():
+        return web.Response(status=503, text="No data has been fetched yet, try again shortly")
+
+    @staticmethod
+    def _parse_time(value):
+        """
+        Returns:
+        datetime as naive UTC like the snapshot timestamps, or None. Timestamps with an offset are converted to UTC.
+        """
+        if not value:
+            return None
+
+        # fromisoformat doesn't accept the Z suffix before Python 3.11
+        parsed = datetime.datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+        return parsed
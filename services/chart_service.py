@@ -0,0 +1,131 @@
+import datetime
+import importlib.util
+import io
+import logging
+
+import numpy as np
+
+from collections import OrderedDict
+
+from services.metrics_service import MetricsService
+from services.worker_pool_service import WorkerPoolService
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+CHART_COLUMNS = {"Cases": 0, "Deaths": 1, "Recovered": 4}
+
+
+def render_chart(location, timestamps, counts):
+    """
+    Draws a location's counts over time. Kept at module level so it can run in any worker pool, and uses a bare
+    Figure rather than pyplot so nothing is shared between threads or needs a display.
+
+    Params:
+    location (str) -> the chart's title
+    timestamps (list of datetime) -> when each row of counts was taken
+    counts (ndarray) -> one row per timestamp, one column per entry in CHART_COLUMNS
+
+    Returns:
+    the chart as a PNG (bytes)
+    """
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(6, 3), dpi=100)
+    axes = figure.subplots()
+
+    for column, label in enumerate(CHART_COLUMNS):
+        axes.plot(timestamps, counts[:, column], label=label)
+
+    axes.set_title(location)
+    axes.legend(loc="upper left")
+    figure.autofmt_xdate()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+
+    return buffer.getvalue()
+
+
+class ChartService:
+    FILENAME = "chart.png"
+
+    def __init__(
+        self,
+        history_service,
+        worker_pool_service=None,
+        bucket_seconds=3600,
+        max_entries=128,
+        metrics_service=None,
+        logger=None,
+    ):
+        self.history_service = history_service
+        self.worker_pool_service = worker_pool_service if worker_pool_service else WorkerPoolService("thread")
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.cache = OrderedDict()
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec("matplotlib") is not None
+
+    def on_snapshot(self, snapshot, deltas):
+        changed = {delta.location.lower() for delta in deltas}
+
+        for key in [key for key in self.cache if key[0] in changed]:
+            del self.cache[key]
+
+    def trim(self):
+        self.cache.clear()
+
+    async def chart(self, location):
+        """
+        Returns a chart of a location's history, re-rendering it only once the location has changed or a new time
+        bucket has started
+
+        Params:
+        location (str) -> the location to chart (case-insensitive)
+
+        Returns:
+        the chart as a PNG (bytes), or None if the location isn't in the latest snapshot
+        """
+        latest = self.history_service.latest()
+
+        if latest is None or latest.find(location) is None:
+            return None
+
+        key = (location.strip().lower(), int((latest.timestamp - EPOCH).total_seconds() // self.bucket_seconds))
+
+        if key in self.cache:
+            self.metrics_service.increment("chart_cache_hits_total")
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        self.metrics_service.increment("chart_cache_misses_total")
+
+        timestamps, counts = self._series(location)
+        name = latest.locations[latest.find(location)]
+
+        with self.metrics_service.time("chart"):
+            chart = await self.worker_pool_service.run(render_chart, name, timestamps, counts)
+
+        self.cache[key] = chart
+
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+        return chart
+
+    def _series(self, location):
+        timestamps = []
+        rows = []
+
+        for snapshot in self.history_service.snapshots:
+            position = snapshot.find(location)
+
+            if position is not None:
+                timestamps.append(snapshot.timestamp)
+                rows.append(snapshot.counts[position, list(CHART_COLUMNS.values())])
+
+        return timestamps, np.array(rows, dtype=np.int64)
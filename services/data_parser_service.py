@@ -2,15 +2,26 @@ import pandas as pd
 
 from bs4 import BeautifulSoup
 
+from config import regions as regions_config
+from utils.data import remove_non_integers_from_string
+
+# Bump whenever a change to the parser changes its output for the same payload, so cached results are discarded
+PARSER_VERSION = 5
+
 
 class DataParserService:
     @staticmethod
     def create_dataframe_from_bno_data(raw_data):
         """
-        Parses the raw HTML gathered from BNO News and creates a DataFrame from it
+        Parses the raw HTML gathered from BNO News and creates a DataFrame from it. Every section of every tab is
+        kept, and the region (section) each row belongs to is stored in the DataFrame's attrs as a list of the same
+        length. The first tab holds the top level locations; rows of the other tabs break one of them down (e.g. a
+        country's states), so they always have their region added to their name and their parent - the top level
+        location named like their region or tab - is stored in attrs["parents"], with "" for top level rows.
+        The counts from each section's TOTAL row are stored in attrs too, by region.
 
         Params:
-        raw_data (str) -> request.data from BNO
+        raw_data (str or dict) -> request.data from BNO, or a dict of tab name to request.data
 
         Returns:
         DataFrame
@@ -25,29 +36,100 @@ class DataParserService:
             "Source",
         ]
 
+        tabs = list(raw_data.items()) if isinstance(raw_data, dict) else [("", raw_data)]
+
+        data = []
+        regions = []
+        parents = []
+        totals = {}
+        top_level = {}
+
+        for tab_index, (tab_name, tab) in enumerate(tabs):
+            rows, tab_totals = DataParserService._parse_sections(tab, len(COLUMNS) - 1)
+
+            for region, counts in tab_totals.items():
+                totals[region] = [a + b for a, b in zip(totals.get(region, [0] * len(counts)), counts)]
+
+            for region, data_row in rows:
+                name = data_row[0].strip()
+
+                if tab_index == 0:
+                    parent = ""
+
+                    # The same name in two sections of the top level tab is told apart by the later section's name
+                    if name.lower() in top_level:
+                        data_row[0] = f"{name} ({region.title()})"
+                    else:
+                        top_level[name.lower()] = name
+                else:
+                    parent = top_level.get(region.lower(), top_level.get(tab_name.lower(), region.title()))
+                    data_row[0] = f"{name} ({region.title()})"
+
+                data.append(data_row)
+                regions.append(region)
+                parents.append(parent)
+
+        dataframe = pd.DataFrame(data, columns=COLUMNS)
+        dataframe.attrs["regions"] = regions
+        dataframe.attrs["parents"] = parents
+        dataframe.attrs["totals"] = totals
+
+        return dataframe
+
+    @staticmethod
+    def _parse_sections(raw_data, count_columns):
+        """
+        Finds the data rows of one tab. A section starts with a row holding only its title in capitals (e.g. "OTHER
+        PLACES") and ends with its "TOTAL" row. Rows with a name but no counts yet are kept as locations, including
+        ones named by a capitalised alias (e.g. "UAE") inside an open section.
+
+        Params:
+        raw_data (str) -> the HTML of one tab
+        count_columns (int) -> how many cells to read from each row, up to and excluding the source
+
+        Returns:
+        (list of (region, row), dict of region to the counts in its TOTAL row)
+        """
         soup = BeautifulSoup(raw_data, features="html.parser")
 
         all_tr_rows = soup.find("tbody").findAll("tr")
 
-        data = []
-        data_active = False
+        aliases = {alias.lower() for alias in regions_config.ALIASES}
+
+        rows = []
+        totals = {}
+        region = None
 
         for tr_row in all_tr_rows:
             all_tds = tr_row.findAll("td")
 
             if not len(all_tds):
                 continue
-            elif all_tds[0].get_text() == "OTHER PLACES":
-                data_active = True
+
+            title = all_tds[0].get_text().strip()
+
+            if not title:
                 continue
-            elif all_tds[0].get_text() == "TOTAL":
-                data_active = False
+            elif title == "TOTAL":
+                if region:
+                    totals[region] = [
+                        int(remove_non_integers_from_string(td.get_text())) for td in all_tds[1:count_columns]
+                    ]
+
+                region = None
+                continue
+            elif (
+                title.isupper()
+                and not any(td.get_text().strip() for td in all_tds[1:])
+                and not (region and title.lower() in aliases)
+            ):
+                region = title
                 continue
 
-            if data_active:
-                data_row = [x.get_text() for x in all_tds[: len(COLUMNS) - 1]]
+            if region:
+                data_row = [x.get_text() for x in all_tds[:count_columns]]
 
-                # source_data = all_tds[len(COLUMNS) - 1].find("a")
+                # source_data = all_tds[count_columns].find("a")
 
                 # if source_data:
                 #     source = source_data["href"]
@@ -55,6 +137,6 @@ class DataParserService:
                 source = ""
 
                 data_row.append(source)
-                data.append(data_row)
+                rows.append((region, data_row))
 
-        return pd.DataFrame(data, columns=COLUMNS)
+        return rows, totals
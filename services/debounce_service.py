@@ -0,0 +1,49 @@
+from models.snapshot import LocationDelta
+
+
+class DebounceService:
+    def __init__(self, settle_window):
+        self.settle_window = settle_window
+        self.pending = {}
+
+    def add(self, deltas, timestamp):
+        """
+        Holds a cycle's deltas, merging them into any change already pending for the same location so that only
+        the earliest 'before' and the latest 'after' values are kept
+
+        Params:
+        deltas (list of LocationDelta) -> the changes since the previous snapshot
+        timestamp (datetime) -> when the changes were seen
+        """
+        for delta in deltas:
+            key = delta.location.lower()
+
+            if key in self.pending:
+                pending_delta, first_seen = self.pending[key]
+                self.pending[key] = (pending_delta._replace(after=delta.after, source=delta.source), first_seen)
+            else:
+                self.pending[key] = (delta, timestamp)
+
+    def flush(self, timestamp):
+        """
+        Releases changes that have been held for at least the settle window. Changes that were reverted while
+        held (the location ended up where it started) are dropped.
+
+        Params:
+        timestamp (datetime) -> the current time
+
+        Returns:
+        list of LocationDelta
+        """
+        settled = []
+
+        for key, (delta, first_seen) in list(self.pending.items()):
+            if (timestamp - first_seen).total_seconds() < self.settle_window:
+                continue
+
+            del self.pending[key]
+
+            if delta.before != delta.after:
+                settled.append(delta)
+
+        return settled
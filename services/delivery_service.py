@@ -0,0 +1,223 @@
+import asyncio
+import contextvars
+import datetime
+import discord
+import io
+import itertools
+import logging
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from services.metrics_service import MetricsService
+from utils.clock import Clock
+
+Attachment = namedtuple("Attachment", ["embed", "filename", "data"])
+
+# The batch being collected by the current task, if any - each task (e.g. each pipeline's update loop) has its own
+_batch = contextvars.ContextVar("delivery_batch", default=None)
+
+
+class DeliveryService:
+    HIGH_PRIORITY = 0
+    NORMAL_PRIORITY = 1
+    RETRY_DELAY = 5
+    MAX_RETRY_DELAY = 300
+
+    def __init__(
+        self, metrics_service=None, logger=None, send_cache_service=None, outbox_service=None, max_age=3600, clock=None
+    ):
+        self._queue = None
+        self.sequence = itertools.count()
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.send_cache_service = send_cache_service
+        self.outbox_service = outbox_service
+        self.max_age = max_age
+        self.clock = clock if clock else Clock()
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+
+            if self.outbox_service:
+                self._load_outbox()
+
+        return self._queue
+
+    @contextmanager
+    def batch(self, cycle=None):
+        """
+        Holds back messages this task enqueues inside the block, then stores them in the outbox in a single
+        transaction and queues them. If the block raises, none of them are sent. Batches aren't shared: other tasks
+        enqueueing meanwhile aren't held back, and a nested batch is committed on its own.
+
+        Params:
+        cycle (str) -> identifies the update cycle the messages are rendered for, so the send cache can tell a
+                       re-send of them from the same content in a later cycle
+        """
+        entries = []
+        token = _batch.set((self, entries))
+
+        try:
+            yield
+        finally:
+            _batch.reset(token)
+
+        self._put(entries, cycle)
+
+    def enqueue(self, channel_id, message, priority=NORMAL_PRIORITY):
+        """
+        Queues a message for delivery. Messages of a higher priority (lower number) are sent before anything
+        already waiting, messages of the same priority are sent in the order they were queued.
+
+        Params:
+        channel_id (int) -> the Discord channel to send to
+        message (str, discord.Embed or Attachment) -> the message to send
+        priority (int) -> HIGH_PRIORITY or NORMAL_PRIORITY
+        """
+        batch = _batch.get()
+
+        if batch is not None and batch[0] is self:
+            batch[1].append((channel_id, message, priority))
+        else:
+            self._put([(channel_id, message, priority)])
+
+    def _put(self, entries, cycle=None):
+        if not entries:
+            return
+
+        queued_at = self.clock.now()
+
+        # Messages queued outside an update cycle are only recognised when the same queued message is sent again
+        cycle = cycle if cycle is not None else queued_at.isoformat()
+
+        if self.outbox_service:
+            outbox_ids = self.outbox_service.add(entries, queued_at, cycle)
+        else:
+            outbox_ids = [None] * len(entries)
+
+        for (channel_id, message, priority), outbox_id in zip(entries, outbox_ids):
+            self.queue.put_nowait((priority, next(self.sequence), channel_id, message, outbox_id, queued_at, cycle, 0))
+
+        self.metrics_service.set_gauge("delivery_queue_depth", self.depth())
+
+    def _load_outbox(self):
+        resent = 0
+
+        for outbox_id, channel_id, message, priority, queued_at, cycle in self.outbox_service.pending():
+            if self._expired(queued_at):
+                self.metrics_service.increment("messages_expired_total")
+                self.outbox_service.ack(outbox_id)
+                continue
+
+            self._queue.put_nowait((priority, next(self.sequence), channel_id, message, outbox_id, queued_at, cycle, 0))
+            resent += 1
+
+        if resent:
+            self.logger.info(f"Resending {resent} message(s) left in the outbox")
+
+    def depth(self):
+        return self.queue.qsize()
+
+    async def run(self, discord_client):
+        while not discord_client.is_closed():
+            entry = await self.queue.get()
+            _, _, channel_id, message, outbox_id, queued_at, cycle, _ = entry
+            self.metrics_service.set_gauge("delivery_queue_depth", self.depth())
+
+            if self._expired(queued_at):
+                self.metrics_service.increment("messages_expired_total")
+                self.logger.warning(f"Dropped a message for channel {channel_id} that couldn't be sent in time")
+                self._ack(outbox_id)
+                self.queue.task_done()
+                continue
+
+            if self.send_cache_service and self.send_cache_service.is_duplicate(channel_id, message, cycle):
+                self.metrics_service.increment("duplicates_dropped_total")
+                self.logger.debug(f"Dropped a message already sent to channel {channel_id}")
+                self._ack(outbox_id)
+                self.queue.task_done()
+                continue
+
+            channel = discord_client.get_channel(channel_id)
+
+            if channel is None:
+                # The bot was removed from the server or the channel was deleted, so retrying won't help
+                self.metrics_service.increment("missing_channels_total")
+                self.logger.warning(f"Dropped a message for channel {channel_id}, which the bot can't see")
+                self._ack(outbox_id)
+                self.queue.task_done()
+                continue
+
+            try:
+                with self.metrics_service.time("send"):
+                    await self._send(channel, message)
+
+                self.metrics_service.increment("messages_sent_total")
+
+                if self.send_cache_service:
+                    self.send_cache_service.record(channel_id, message, cycle)
+
+                self._ack(outbox_id)
+            except discord.HTTPException as he:
+                if he.status == 429:
+                    self.metrics_service.increment("rate_limited_total")
+
+                if he.status == 429 or he.status >= 500:
+                    self._retry(entry)
+                else:
+                    # Retrying won't help with a missing channel or permissions, only rate limits and server errors
+                    self._ack(outbox_id)
+
+                self.metrics_service.increment("send_errors_total")
+                self.logger.error(f"Failed to send message to channel {channel_id} - {str(he)}")
+            except asyncio.CancelledError:
+                # A subclass of Exception before Python 3.8, and it has to stop the task when the bot shuts down
+                raise
+            except Exception:
+                # Connection errors and the like shouldn't stop delivery to every other channel. Discord may have
+                # accepted the message before the connection failed, so with a send cache it counts as sent, and the
+                # retry (or any other copy of it) is only sent once the window has passed.
+                if self.send_cache_service:
+                    self.send_cache_service.record(channel_id, message, cycle)
+
+                self._retry(entry)
+                self.metrics_service.increment("send_errors_total")
+                self.logger.exception(f"Unexpected error sending message to channel {channel_id}")
+            finally:
+                self.queue.task_done()
+
+    def _retry(self, entry):
+        """
+        Puts a message back in the queue after an exponentially growing delay. It keeps its place in the order, and
+        stays in the outbox in case the bot stops before it's sent.
+        """
+        priority, sequence, channel_id, message, outbox_id, queued_at, cycle, attempts = entry
+        delay = min(self.RETRY_DELAY * 2 ** attempts, self.MAX_RETRY_DELAY)
+
+        self.metrics_service.increment("send_retries_total")
+        asyncio.get_running_loop().call_later(
+            delay,
+            self.queue.put_nowait,
+            (priority, sequence, channel_id, message, outbox_id, queued_at, cycle, attempts + 1),
+        )
+
+    def _expired(self, queued_at):
+        if not self.max_age:
+            return False
+
+        return queued_at is None or self.clock.now() - queued_at > datetime.timedelta(seconds=self.max_age)
+
+    def _ack(self, outbox_id):
+        if self.outbox_service and outbox_id is not None:
+            self.outbox_service.ack(outbox_id)
+
+    async def _send(self, channel, message):
+        if type(message) == Attachment:
+            await channel.send(embed=message.embed, file=discord.File(io.BytesIO(message.data), message.filename))
+        elif type(message) == discord.Embed:
+            await channel.send(embed=message)
+        else:
+            await channel.send(message)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import time
+
+from aiohttp import web
+from collections import deque
+
+from models.snapshot import COUNT_COLUMNS
+from services.metrics_service import MetricsService
+
+
+class FeedService:
+    KEEPALIVE_SECONDS = 15
+
+    def __init__(self, buffer_size=1000, client_buffer=100, epoch=None, metrics_service=None, logger=None):
+        self.events = deque(maxlen=buffer_size)
+        self.client_buffer = client_buffer
+        # Sequences restart with the process, so event ids carry the epoch they were numbered in
+        self.epoch = epoch if epoch else int(time.time())
+        self.sequence = 0
+        self.clients = set()
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def on_snapshot(self, snapshot, deltas):
+        """
+        Serialises a cycle's changes once as a Server-Sent Event and hands it to every connected client. A client
+        whose buffer is full is cut off rather than slowing everyone else down, and can resume from its last event.
+        """
+        if not deltas:
+            return
+
+        self.sequence += 1
+
+        changes = [
+            {
+                "location": delta.location,
+                "before": self._counts(delta.before),
+                "after": self._counts(delta.after),
+                "source": delta.source,
+            }
+            for delta in deltas
+        ]
+        timestamp = snapshot.timestamp.isoformat() if snapshot.timestamp else None
+        data = json.dumps({"epoch": self.epoch, "sequence": self.sequence, "timestamp": timestamp, "changes": changes})
+        event_id = f"{self.epoch}-{self.sequence}"
+
+        event = (self.sequence, f"id: {event_id}\nevent: changes\ndata: {data}\n\n".encode())
+        self.events.append(event)
+
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._disconnect(queue)
+
+    def replay(self, last_sequence):
+        """
+        Params:
+        last_sequence (int) -> the last event a reconnecting client received
+
+        Returns:
+        list of (sequence, event) the client missed, or None if some of them are no longer buffered or the client is
+        ahead of this process
+        """
+        if last_sequence > self.sequence:
+            return None
+
+        if last_sequence == self.sequence:
+            return []
+
+        if not self.events or self.events[0][0] > last_sequence + 1:
+            return None
+
+        return [event for event in self.events if event[0] > last_sequence]
+
+    async def serve(self, port, host="127.0.0.1"):
+        app = web.Application()
+        app.router.add_get("/feed", self._handle_feed)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+
+        self.logger.info(f"Serving the change feed on http://{host}:{port}/feed")
+
+    async def _handle_feed(self, request):
+        last_sequence = self._parse_event_id(request.headers.get("Last-Event-ID", request.query.get("since")))
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        # Registered before replaying, so nothing published in between is missed
+        queue = asyncio.Queue(maxsize=self.client_buffer)
+        self.clients.add(queue)
+        self.metrics_service.set_gauge("feed_clients", len(self.clients))
+
+        try:
+            missed = self.replay(last_sequence) if last_sequence is not None else None
+
+            if missed is None:
+                await response.write(b"event: reset\ndata: {}\n\n")
+                last_sequence = self.sequence
+                missed = []
+
+            for sequence, event in missed:
+                last_sequence = sequence
+                await response.write(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+
+                if event is None:
+                    break
+
+                if event[0] > last_sequence:
+                    await response.write(event[1])
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(queue)
+            self.metrics_service.set_gauge("feed_clients", len(self.clients))
+
+        return response
+
+    def _parse_event_id(self, event_id):
+        """
+        Returns:
+        int -> the sequence of the last event the client received, this process' current sequence if the client
+        didn't send one, or None if it's from another process (e.g. before a restart) and can't be resumed from
+        """
+        if event_id is None:
+            return self.sequence
+
+        epoch, _, sequence = event_id.partition("-")
+
+        if epoch != str(self.epoch) or not sequence.isdigit():
+            return None
+
+        return int(sequence)
+
+    def _disconnect(self, queue):
+        while not queue.empty():
+            queue.get_nowait()
+
+        queue.put_nowait(None)
+        self.clients.discard(queue)
+
+        self.metrics_service.increment("feed_slow_clients_total")
+        self.metrics_service.set_gauge("feed_clients", len(self.clients))
+        self.logger.warning("Disconnected a change feed client that fell too far behind")
+
+    @staticmethod
+    def _counts(counts):
+        if counts is None:
+            return None
+
+        return dict(zip([column.lower() for column in COUNT_COLUMNS], counts))
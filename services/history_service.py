@@ -0,0 +1,26 @@
+from collections import deque
+
+
+class HistoryService:
+    def __init__(self, size=288):
+        self.snapshots = deque(maxlen=size)
+
+    def on_snapshot(self, snapshot, deltas):
+        self.snapshots.append(snapshot)
+
+    def latest(self):
+        return self.snapshots[-1] if self.snapshots else None
+
+    def at_or_before(self, timestamp):
+        """
+        Params:
+        timestamp (datetime) -> the point in time to look back to
+
+        Returns:
+        the most recent Snapshot taken at or before the timestamp, or None if history doesn't reach that far
+        """
+        for snapshot in reversed(self.snapshots):
+            if snapshot.timestamp <= timestamp:
+                return snapshot
+
+        return None
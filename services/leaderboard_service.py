@@ -0,0 +1,64 @@
+from bisect import bisect_left, insort
+
+from models.snapshot import COUNT_COLUMNS
+
+
+class LeaderboardService:
+    METRICS = [column.lower() for column in COUNT_COLUMNS]
+
+    def __init__(self):
+        self.rankings = {metric: [] for metric in self.METRICS}
+        self.counts = {}
+        self.totals = [0] * len(self.METRICS)
+
+    def on_snapshot(self, snapshot, deltas):
+        """
+        Applies a cycle's deltas to the rankings and totals, without re-sorting unchanged locations. Only top level
+        locations are ranked and counted, as the locations breaking them down are already part of their counts.
+
+        Params:
+        snapshot (Snapshot) -> the latest snapshot, used to tell top level locations apart
+        deltas (list of LocationDelta) -> the changes since the previous snapshot
+        """
+        for delta in deltas:
+            self._remove(delta.location)
+
+            if delta.after is not None and snapshot.is_top_level(delta.location):
+                self._insert(delta.location, delta.after)
+
+    def top(self, metric, count):
+        """
+        Params:
+        metric (str) -> one of cases, deaths, serious, critical or recovered
+        count (int) -> how many locations to return
+
+        Returns:
+        list of (location, count) tuples, highest first
+        """
+        return [(location, -negated) for negated, _, location in self.rankings[metric][:count]]
+
+    def total(self, metric):
+        return self.totals[self.METRICS.index(metric)]
+
+    def _insert(self, location, counts):
+        # Keyed like the snapshot's index, so a location whose casing changes replaces its old entry
+        key = location.lower()
+
+        for metric, count in zip(self.METRICS, counts):
+            insort(self.rankings[metric], (-count, key, location))
+
+        self.counts[key] = counts
+        self.totals = [total + count for total, count in zip(self.totals, counts)]
+
+    def _remove(self, location):
+        key = location.lower()
+        counts = self.counts.pop(key, None)
+
+        if counts is None:
+            return
+
+        for metric, count in zip(self.METRICS, counts):
+            ranking = self.rankings[metric]
+            del ranking[bisect_left(ranking, (-count, key))]
+
+        self.totals = [total - count for total, count in zip(self.totals, counts)]
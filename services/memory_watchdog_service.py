@@ -0,0 +1,129 @@
+import gc
+import logging
+import os
+import tracemalloc
+
+import numpy as np
+
+from collections import deque
+
+from services.metrics_service import MetricsService
+from utils.clock import Clock
+
+MEGABYTE = 1024 * 1024
+
+
+class MemoryWatchdogService:
+    EXIT_CODE = 3
+    TOP_ALLOCATIONS = 10
+
+    def __init__(
+        self,
+        sample_every=10,
+        soft_limit_mb=None,
+        hard_limit_mb=None,
+        trimmables=None,
+        persist=None,
+        metrics_service=None,
+        clock=None,
+        logger=None,
+    ):
+        if sample_every < 1:
+            raise ValueError(f"Memory usage must be sampled at least every cycle, got sample_every={sample_every}")
+
+        self.sample_every = sample_every
+        self.soft_limit_mb = soft_limit_mb
+        self.hard_limit_mb = hard_limit_mb
+        self.trimmables = trimmables if trimmables else []
+        self.persist = persist
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.clock = clock if clock else Clock()
+        self.samples = deque(maxlen=100)
+        self.cycles = 0
+        self.tracing = False
+        self.above_soft_limit = False
+        self.exit_code = 0
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def on_cycle(self):
+        """
+        Samples memory usage every sample_every cycles, trimming caches past the soft limit and persisting state
+        past the hard limit. Crossing the soft limit also traces allocations until the next sample, which logs where
+        the memory went in between - tracing for longer would add to the memory use it's meant to explain, so it
+        isn't traced again until usage has dropped below the soft limit and crossed it again
+
+        Returns:
+        bool -> True if the hard limit has been exceeded and the bot should shut down
+        """
+        self.cycles += 1
+
+        if self.cycles % self.sample_every:
+            return False
+
+        rss_mb = self.read_rss() / MEGABYTE
+        self.samples.append((self.clock.monotonic(), rss_mb))
+        self.metrics_service.set_gauge("rss_bytes", int(rss_mb * MEGABYTE))
+
+        self.logger.info(f"Memory usage is {rss_mb:.1f}MB ({self._growth_per_hour():+.1f}MB/hour)")
+
+        if self.tracing:
+            for statistic in tracemalloc.take_snapshot().statistics("lineno")[: self.TOP_ALLOCATIONS]:
+                self.logger.info(f"Top allocation: {statistic}")
+
+            tracemalloc.stop()
+            self.tracing = False
+
+        if self.hard_limit_mb and rss_mb > self.hard_limit_mb:
+            self.logger.critical(f"Memory usage is above the hard limit of {self.hard_limit_mb}MB - shutting down")
+
+            if self.persist:
+                self.persist()
+
+            self.exit_code = self.EXIT_CODE
+            return True
+
+        if self.soft_limit_mb and rss_mb > self.soft_limit_mb:
+            self.logger.warning(f"Memory usage is above the soft limit of {self.soft_limit_mb}MB - trimming caches")
+            self.trim()
+
+            if not self.above_soft_limit and not tracemalloc.is_tracing():
+                self.logger.info("Tracing allocations until the next sample")
+                tracemalloc.start()
+                self.tracing = True
+
+            self.above_soft_limit = True
+        else:
+            self.above_soft_limit = False
+
+        return False
+
+    def trim(self):
+        for trimmable in self.trimmables:
+            trimmable.trim()
+
+        gc.collect()
+
+    @staticmethod
+    def read_rss():
+        """
+        Returns:
+        the current resident set size in bytes, or the peak resident set size where that isn't available
+        """
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            import resource
+
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _growth_per_hour(self):
+        if len(self.samples) < 2:
+            return 0.0
+
+        times, sizes = zip(*self.samples)
+
+        if times[-1] == times[0]:
+            return 0.0
+
+        return float(np.polyfit(times, sizes, 1)[0] * 3600)
@@ -0,0 +1,115 @@
+import logging
+import time
+
+from aiohttp import web
+from bisect import bisect_left
+from contextlib import contextmanager
+
+PREFIX = "coronavirus_bot"
+
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+class Histogram:
+    def __init__(self, buckets=None):
+        self.buckets = buckets if buckets else DEFAULT_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsService:
+    def __init__(self, logger=None):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+
+        self.histograms[key].observe(value)
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Records how long the wrapped block takes in the stage duration histogram
+
+        Params:
+        stage (str) -> the name of the stage, e.g. fetch, parse, diff, render or send
+        """
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - started, stage=stage)
+
+    def render(self):
+        """
+        Returns:
+        all metrics in the Prometheus text exposition format (str)
+        """
+        lines = []
+
+        for metric_type, metrics in [("counter", self.counters), ("gauge", self.gauges)]:
+            for name in sorted({name for name, _ in metrics}):
+                lines.append(f"# TYPE {PREFIX}_{name} {metric_type}")
+
+                for (metric_name, labels), value in sorted(metrics.items()):
+                    if metric_name == name:
+                        lines.append(f"{PREFIX}_{name}{self._format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+
+            for (metric_name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if metric_name != name:
+                    continue
+
+                cumulative = 0
+
+                for bucket, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    bucket_labels = self._format_labels(labels + (("le", str(bucket)),))
+                    lines.append(f"{PREFIX}_{name}_bucket{bucket_labels} {cumulative}")
+
+                lines.append(f"{PREFIX}_{name}_sum{self._format_labels(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}_{name}_count{self._format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port, host="127.0.0.1"):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+
+        self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def _handle_metrics(self, request):
+        return web.Response(text=self.render(), content_type="text/plain")
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ""
+
+        return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
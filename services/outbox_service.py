@@ -0,0 +1,149 @@
+import base64
+import datetime
+import json
+import logging
+import sqlite3
+
+import discord
+
+from services.delivery_service import Attachment
+
+
+class OutboxService:
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, channel_id INTEGER, priority INTEGER, message TEXT, queued_at TEXT, "
+            "cycle TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sent ("
+            "channel_id INTEGER, fingerprint TEXT, sent_at REAL, PRIMARY KEY (channel_id, fingerprint))"
+        )
+
+        # Outboxes written before messages had an age get the column, and their messages count as too old to send
+        columns = [column[1] for column in self.connection.execute("PRAGMA table_info(outbox)")]
+
+        if "queued_at" not in columns:
+            self.connection.execute("ALTER TABLE outbox ADD COLUMN queued_at TEXT")
+
+        if "cycle" not in columns:
+            self.connection.execute("ALTER TABLE outbox ADD COLUMN cycle TEXT")
+
+        self.connection.commit()
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def add(self, entries, queued_at, cycle=None):
+        """
+        Stores messages for delivery in a single transaction
+
+        Params:
+        entries (list of (channel_id, message, priority)) -> the messages to store
+        queued_at (datetime) -> when they were queued, so they can be dropped rather than sent too late
+        cycle (str) -> the update cycle the messages were rendered in, used to recognise re-sends
+
+        Returns:
+        list of int, the outbox id of each message
+        """
+        ids = []
+
+        with self.connection:
+            for channel_id, message, priority in entries:
+                cursor = self.connection.execute(
+                    "INSERT INTO outbox (channel_id, priority, message, queued_at, cycle) VALUES (?, ?, ?, ?, ?)",
+                    (channel_id, priority, self.encode(message), queued_at.isoformat(), cycle),
+                )
+                ids.append(cursor.lastrowid)
+
+        return ids
+
+    def ack(self, outbox_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM outbox WHERE id = ?", (outbox_id,))
+
+    def pending(self):
+        """
+        Returns:
+        list of (outbox_id, channel_id, message, priority, queued_at, cycle) that were stored but never acknowledged,
+        oldest first. queued_at and cycle are None for messages stored before they were recorded.
+        """
+        rows = self.connection.execute(
+            "SELECT id, channel_id, priority, message, queued_at, cycle FROM outbox ORDER BY id"
+        ).fetchall()
+
+        return [
+            (
+                outbox_id,
+                channel_id,
+                self.decode(message),
+                priority,
+                datetime.datetime.fromisoformat(queued_at) if queued_at else None,
+                cycle,
+            )
+            for outbox_id, channel_id, priority, message, queued_at, cycle in rows
+        ]
+
+    def record_sent(self, channel_id, fingerprint, sent_at, expire_before):
+        """
+        Stores the fingerprint of a message sent to a channel, and forgets the channel's fingerprints that are too
+        old to matter, so the send cache survives a crash
+
+        Params:
+        channel_id (int) -> the channel the message was sent to
+        fingerprint (str) -> the message's fingerprint, as made by the SendCacheService
+        sent_at (float) -> when it was sent (in seconds since the epoch)
+        expire_before (float) -> fingerprints sent at or before this are removed
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sent (channel_id, fingerprint, sent_at) VALUES (?, ?, ?)",
+                (channel_id, fingerprint, sent_at),
+            )
+            self.connection.execute(
+                "DELETE FROM sent WHERE channel_id = ? AND sent_at <= ?", (channel_id, expire_before)
+            )
+
+    def sent_since(self, since):
+        """
+        Returns:
+        list of (channel_id, fingerprint, sent_at) for messages sent since the given time, oldest first
+        """
+        return self.connection.execute(
+            "SELECT channel_id, fingerprint, sent_at FROM sent WHERE sent_at > ? ORDER BY sent_at", (since,)
+        ).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def encode(message):
+        if type(message) == Attachment:
+            return json.dumps(
+                {
+                    "type": "attachment",
+                    "embed": message.embed.to_dict(),
+                    "filename": message.filename,
+                    "data": base64.b64encode(message.data).decode(),
+                }
+            )
+        elif type(message) == discord.Embed:
+            return json.dumps({"type": "embed", "embed": message.to_dict()})
+
+        return json.dumps({"type": "text", "text": message})
+
+    @staticmethod
+    def decode(encoded):
+        message = json.loads(encoded)
+
+        if message["type"] == "attachment":
+            return Attachment(
+                discord.Embed.from_dict(message["embed"]), message["filename"], base64.b64decode(message["data"])
+            )
+        elif message["type"] == "embed":
+            return discord.Embed.from_dict(message["embed"])
+
+        return message["text"]
@@ -0,0 +1,109 @@
+import asyncio
+import copy
+import hashlib
+
+from collections import OrderedDict
+
+from services.data_parser_service import PARSER_VERSION
+from services.metrics_service import MetricsService
+
+
+class ParseCacheService:
+    def __init__(self, max_entries=8, metrics_service=None):
+        self.max_entries = max_entries
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.entries = OrderedDict()
+        self.in_flight = {}
+
+    @staticmethod
+    def fingerprint(raw_data):
+        """
+        Params:
+        raw_data (str or dict) -> a payload returned by the gateway
+
+        Returns:
+        a hash of the payload and the parser version (str)
+        """
+        digest = hashlib.blake2b(f"parser-{PARSER_VERSION}".encode(), digest_size=16)
+        tabs = raw_data.items() if isinstance(raw_data, dict) else [("", raw_data)]
+
+        for name, html in tabs:
+            digest.update(b"\0" + name.encode() + b"\0")
+            digest.update(html.encode("utf-8", "surrogatepass"))
+
+        return digest.hexdigest()
+
+    def get(self, key, timestamp):
+        """
+        Params:
+        key (str) -> the payload's fingerprint
+        timestamp (datetime) -> when the payload was fetched
+
+        Returns:
+        (DataFrame, Snapshot) parsed from an identical payload, with the snapshot stamped with the given timestamp, or
+        None if the payload hasn't been parsed recently
+        """
+        if key not in self.entries:
+            self.metrics_service.increment("parse_cache_misses_total")
+            return None
+
+        self.metrics_service.increment("parse_cache_hits_total")
+        self.entries.move_to_end(key)
+
+        data, snapshot = self.entries[key]
+
+        return data, self._restamp(snapshot, timestamp)
+
+    @staticmethod
+    def _restamp(snapshot, timestamp):
+        # A shallow copy shares the counts and the index, which are never modified after parsing
+        snapshot = copy.copy(snapshot)
+        snapshot.timestamp = timestamp
+
+        return snapshot
+
+    async def get_or_parse(self, key, timestamp, parse):
+        """
+        Returns the cached result for a payload, parsing it if needed. Pipelines asking for a payload that is already
+        being parsed wait for that parse rather than starting their own.
+
+        Params:
+        key (str) -> the payload's fingerprint
+        timestamp (datetime) -> when the payload was fetched
+        parse (function) -> a coroutine function that parses the payload into (DataFrame, Snapshot)
+
+        Returns:
+        (DataFrame, Snapshot)
+        """
+        cached = self.get(key, timestamp)
+
+        if cached:
+            return cached
+
+        if key not in self.in_flight:
+            self.in_flight[key] = asyncio.ensure_future(self._parse(key, parse))
+            return await asyncio.shield(self.in_flight[key])
+
+        data, snapshot = await asyncio.shield(self.in_flight[key])
+
+        return data, self._restamp(snapshot, timestamp)
+
+    async def _parse(self, key, parse):
+        try:
+            data, snapshot = await parse()
+        finally:
+            del self.in_flight[key]
+
+        self.put(key, data, snapshot)
+
+        return data, snapshot
+
+    def put(self, key, data, snapshot):
+        self.entries[key] = (data, snapshot)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def trim(self):
+        self.entries.clear()
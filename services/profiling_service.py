@@ -0,0 +1,134 @@
+import contextvars
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+
+from contextlib import contextmanager
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_CONTEXT = _NullContext()
+
+# Whether the current task's cycle is the one being profiled - pipelines' cycles overlap, but only one is profiled
+_profiling = contextvars.ContextVar("profiling_cycle", default=False)
+
+
+class ProfilingService:
+    TOP_FUNCTIONS = 40
+    TOP_ALLOCATIONS = 15
+
+    def __init__(self, output_directory="profiles", max_profiles=20, logger=None):
+        self.output_directory = output_directory
+        self.max_profiles = max_profiles
+        self.remaining_cycles = 0
+        self.profiler = None
+        self.stage_snapshots = []
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def request(self, cycles):
+        """
+        Profiles the next cycles of the update loop
+
+        Params:
+        cycles (int) -> how many cycles to profile
+        """
+        self.remaining_cycles = cycles
+        self.logger.info(f"Profiling the next {cycles} cycle(s), output will be written to {self.output_directory}")
+
+    def cycle(self):
+        if not self.remaining_cycles or self.profiler is not None:
+            return NULL_CONTEXT
+
+        return self._profile_cycle()
+
+    def stage(self, name):
+        if self.profiler is None or not _profiling.get():
+            return NULL_CONTEXT
+
+        return self._snapshot_stage(name)
+
+    @contextmanager
+    def _profile_cycle(self):
+        self.remaining_cycles -= 1
+        self.stage_snapshots = []
+        self.profiler = cProfile.Profile()
+
+        already_tracing = tracemalloc.is_tracing()
+
+        if not already_tracing:
+            tracemalloc.start()
+
+        self.stage_snapshots.append(("start", tracemalloc.take_snapshot()))
+        self.profiler.enable()
+        token = _profiling.set(True)
+
+        try:
+            yield
+        finally:
+            _profiling.reset(token)
+            self.profiler.disable()
+
+            if not already_tracing:
+                tracemalloc.stop()
+
+            try:
+                self._dump()
+            except OSError as ose:
+                self.logger.error(f"Failed to write profile - {str(ose)}")
+
+            self.profiler = None
+            self.stage_snapshots = []
+
+    @contextmanager
+    def _snapshot_stage(self, name):
+        try:
+            yield
+        finally:
+            self.stage_snapshots.append((name, tracemalloc.take_snapshot()))
+
+    def _dump(self):
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        name = f"profile-{datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}"
+        path = os.path.join(self.output_directory, name)
+
+        self.profiler.dump_stats(f"{path}.prof")
+
+        report = io.StringIO()
+        pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(self.TOP_FUNCTIONS)
+
+        for (_, previous), (stage, current) in zip(self.stage_snapshots, self.stage_snapshots[1:]):
+            report.write(f"\nTop allocations during stage '{stage}':\n")
+
+            for statistic in current.compare_to(previous, "lineno")[: self.TOP_ALLOCATIONS]:
+                report.write(f"{statistic}\n")
+
+        with open(f"{path}.txt", "w") as report_file:
+            report_file.write(report.getvalue())
+
+        self.logger.info(f"Profile written to {path}.prof and {path}.txt")
+
+        self._rotate()
+
+    def _rotate(self):
+        profiles = sorted(
+            os.path.join(self.output_directory, f)
+            for f in os.listdir(self.output_directory)
+            if f.startswith("profile-") and f.endswith(".prof")
+        )
+
+        for profile in profiles[: -self.max_profiles]:
+            for path in [profile, profile[: -len(".prof")] + ".txt"]:
+                if os.path.exists(path):
+                    os.remove(path)
@@ -0,0 +1,182 @@
+import logging
+import time
+
+import discord
+import numpy as np
+
+from collections import deque
+
+from config import embed as embed_config
+from models.snapshot import COUNT_COLUMNS
+
+
+class QueryService:
+    COMMAND_PREFIX = "!"
+    LATENCY_SAMPLES = 1000
+    LATENCY_REPORT_EVERY = 100
+
+    def __init__(self, leaderboard_service=None, region_service=None, logger=None):
+        self.leaderboard_service = leaderboard_service
+        self.region_service = region_service
+        self.snapshot = None
+        self.embed_cache = {}
+        self.latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self.queries_served = 0
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def on_snapshot(self, snapshot, deltas):
+        # Embeds are only rebuilt when a changed location is next queried, not for every change in every cycle
+        for delta in deltas:
+            self.embed_cache.pop(delta.location.lower(), None)
+
+        self.snapshot = snapshot
+
+    def trim(self):
+        self.embed_cache.clear()
+
+    def handle_command(self, content):
+        """
+        Answers a query command from the in-memory index, never touching BNO
+
+        Params:
+        content (str) -> the raw message content
+
+        Returns:
+        discord.Embed, str or None if the message isn't a query command
+        """
+        if not content.startswith(self.COMMAND_PREFIX):
+            return None
+
+        started = time.perf_counter()
+
+        command, _, argument = content[len(self.COMMAND_PREFIX) :].partition(" ")
+        argument = argument.strip()
+
+        if command == "covid":
+            response = self.location(argument) if argument else "Usage: `!covid <location>`"
+        elif command == "top":
+            response = self._top_command(argument)
+        elif command == "total":
+            response = self.total()
+        elif command == "region" and self.region_service:
+            response = self.region(argument) if argument else "Usage: `!region <region or continent>`"
+        else:
+            return None
+
+        self._record_latency(time.perf_counter() - started)
+
+        return response
+
+    def location(self, name):
+        if self.snapshot is None:
+            return "No data has been fetched yet, try again shortly"
+
+        position = self.snapshot.find(name)
+
+        if position is None and self.region_service:
+            position = self.snapshot.find(self.region_service.resolve(name))
+
+        if position is None:
+            return f"No data found for **{name}**"
+
+        key = self.snapshot.locations[position].lower()
+
+        if key not in self.embed_cache:
+            self.embed_cache[key] = self._make_location_embed(self.snapshot.locations[position])
+
+        return self.embed_cache[key]
+
+    def top(self, count, metric="cases"):
+        if self.snapshot is None:
+            return "No data has been fetched yet, try again shortly"
+
+        count = max(1, min(count, 25))
+
+        if self.leaderboard_service:
+            ranking = self.leaderboard_service.top(metric, count)
+        else:
+            top_level = np.flatnonzero(self.snapshot.top_level)
+            column = self.snapshot.counts[:, [c.lower() for c in COUNT_COLUMNS].index(metric)]
+            positions = top_level[np.argsort(-column[top_level], kind="stable")[:count]]
+            ranking = [(self.snapshot.locations[position], column[position]) for position in positions]
+
+        lines = [
+            f"{rank}. **{location}** - {value} {metric}" for rank, (location, value) in enumerate(ranking, start=1)
+        ]
+
+        return "\n".join(lines)
+
+    def total(self):
+        if self.snapshot is None:
+            return "No data has been fetched yet, try again shortly"
+
+        if self.leaderboard_service:
+            totals = self.leaderboard_service.totals
+        else:
+            totals = self.snapshot.total()
+
+        return ", ".join(f"{column}: {int(count)}" for column, count in zip(COUNT_COLUMNS, totals))
+
+    def region(self, name):
+        if self.snapshot is None:
+            return "No data has been fetched yet, try again shortly"
+
+        rollup = self.region_service.rollup(name)
+
+        if rollup is None:
+            return f"No region or continent found called **{name}**"
+
+        group, totals, locations = rollup
+        counts = ", ".join(f"{column}: {count}" for column, count in zip(COUNT_COLUMNS, totals))
+
+        return f"**{group}** ({locations} locations) - {counts}"
+
+    def _top_command(self, argument):
+        count = 10
+        metric = "cases"
+
+        for part in argument.lower().split():
+            if part.isdigit():
+                count = int(part)
+            elif part in [c.lower() for c in COUNT_COLUMNS]:
+                metric = part
+            else:
+                return "Usage: `!top [n] [cases|deaths|serious|critical|recovered]`"
+
+        return self.top(count, metric)
+
+    def latency_percentile(self, percentile):
+        if not self.latencies:
+            return 0.0
+
+        return float(np.percentile(self.latencies, percentile))
+
+    def _record_latency(self, seconds):
+        self.latencies.append(seconds)
+        self.queries_served += 1
+
+        if self.queries_served % self.LATENCY_REPORT_EVERY == 0:
+            self.logger.info(
+                f"Served {self.queries_served} queries, p99 response time {self.latency_percentile(99) * 1000:.3f}ms"
+            )
+
+    def _make_location_embed(self, location):
+        counts = dict(zip(COUNT_COLUMNS, self.snapshot.row(location)))
+        position = self.snapshot.find(location)
+
+        embed = discord.Embed(
+            title=f"Coronavirus (COVID-19) statistics for **{location}**",
+            url=self.snapshot.sources[position],
+            timestamp=self.snapshot.timestamp,
+            colour=embed_config.EMBED_COLOUR,
+        )
+
+        embed.set_author(**embed_config.EMBED_AUTHOR)
+
+        if embed_config.FLAG_THUMBNAIL_URL_MAPPER.get(location):
+            embed.set_thumbnail(url=embed_config.FLAG_THUMBNAIL_URL_MAPPER[location])
+
+        for field in embed_config.EMBED_FIELDS:
+            embed.add_field(**embed_config.EMBED_FIELDS[field], value=f"{counts[field.capitalize()]}")
+
+        return embed
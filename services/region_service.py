@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+from config import regions as regions_config
+
+LocationMetadata = namedtuple("LocationMetadata", ["location", "region", "continent", "aliases", "parent"])
+
+
+class RegionService:
+    def __init__(self, continents=None, aliases=None):
+        continents = continents if continents else regions_config.CONTINENTS
+        aliases = aliases if aliases else regions_config.ALIASES
+
+        self.continents = {
+            location.lower(): continent for continent, locations in continents.items() for location in locations
+        }
+        self.aliases = {alias.lower(): location for alias, location in aliases.items()}
+        self.other_names = {}
+
+        for alias, location in aliases.items():
+            self.other_names.setdefault(location.lower(), []).append(alias)
+
+        self.index = {}
+        self.counts = {}
+        self.rollups = {}
+        self.members = {}
+        self.groups = {}
+
+    def on_snapshot(self, snapshot, deltas):
+        """
+        Applies a cycle's deltas to the rollups, moving only the changed locations' counts in and out of their region
+        and continent totals rather than summing every row again. Locations breaking another one down (e.g. a
+        country's states) only count towards their own region, as their parent already counts towards its continent.
+
+        Params:
+        snapshot (Snapshot) -> the latest snapshot, used to look up the region of new locations
+        deltas (list of LocationDelta) -> the changes since the previous snapshot
+        """
+        for delta in deltas:
+            self._remove(delta.location)
+
+            if delta.after is not None:
+                self._insert(delta.location, delta.after, snapshot)
+
+    def resolve(self, name):
+        """
+        Params:
+        name (str) -> a location, region or continent, or another name for one of them
+
+        Returns:
+        str -> the name BNO uses, or the name as given if it isn't an alias
+        """
+        name = name.strip()
+
+        return self.aliases.get(name.lower(), name)
+
+    def metadata(self, location):
+        """
+        Returns:
+        LocationMetadata for a location (or one of its aliases) seen in a snapshot, or None
+        """
+        return self.index.get(self.resolve(location).lower())
+
+    def rollup(self, group):
+        """
+        Params:
+        group (str) -> a region or continent, case-insensitive
+
+        Returns:
+        (name, counts, locations) -> the group's name, its summed counts and how many locations are in it, or None
+        """
+        name = self.groups.get(self.resolve(group).lower())
+
+        if name is None:
+            return None
+
+        return name, tuple(self.rollups[name]), len(self.members[name])
+
+    def continent_of(self, location, region="", parent=""):
+        """
+        Returns:
+        str -> the continent of the location's parent, or of the region it's in (e.g. a country's states), or of the
+        location itself
+        """
+        for name in [parent, region, location]:
+            if name.lower() in self.continents:
+                return self.continents[name.lower()]
+
+        return ""
+
+    def _insert(self, location, counts, snapshot):
+        position = snapshot.find(location)
+        region = snapshot.regions[position].title() if position is not None else ""
+        parent = snapshot.parents[position] if position is not None else ""
+        continent = self.continent_of(location, region, parent)
+        aliases = tuple(self.other_names.get(location.lower(), []))
+
+        self.index[location.lower()] = LocationMetadata(location, region, continent, aliases, parent)
+        self.counts[location.lower()] = counts
+
+        for group in self._groups(self.index[location.lower()]):
+            self.groups[group.lower()] = group
+            self.members.setdefault(group, set()).add(location.lower())
+            self.rollups[group] = [
+                total + count for total, count in zip(self.rollups.get(group, [0] * len(counts)), counts)
+            ]
+
+    def _remove(self, location):
+        metadata = self.index.pop(location.lower(), None)
+
+        if metadata is None:
+            return
+
+        counts = self.counts.pop(location.lower())
+
+        for group in self._groups(metadata):
+            self.members[group].discard(location.lower())
+            self.rollups[group] = [total - count for total, count in zip(self.rollups[group], counts)]
+
+            if not self.members[group]:
+                del self.members[group], self.rollups[group], self.groups[group.lower()]
+
+    @staticmethod
+    def _groups(metadata):
+        groups = {metadata.region} if metadata.parent else {metadata.region, metadata.continent}
+
+        return groups - {""}
@@ -0,0 +1,137 @@
+import logging
+
+import numpy as np
+
+from config.sanity import CONFIRMATIONS, SANITY_THRESHOLDS
+from models.snapshot import COUNT_COLUMNS
+from services.metrics_service import MetricsService
+
+
+class SanityService:
+    def __init__(self, thresholds=None, confirmations=CONFIRMATIONS, metrics_service=None, logger=None):
+        self.thresholds = thresholds if thresholds else SANITY_THRESHOLDS
+        self.confirmations = confirmations
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.quarantined = None
+        self.quarantined_problems = None
+        self.confirmed = 0
+        self.accepted_problems = set()
+        self.catching_up = False
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def catch_up(self):
+        """
+        Skips the changed fraction check until the next snapshot is admitted, e.g. after restoring state saved before
+        downtime, when everything that changed meanwhile shows up at once
+        """
+        self.catching_up = True
+
+    def admit(self, snapshot, previous, deltas):
+        """
+        Decides whether a snapshot can be broadcast. One failing the checks is quarantined, and only admitted once
+        it has been confirmed `confirmations` times by a later fetch failing the same checks in the same way (e.g. the
+        same locations missing again), or holding nearly the same data - a partial load rarely repeats itself, while
+        a real burst of changes keeps tripping the same check as the sheet is edited. Once confirmed, the same problems
+        are accepted for as long as every later snapshot has them, e.g. a TOTAL row that stays a little off.
+
+        Params:
+        snapshot (Snapshot) -> the latest snapshot
+        previous (Snapshot) -> the last admitted snapshot, or None
+        deltas (list of LocationDelta) -> the changes between the two
+
+        Returns:
+        bool -> True if the snapshot should be used
+        """
+        found = self._problems(snapshot, previous, deltas)
+
+        # A problem that went away is checked again if it comes back
+        self.accepted_problems &= {kind for kind, _ in found}
+        found = [(kind, problem) for kind, problem in found if kind not in self.accepted_problems]
+        problems = [problem for _, problem in found]
+
+        if not problems:
+            self._release()
+            return True
+
+        kinds = {kind for kind, _ in found}
+
+        if self.quarantined is not None and (
+            kinds == self.quarantined_problems or self._close(snapshot, self.quarantined)
+        ):
+            self.confirmed += 1
+        else:
+            self.quarantined = snapshot
+            self.quarantined_problems = kinds
+            self.confirmed = 0
+
+        if self.confirmed >= self.confirmations:
+            self.logger.warning(f"Accepting a suspicious snapshot after {self.confirmed} confirmation(s)")
+            self.metrics_service.increment("sanity_confirmed_total")
+            self.accepted_problems |= kinds
+            self._release()
+            return True
+
+        self.logger.warning(f"Quarantined a suspicious snapshot - {'; '.join(problems)}")
+        self.metrics_service.increment("sanity_quarantined_total")
+
+        return False
+
+    def check(self, snapshot, previous, deltas):
+        """
+        Returns:
+        list of str describing what's wrong with the snapshot, empty if nothing is
+        """
+        return [problem for _, problem in self._problems(snapshot, previous, deltas)]
+
+    def _problems(self, snapshot, previous, deltas):
+        """
+        Returns:
+        list of (kind, description), where the kind identifies the check and what failed it but not by how much
+        """
+        problems = []
+
+        if previous is not None and len(previous):
+            if len(snapshot) < self.thresholds["min_row_fraction"] * len(previous):
+                problems.append(
+                    (("rows", len(snapshot)), f"only {len(snapshot)} of {len(previous)} locations were loaded")
+                )
+
+            if (
+                not self.catching_up
+                and len(previous) >= self.thresholds["min_locations"]
+                and len(deltas) > self.thresholds["max_changed_fraction"] * len(previous)
+            ):
+                problems.append((("changed",), f"{len(deltas)} of {len(previous)} locations changed at once"))
+
+        regions = np.array(snapshot.regions, dtype=object)
+
+        for region, totals in snapshot.totals.items():
+            summed = snapshot.counts[regions == region].sum(axis=0)[: len(totals)]
+            totals = np.array(totals, dtype=np.int64)
+            drift = np.abs(summed - totals) > self.thresholds["total_tolerance"] * totals
+
+            for column in np.flatnonzero(drift):
+                problems.append(
+                    (
+                        ("total", region, column),
+                        f"{COUNT_COLUMNS[column].lower()} in {region} add up to {summed[column]}, "
+                        f"but the TOTAL row says {totals[column]}",
+                    )
+                )
+
+        return problems
+
+    def _release(self):
+        self.quarantined = None
+        self.quarantined_problems = None
+        self.catching_up = False
+
+    def _close(self, snapshot, other):
+        """
+        Returns:
+        bool -> whether both snapshots have the same locations, with counts within the total tolerance of each other
+        """
+        if snapshot.locations != other.locations:
+            return False
+
+        return bool(np.all(np.abs(snapshot.counts - other.counts) <= self.thresholds["total_tolerance"] * other.counts))
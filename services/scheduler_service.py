@@ -0,0 +1,93 @@
+import random
+
+from services.metrics_service import MetricsService
+from utils.clock import Clock
+
+
+class FixedScheduler:
+    def __init__(self, interval):
+        self.interval = interval
+
+    def next_interval(self, changed):
+        return self.interval
+
+
+class AdaptiveScheduler:
+    def __init__(
+        self,
+        base_interval,
+        min_interval=60,
+        max_interval=900,
+        jitter=0.1,
+        backoff_factor=1.5,
+        metrics_service=None,
+        clock=None,
+        rng=None,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(base_interval, min_interval), max_interval)
+        self.jitter = jitter
+        self.backoff_factor = backoff_factor
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.clock = clock if clock else Clock()
+        self.rng = rng if rng else random.Random()
+        self.last_fetch = None
+
+    def next_interval(self, changed):
+        """
+        Halves the polling interval after a cycle that saw changes, and backs off towards the ceiling after a quiet
+        one. Jitter is added so restarts don't line up, but the interval never drops below the minimum.
+
+        Params:
+        changed (bool) -> whether the last cycle found any changes
+
+        Returns:
+        how long to wait before the next cycle, in seconds
+        """
+        now = self.clock.monotonic()
+
+        if changed and self.last_fetch is not None:
+            # The change happened at some point since the previous fetch, so this is an upper bound on the delay
+            self.metrics_service.observe("change_detection_delay_seconds", now - self.last_fetch)
+
+        self.last_fetch = now
+
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+
+        interval = self.interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        interval = max(self.min_interval, interval)
+
+        self.metrics_service.set_gauge("poll_interval_seconds", round(interval, 3))
+
+        return interval
+
+
+class ExponentialBackoff:
+    def __init__(self, base_delay=20, max_delay=900, jitter=0.5, rng=None, min_delay=0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.min_delay = min_delay
+        self.rng = rng if rng else random.Random()
+        self.attempts = 0
+
+    def next_delay(self):
+        """
+        Doubles the delay after every consecutive failure up to max_delay, then takes up to jitter of it off at random
+        so retries from restarted bots spread out. A retry never comes sooner than min_delay, so it keeps to the same
+        floor as the polling interval.
+
+        Returns:
+        how long to wait before retrying, in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** self.attempts)
+        self.attempts += 1
+
+        return max(self.min_delay, delay * self.rng.uniform(1 - self.jitter, 1))
+
+    def reset(self):
+        self.attempts = 0
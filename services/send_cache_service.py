@@ -0,0 +1,102 @@
+import datetime
+import hashlib
+import json
+import logging
+
+import discord
+
+from collections import OrderedDict
+
+from services.delivery_service import Attachment
+from utils.clock import Clock
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class SendCacheService:
+    def __init__(self, window=600, max_entries=256, outbox_service=None, clock=None, logger=None):
+        self.window = window
+        self.max_entries = max_entries
+        self.outbox_service = outbox_service
+        self.clock = clock if clock else Clock()
+        self.sent = {}
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+        if outbox_service:
+            self.load()
+
+    @staticmethod
+    def fingerprint(message, cycle=None):
+        """
+        Hashes a message by its content and the update cycle it was rendered in. An embed's timestamp is left out,
+        as it changes whenever the message is rendered again. The same content rendered again for the same cycle
+        (a retry, an outbox replay, or two pipelines processing the same data) matches, but the same content
+        rendered for a later cycle doesn't.
+
+        Params:
+        message (str, discord.Embed or Attachment) -> the message to hash
+        cycle (str) -> the update cycle's identity, if known
+
+        Returns:
+        str
+        """
+        digest = hashlib.blake2b(digest_size=16)
+
+        if cycle is not None:
+            digest.update(cycle.encode() + b"\0")
+
+        if type(message) == Attachment:
+            digest.update(SendCacheService._embed_content(message.embed).encode())
+            digest.update(b"\0" + message.filename.encode() + b"\0")
+            digest.update(message.data)
+        elif type(message) == discord.Embed:
+            digest.update(SendCacheService._embed_content(message).encode())
+        else:
+            digest.update(str(message).encode())
+
+        return digest.hexdigest()
+
+    def is_duplicate(self, channel_id, message, cycle=None):
+        """
+        Returns:
+        bool -> True if the same message was sent to the channel for the same cycle within the window
+        """
+        sent_at = self.sent.get(channel_id, {}).get(self.fingerprint(message, cycle))
+
+        return sent_at is not None and self._now() - sent_at < self.window
+
+    def record(self, channel_id, message, cycle=None):
+        """
+        Remembers a message as sent, storing it in the outbox (if there is one) straight away so a crash doesn't
+        forget it
+        """
+        sent = self.sent.setdefault(channel_id, OrderedDict())
+        key = self.fingerprint(message, cycle)
+        now = self._now()
+
+        sent.pop(key, None)
+        sent[key] = now
+
+        while len(sent) > self.max_entries:
+            sent.popitem(last=False)
+
+        if self.outbox_service:
+            self.outbox_service.record_sent(channel_id, key, now, now - self.window)
+
+    def load(self):
+        for channel_id, key, sent_at in self.outbox_service.sent_since(self._now() - self.window):
+            sent = self.sent.setdefault(channel_id, OrderedDict())
+            sent[key] = sent_at
+
+            while len(sent) > self.max_entries:
+                sent.popitem(last=False)
+
+    def _now(self):
+        return (self.clock.now() - EPOCH).total_seconds()
+
+    @staticmethod
+    def _embed_content(embed):
+        content = embed.to_dict()
+        content.pop("timestamp", None)
+
+        return json.dumps(content, sort_keys=True)
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+
+from services.metrics_service import MetricsService
+from utils.clock import Clock
+
+
+class SharedFetchService:
+    def __init__(self, gateway, freshness=30, clock=None, metrics_service=None, logger=None):
+        self.gateway = gateway
+        self.freshness = freshness
+        self.clock = clock if clock else Clock()
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.latest = None
+        self.fetched_at = None
+        self.in_flight = None
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    async def fetch(self):
+        """
+        Fetches the latest payload for any number of pipelines. A payload fetched less than freshness seconds ago is
+        reused, and pipelines asking while a fetch is running wait for that fetch instead of starting their own. The
+        gateway is called on a thread so the event loop isn't blocked on the network.
+
+        Returns:
+        the payload returned by the gateway's fetch_raw
+
+        Raises:
+        whatever the gateway raised, to every pipeline waiting on the fetch
+        """
+        if self.fetched_at is not None and self.clock.monotonic() - self.fetched_at < self.freshness:
+            self.metrics_service.increment("shared_fetches_total", result="fresh")
+            return self.latest
+
+        if self.in_flight is None:
+            self.metrics_service.increment("shared_fetches_total", result="fetched")
+            self.in_flight = asyncio.ensure_future(self._fetch())
+        else:
+            self.metrics_service.increment("shared_fetches_total", result="joined")
+
+        return await asyncio.shield(self.in_flight)
+
+    def invalidate(self):
+        """
+        Makes the next fetch go to the gateway, even if the last payload is still fresh
+        """
+        self.fetched_at = None
+
+    async def _fetch(self):
+        try:
+            latest = await asyncio.get_running_loop().run_in_executor(None, self.gateway.fetch_raw)
+        finally:
+            self.in_flight = None
+
+        self.latest = latest
+        self.fetched_at = self.clock.monotonic()
+
+        return latest
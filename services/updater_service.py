@@ -2,10 +2,25 @@ import asyncio
 import datetime
 import discord
 import logging
+import os
 import pandas as pd
 
+from contextlib import contextmanager
+
 from config import embed as embed_config
-from gateways.bno_news_gateway import BnoNewsGatewayError
+from gateways.bno_news_gateway import (
+    BnoNewsGatewayError,
+    BnoNewsGatewayExhaustedError,
+    BnoNewsGatewayUnavailableError,
+)
+from models.snapshot import Snapshot, deltas_to_dataframe
+from services.delivery_service import Attachment, DeliveryService
+from services.metrics_service import MetricsService
+from services.parse_cache_service import ParseCacheService
+from services.profiling_service import ProfilingService
+from services.scheduler_service import ExponentialBackoff, FixedScheduler
+from services.worker_pool_service import WorkerPoolService, parse_payload
+from utils.clock import Clock
 from utils.data import remove_non_integers_from_string
 
 from texttable import Texttable
@@ -13,76 +28,435 @@ from texttable import Texttable
 
 class UpdaterService:
     def __init__(
-        self, bno_news_gateway, data_parser_service, update_interval, discord_channel_id, output, logger=None,
+        self,
+        bno_news_gateway,
+        data_parser_service,
+        update_interval,
+        discord_channel_ids,
+        output,
+        logger=None,
+        subscribers=None,
+        leaderboard_service=None,
+        leaderboard_size=10,
+        delivery_service=None,
+        alert_service=None,
+        debounce_service=None,
+        digest_threshold=0,
+        metrics_service=None,
+        profiling_service=None,
+        memory_watchdog_service=None,
+        clock=None,
+        scheduler=None,
+        backoff=None,
+        worker_pool_service=None,
+        parse_cache_service=None,
+        fetch_service=None,
+        location_filter=None,
+        sanity_service=None,
+        chart_service=None,
+        region_service=None,
     ):
         self.bno_news_gateway = bno_news_gateway
         self.data_parser_service = data_parser_service
         self.update_interval = update_interval
-        self.discord_channel_id = discord_channel_id
+        self.discord_channel_ids = discord_channel_ids if type(discord_channel_ids) == list else [discord_channel_ids]
         self.output = output
         self.previous_data = pd.DataFrame
+        self.previous_snapshot = None
+        self.subscribers = subscribers if subscribers else []
+        self.leaderboard_service = leaderboard_service
+        self.leaderboard_size = leaderboard_size
+        self.delivery_service = delivery_service if delivery_service else DeliveryService()
+        self.alert_service = alert_service
+        self.debounce_service = debounce_service
+        self.digest_threshold = digest_threshold
+        self.metrics_service = metrics_service if metrics_service else MetricsService()
+        self.profiling_service = profiling_service if profiling_service else ProfilingService()
+        self.memory_watchdog_service = memory_watchdog_service
+        self.clock = clock if clock else Clock()
+        self.scheduler = scheduler if scheduler else FixedScheduler(update_interval)
+        self.backoff = backoff if backoff else ExponentialBackoff()
+        self.worker_pool_service = worker_pool_service if worker_pool_service else WorkerPoolService()
+        self.parse_cache_service = parse_cache_service
+        self.fetch_service = fetch_service
+        self.location_filter = {location.lower() for location in location_filter} if location_filter else None
+        self.sanity_service = sanity_service
+        self.chart_service = chart_service
+        self.region_service = region_service
+        self.failed_fetches = 0
+        self.source_unavailable = False
         self.logger = logger if logger else logging.getLogger(__name__)
 
     async def update_loop(self, discord_client):
         self.logger.info("Coronavirus Updater Initialised")
 
         while not discord_client.is_closed():
-            timestamp = datetime.datetime.utcnow()
-
-            self.logger.info("Fetching the latest Coronavirus statistics")
-
             try:
-                latest_data = self.bno_news_gateway.fetch_raw()
-            except BnoNewsGatewayError as bnge:
-                self.logger.critical(f"Failed to fetch the latest virus data - {str(bnge)}")
-                self.logger.info("Trying again in 20 seconds...")
-                await asyncio.sleep(20)
+                with self.profiling_service.cycle():
+                    deltas = await self._update()
+            except BnoNewsGatewayExhaustedError as bngee:
+                self.logger.info(f"No more data to fetch ({str(bngee)}) - stopping")
+                await discord_client.close()
+                return
+
+            if self.memory_watchdog_service and self.memory_watchdog_service.on_cycle():
+                await discord_client.close()
+                return
+
+            if deltas is None:
+                delay = self.backoff.next_delay()
+                self.logger.info(f"Trying again in {delay:.0f} seconds...")
+                await self.clock.sleep(delay)
                 continue
 
-            self.logger.debug("Data fetched successfully. Parsing...")
+            self.backoff.reset()
+
+            await self.clock.sleep(self.scheduler.next_interval(bool(deltas)))
+
+    async def _update(self):
+        """
+        Runs a single fetch, parse, diff and render cycle, queueing any resulting messages for delivery
+
+        Returns:
+        list of LocationDelta since the previous cycle, or None if the latest data couldn't be fetched
+        """
+        self.logger.info("Fetching the latest Coronavirus statistics")
+        self.metrics_service.increment("cycles_total")
+
+        try:
+            with self._stage("fetch"):
+                if self.fetch_service:
+                    latest_data = await self.fetch_service.fetch()
+                else:
+                    latest_data = self.bno_news_gateway.fetch_raw()
+        except BnoNewsGatewayExhaustedError:
+            raise
+        except BnoNewsGatewayError as bnge:
+            self._on_fetch_failed(bnge)
+            return None
+
+        if self.source_unavailable:
+            self._notify_channels("The data source is available again - updates will resume")
+            self.source_unavailable = False
+
+        self.failed_fetches = 0
+
+        timestamp = self.clock.now()
+
+        self.logger.debug("Data fetched successfully. Parsing...")
 
-            data = self.data_parser_service.create_dataframe_from_bno_data(latest_data)
+        # Identifies the data this cycle reports on, so re-sends of its messages can be told from later ones
+        payload_key = ParseCacheService.fingerprint(latest_data)
 
-            self.logger.debug("Data parsed successfully")
+        with self._stage("parse"):
+            data, snapshot = await self._parse(latest_data, timestamp, payload_key)
+
+        self.logger.debug("Data parsed successfully")
+        self.metrics_service.set_gauge("sheet_rows", len(snapshot))
+
+        with self._stage("snapshot_diff"):
+            deltas = await self.worker_pool_service.run(snapshot.diff, self.previous_snapshot)
+
+        if self.sanity_service:
+            with self._stage("validate"):
+                admitted = self.sanity_service.admit(snapshot, self.previous_snapshot, deltas)
+
+            if not admitted:
+                # Retried like a failed fetch, and the re-fetch has to go to the source rather than a shared payload
+                if self.fetch_service:
+                    self.fetch_service.invalidate()
+
+                self.metrics_service.increment("skipped_cycles_total")
+                return None
+
+        # Everything queued this cycle is stored in the outbox together, before the baseline moves on
+        with self.delivery_service.batch(payload_key):
+            if self.alert_service:
+                for alert in self.alert_service.evaluate(snapshot):
+                    for channel_id in self.discord_channel_ids:
+                        self.delivery_service.enqueue(channel_id, alert, DeliveryService.HIGH_PRIORITY)
+
+            for subscriber in self.subscribers:
+                subscriber.on_snapshot(snapshot, deltas)
 
             if not self.previous_data.empty:
                 self.logger.debug("Checking against previous data")
 
-                data_diff = pd.concat([self.previous_data, data]).drop_duplicates(keep=False)
+                with self._stage("diff"):
+                    # Built from the typed deltas, so a location missing from the sheet isn't rendered as a new one
+                    if self.debounce_service:
+                        self.debounce_service.add(deltas, timestamp)
+                        data_diff = deltas_to_dataframe(self.debounce_service.flush(timestamp))
+                    else:
+                        data_diff = deltas_to_dataframe(deltas)
+
+                    if self.location_filter and not data_diff.empty:
+                        data_diff = data_diff[data_diff.Location.map(lambda location: self._wanted(location, snapshot))]
+
+                self.metrics_service.set_gauge("changed_locations", data_diff.Location.nunique())
 
                 if not data_diff.empty:
                     self.logger.debug("Data has changed. Creating and sending messages")
-                    update_messages = self._make_update_message(data_diff, timestamp)
 
-                    for update in update_messages:
-                        if type(update) == discord.Embed:
-                            await discord_client.get_channel(self.discord_channel_id).send(embed=update)
+                    with self._stage("render"):
+                        digest = self.digest_threshold and data_diff.Location.nunique() > self.digest_threshold
+                        parsed_data = None
+
+                        if digest or self.output != "leaderboard":
+                            parsed_data = await self.worker_pool_service.run(self._collect_differences, data_diff)
+
+                        if digest:
+                            update_messages = self._make_digest_update(data_diff, snapshot, timestamp, parsed_data)
+                        elif self.output == "chart":
+                            update_messages = await self._make_chart_update(data_diff, timestamp, parsed_data)
                         else:
-                            await discord_client.get_channel(self.discord_channel_id).send(update)
+                            update_messages = self._make_update_message(data_diff, timestamp, parsed_data)
+
+                    for update in update_messages:
+                        for channel_id in self.discord_channel_ids:
+                            self.delivery_service.enqueue(channel_id, update)
                 else:
                     self.logger.debug("No changes in data - sleeping")
             else:
                 self.logger.info("Previous data is empty - not comparing. Updating values")
 
-            self.previous_data = data
+        self.previous_data = data
+        self.previous_snapshot = snapshot
+
+        return deltas
+
+    def _wanted(self, location, snapshot):
+        """
+        Returns:
+        bool -> whether a location, the region or continent it's in, or another name for it, is in this pipeline's
+        location filter
+        """
+        position = snapshot.find(location)
+        names = [location, snapshot.regions[position] if position is not None else ""]
+
+        if self.region_service:
+            metadata = self.region_service.metadata(location)
+
+            if metadata:
+                names += [metadata.continent, *metadata.aliases]
+
+        return any(name.lower() in self.location_filter for name in names if name)
+
+    async def _parse(self, latest_data, timestamp, key):
+        async def parse():
+            return await self.worker_pool_service.run(
+                parse_payload, self.data_parser_service.create_dataframe_from_bno_data, latest_data, timestamp
+            )
+
+        if not self.parse_cache_service:
+            return await parse()
+
+        return await self.parse_cache_service.get_or_parse(key, timestamp, parse)
+
+    def _on_fetch_failed(self, error):
+        self.metrics_service.increment("gateway_errors_total")
+        self.metrics_service.increment("skipped_cycles_total")
+
+        # Only the first failure in a row is critical, the rest would just flood the logs during an outage
+        if self.failed_fetches == 0:
+            self.logger.critical(f"Failed to fetch the latest virus data - {str(error)}")
+        else:
+            self.logger.warning(
+                f"Failed to fetch the latest virus data ({self.failed_fetches + 1} in a row) - {str(error)}"
+            )
+
+        self.failed_fetches += 1
+
+        if isinstance(error, BnoNewsGatewayUnavailableError) and not self.source_unavailable:
+            self.source_unavailable = True
+
+            if self.previous_snapshot is not None and self.previous_snapshot.timestamp:
+                since = f" - the latest data is from {self.previous_snapshot.timestamp:%Y-%m-%d %H:%M} UTC"
+            else:
+                since = ""
+
+            self._notify_channels(f"The data source is unavailable, updates are paused{since}")
+
+    def _notify_channels(self, notice):
+        for channel_id in self.discord_channel_ids:
+            self.delivery_service.enqueue(channel_id, notice, DeliveryService.HIGH_PRIORITY)
+
+    def save_state(self, path):
+        """
+        Writes the last seen data to disk, so a restarted bot only reports changes made while it was down
+
+        Params:
+        path (str) -> the file to write to
+        """
+        if self.previous_snapshot is None:
+            return
 
-            await asyncio.sleep(self.update_interval)
+        # attrs aren't saved by to_json, so the hierarchy is written as columns
+        data = self.previous_data.assign(Region=self.previous_snapshot.regions, Parent=self.previous_snapshot.parents)
+        data.to_json(path, orient="split", index=False)
+        self.logger.info(f"State saved to {path}")
 
-    def _make_update_message(self, data, timestamp):
+    def load_state(self, path):
+        try:
+            data = pd.read_json(path, orient="split", dtype=False)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Couldn't load the saved state from {path} - {str(e)}")
+            return
+
+        timestamp = datetime.datetime.utcfromtimestamp(os.path.getmtime(path))
+
+        if "Parent" in data.columns:
+            regions, parents = data.pop("Region").tolist(), data.pop("Parent").tolist()
+            data.attrs["regions"], data.attrs["parents"] = regions, parents
+
+        self.previous_data = data
+        self.previous_snapshot = Snapshot.from_dataframe(data, timestamp)
+
+        for subscriber in self.subscribers:
+            subscriber.on_snapshot(self.previous_snapshot, self.previous_snapshot.diff(None))
+
+        # Everything that changed while the bot was down arrives in the first cycle
+        if self.sanity_service:
+            self.sanity_service.catch_up()
+
+        self.logger.info(f"State loaded from {path} ({len(data)} locations)")
+
+    @contextmanager
+    def _stage(self, name):
+        with self.metrics_service.time(name), self.profiling_service.stage(name):
+            yield
+
+    def _make_update_message(self, data, timestamp, parsed_data=None):
         if self.output == "table":
-            return self._make_table_update(data)
+            return self._make_table_update(data, parsed_data)
         elif self.output == "text":
-            return self._make_text_update(data)
+            return self._make_text_update(data, parsed_data)
         elif self.output == "embed":
-            return self._make_embed_update(data, timestamp)
+            return self._make_embed_update(data, timestamp, parsed_data)
+        elif self.output == "leaderboard":
+            return self._make_leaderboard_update()
+
+    def _make_digest_update(self, data, snapshot, timestamp, parsed_data=None):
+        DIGEST_MOVERS = 5
+
+        parsed_data = parsed_data if parsed_data is not None else self._collect_differences(data)
+
+        cases_diff = parsed_data.cases_after.astype(int) - parsed_data.cases_before.astype(int)
+        deaths_diff = parsed_data.deaths_after.astype(int) - parsed_data.deaths_before.astype(int)
+
+        # Changes to a country's states are already in the country's own row, so only top level rows are summed
+        top_level = parsed_data.location.map(snapshot.is_top_level)
+
+        embed = discord.Embed(
+            title=f"Coronavirus (COVID-19) update for **{len(parsed_data)}** locations",
+            description=(
+                f"**{cases_diff[top_level].sum():+}** case(s) and **{deaths_diff[top_level].sum():+}** death(s) "
+                "since the last update"
+            ),
+            timestamp=timestamp,
+            colour=embed_config.EMBED_COLOUR,
+        )
+
+        embed.set_author(**embed_config.EMBED_AUTHOR)
+
+        movers = [
+            f"**{parsed_data.location[i]}** {cases_diff[i]:+} (now {parsed_data.cases_after[i]})"
+            for i in cases_diff.nlargest(DIGEST_MOVERS).index
+            if cases_diff[i] > 0
+        ]
+
+        if movers:
+            embed.add_field(name="**__Biggest movers__**", value="\n".join(movers), inline=False)
+
+        if self.region_service:
+            continents = self._continent_changes(parsed_data.location, cases_diff)
+
+            if continents:
+                embed.add_field(name="**__By continent__**", value="\n".join(continents), inline=False)
+
+        for column, total in zip(["cases", "deaths", "recovered"], snapshot.total()[[0, 1, 4]]):
+            embed.add_field(**embed_config.EMBED_FIELDS[column], value=f"{total}")
+
+        embed.set_footer(text="The full list of changes is attached")
+
+        return [Attachment(embed, "changes.csv", parsed_data.to_csv(index=False).encode())]
+
+    def _continent_changes(self, locations, cases_diff):
+        """
+        Returns:
+        list of str -> each continent's change in cases this cycle and its total from the precomputed rollups,
+        biggest change first
+        """
+        changes = {}
+
+        for location, difference in zip(locations, cases_diff):
+            metadata = self.region_service.metadata(location)
+
+            if metadata and metadata.continent and not metadata.parent:
+                changes[metadata.continent] = changes.get(metadata.continent, 0) + difference
+
+        lines = []
+
+        for continent, difference in sorted(changes.items(), key=lambda item: -item[1]):
+            rollup = self.region_service.rollup(continent)
+
+            if difference and rollup:
+                lines.append(f"**{continent}** {difference:+} (now {rollup[1][0]})")
+
+        return lines
+
+    async def _make_chart_update(self, data, timestamp, parsed_data):
+        MAX_CHARTS = 5
+
+        messages = []
+        charts = 0
+
+        # Charts go on the first few locations only, so a busy cycle doesn't render one for every location
+        for location, embed in zip(parsed_data.location, self._make_embed_update(data, timestamp, parsed_data)):
+            chart = await self.chart_service.chart(location) if charts < MAX_CHARTS else None
+
+            if chart:
+                charts += 1
+                embed.set_image(url=f"attachment://{self.chart_service.FILENAME}")
+                messages.append(Attachment(embed, self.chart_service.FILENAME, chart))
+            else:
+                messages.append(embed)
+
+        return messages
+
+    def _make_leaderboard_update(self):
+        LEADERBOARD_METRICS = ["cases", "deaths", "recovered"]
+
+        table = Texttable()
+
+        table.set_cols_align(["c"] * (len(LEADERBOARD_METRICS) + 1))
+        table.set_cols_valign(["m"] * (len(LEADERBOARD_METRICS) + 1))
+
+        rankings = [self.leaderboard_service.top(metric, self.leaderboard_size) for metric in LEADERBOARD_METRICS]
+
+        rows = [["#"] + [metric.capitalize() for metric in LEADERBOARD_METRICS]]
+
+        for rank in range(max(len(ranking) for ranking in rankings)):
+            row = [str(rank + 1)]
+
+            for ranking in rankings:
+                row.append(f"{ranking[rank][0]} ({ranking[rank][1]})" if rank < len(ranking) else "")
+
+            rows.append(row)
+
+        rows.append(["Total"] + [str(self.leaderboard_service.total(metric)) for metric in LEADERBOARD_METRICS])
+
+        table.add_rows(rows)
+
+        return [f"```{table.draw()}```"]
 
-    def _make_table_update(self, data):
+    def _make_table_update(self, data, parsed_data=None):
         table = Texttable()
 
         table.set_cols_align(["c"] * len(data.columns))
         table.set_cols_valign(["m"] * len(data.columns))
 
-        parsed_data = self._collect_differences(data)
+        parsed_data = parsed_data if parsed_data is not None else self._collect_differences(data)
 
         new_data = [data.columns.tolist()]
 
@@ -164,7 +538,7 @@ class UpdaterService:
 
         return all_messages
 
-    def _make_text_update(self, data):
+    def _make_text_update(self, data, parsed_data=None):
         TEXT_TEMPLATE = {
             "cases_up": "{count} new case(s) identified in **{location}**, total case(s) now are {current}",
             "cases_down": "{count} incorrectly identified case(s) in **{location}**, total case(s) now are {current}",
@@ -178,7 +552,7 @@ class UpdaterService:
             "recovered_down": "{count} incorrectly identified recovered patients in **{location}**, total recovered now are {current}",
         }
 
-        parsed_data = self._collect_differences(data)
+        parsed_data = parsed_data if parsed_data is not None else self._collect_differences(data)
 
         message_store = []
 
@@ -266,8 +640,8 @@ class UpdaterService:
 
         return all_messages
 
-    def _make_embed_update(self, data, timestamp):
-        parsed_data = self._collect_differences(data)
+    def _make_embed_update(self, data, timestamp, parsed_data=None):
+        parsed_data = parsed_data if parsed_data is not None else self._collect_differences(data)
 
         message_store = []
 
@@ -347,7 +721,8 @@ class UpdaterService:
             message_store.append(embed)
         return message_store
 
-    def _collect_differences(self, data):
+    @staticmethod
+    def _collect_differences(data):
         columns = [
             "location",
             "cases_before",
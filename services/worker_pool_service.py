@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from models.snapshot import Snapshot
+
+
+def parse_payload(parse, raw_data, timestamp):
+    """
+    Parses a payload into the DataFrame and Snapshot used by the UpdaterService. Kept at module level so it can be
+    sent to a process pool - only the parsed results are sent back, never the HTML or the soup.
+
+    Params:
+    parse (function) -> the parser, e.g. DataParserService.create_dataframe_from_bno_data
+    raw_data (str or dict) -> the payload returned by the gateway
+    timestamp (datetime) -> when the payload was fetched
+
+    Returns:
+    (DataFrame, Snapshot)
+    """
+    data = parse(raw_data)
+
+    return data, Snapshot.from_dataframe(data, timestamp)
+
+
+class WorkerPoolService:
+    MODES = ["inline", "thread", "process"]
+
+    def __init__(self, mode="inline", max_workers=None, logger=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown worker pool mode '{mode}', expected one of {', '.join(self.MODES)}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.executor = None
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    async def run(self, function, *args):
+        """
+        Runs a CPU heavy function off the event loop. In process mode the function and its arguments must be
+        picklable, so bound methods of services won't do.
+
+        Params:
+        function (function) -> what to run
+        args -> the function's arguments
+
+        Returns:
+        whatever the function returns
+        """
+        if self.mode == "inline":
+            return function(*args)
+
+        if self.executor is None:
+            if self.mode == "thread":
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+            self.logger.info(f"Started a {self.mode} pool for parsing, diffing and rendering")
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,103 @@
+import pytest
+import threading
+
+from unittest.mock import MagicMock, patch
+
+from gateways.bno_news_gateway import BnoNewsGateway, BnoNewsGatewayError, BnoNewsGatewayUnavailableError
+from gateways.circuit_breaker import CircuitBreaker
+from utils.clock import VirtualClock
+
+
+@pytest.fixture(scope="function")
+def bno_news_gateway():
+    clock = VirtualClock()
+
+    yield BnoNewsGateway(
+        page_breaker=CircuitBreaker("page", failure_threshold=1, clock=clock, logger=MagicMock()),
+        sheet_breaker=CircuitBreaker("sheet", failure_threshold=1, clock=clock, logger=MagicMock()),
+    )
+
+
+@pytest.fixture(scope="function")
+def single_tab():
+    with patch.object(BnoNewsGateway, "_find_tabs", side_effect=lambda sheet_url: [("", sheet_url)]):
+        yield
+
+
+def test_last_known_sheet_address_is_used_while_the_page_is_down(bno_news_gateway, single_tab):
+    with patch.object(BnoNewsGateway, "_fetch_sheet_url", return_value="sheet-url"), patch.object(
+        BnoNewsGateway, "_fetch_sheet", return_value="<html></html>"
+    ):
+        bno_news_gateway.fetch_raw()
+
+    with patch.object(BnoNewsGateway, "_fetch_sheet_url", side_effect=BnoNewsGatewayError("down")), patch.object(
+        BnoNewsGateway, "_fetch_sheet", return_value="<html></html>"
+    ) as fetch_sheet:
+        assert bno_news_gateway.fetch_raw() == "<html></html>"
+        assert bno_news_gateway.fetch_raw() == "<html></html>"
+
+    assert bno_news_gateway.page_breaker.state == CircuitBreaker.OPEN
+    fetch_sheet.assert_called_with("sheet-url")
+
+
+def test_open_sheet_circuit_fails_fast(bno_news_gateway, single_tab):
+    with patch.object(BnoNewsGateway, "_fetch_sheet_url", return_value="sheet-url"), patch.object(
+        BnoNewsGateway, "_fetch_sheet", side_effect=BnoNewsGatewayError("down")
+    ) as fetch_sheet:
+        with pytest.raises(BnoNewsGatewayError):
+            bno_news_gateway.fetch_raw()
+
+        with pytest.raises(BnoNewsGatewayUnavailableError):
+            bno_news_gateway.fetch_raw()
+
+    fetch_sheet.assert_called_once()
+
+
+def test_every_tab_is_fetched(bno_news_gateway):
+    menu = MagicMock(
+        status_code=200, text='<ul><li id="sheet-button-0">Global</li><li id="sheet-button-7">US</li></ul>'
+    )
+    url = "https://docs.google.com/spreadsheets/d/e/x/pubhtml/sheet?headers=false&gid=0"
+
+    with patch.object(
+        BnoNewsGateway, "_session", return_value=MagicMock(get=MagicMock(return_value=menu))
+    ), patch.object(BnoNewsGateway, "_fetch_sheet", side_effect=lambda tab_url: tab_url[-1]):
+        assert bno_news_gateway._fetch_tabs(url) == {"Global": "0", "US": "7"}
+
+
+def test_known_tabs_are_kept_when_the_menu_cannot_be_fetched(bno_news_gateway):
+    url = "https://docs.google.com/spreadsheets/d/e/x/pubhtml/sheet?headers=false&gid=0"
+    bno_news_gateway.tabs = [("Global", url), ("US", url[:-1] + "7")]
+    bno_news_gateway.tabs_source = url
+    bno_news_gateway.fetches_since_discovery = BnoNewsGateway.TAB_REFRESH_EVERY
+
+    with patch.object(BnoNewsGateway, "_find_tabs", side_effect=BnoNewsGatewayError("down")), patch.object(
+        BnoNewsGateway, "_fetch_sheet", side_effect=lambda tab_url: tab_url[-1]
+    ):
+        assert bno_news_gateway._fetch_tabs(url) == {"Global": "0", "US": "7"}
+
+        with pytest.raises(BnoNewsGatewayError):
+            bno_news_gateway._fetch_tabs(url.replace("/x/", "/y/"))
+
+    assert bno_news_gateway.metrics_service.counters[("tab_discovery_failures_total", ())] == 2
+
+
+def test_each_thread_has_its_own_session(bno_news_gateway):
+    sessions = []
+
+    with patch("gateways.bno_news_gateway.HTMLSession", side_effect=lambda: MagicMock()):
+        threads = [threading.Thread(target=lambda: sessions.append(bno_news_gateway._session())) for _ in range(2)]
+
+        for thread in threads:
+            thread.start()
+            thread.join()
+
+        sessions.append(bno_news_gateway._session())
+        sessions.append(bno_news_gateway._session())
+
+    assert len({id(session) for session in sessions}) == 3
+    assert len(bno_news_gateway.sessions) == 3
+
+    bno_news_gateway.trim()
+
+    assert all(session.close.called for session in sessions)
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+
+from gateways.circuit_breaker import CircuitBreaker
+from utils.clock import VirtualClock
+
+
+def make_breaker():
+    return CircuitBreaker("test", failure_threshold=2, reset_timeout=60, clock=VirtualClock(), logger=MagicMock())
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = make_breaker()
+
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = make_breaker()
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.allow()
+
+
+def test_circuit_half_opens_after_the_reset_timeout():
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    breaker.clock.advance(60)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record_failure()
+
+    assert not breaker.allow()
+
+    breaker.clock.advance(60)
+    breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
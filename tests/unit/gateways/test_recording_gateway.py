@@ -0,0 +1,64 @@
+import gzip
+import pytest
+
+from unittest.mock import MagicMock
+
+from gateways.bno_news_gateway import BnoNewsGatewayExhaustedError
+from gateways.recording_gateway import PayloadArchive, RecordingGateway, ReplayGateway
+
+
+def test_recorded_payloads_are_replayed_in_order(tmp_path):
+    archive_path = str(tmp_path / "archive.jsonl.gz")
+
+    bno_news_gateway = MagicMock()
+    bno_news_gateway.fetch_raw.side_effect = ["<html>1</html>", "<html>1</html>", "<html>2</html>"]
+
+    recording_gateway = RecordingGateway(bno_news_gateway, archive_path)
+
+    for _ in range(3):
+        recording_gateway.fetch_raw()
+
+    recording_gateway.writer.close()
+
+    replay_gateway = ReplayGateway(archive_path)
+
+    assert [replay_gateway.fetch_raw() for _ in range(3)] == ["<html>1</html>", "<html>1</html>", "<html>2</html>"]
+
+    with pytest.raises(BnoNewsGatewayExhaustedError):
+        replay_gateway.fetch_raw()
+
+
+def test_repeated_payloads_are_stored_once(tmp_path):
+    archive_path = str(tmp_path / "archive.jsonl.gz")
+
+    writer = PayloadArchive(archive_path).writer()
+    writer.write(1.0, "<html>1</html>")
+    writer.write(2.0, "<html>1</html>")
+    writer.close()
+
+    with gzip.open(archive_path, "rt") as archive:
+        assert archive.read().count("<html>1</html>") == 1
+
+
+def test_payloads_with_several_tabs_are_replayed(tmp_path):
+    archive_path = str(tmp_path / "archive.jsonl.gz")
+    payloads = [
+        {"World": "<html>1</html>", "United States": "<html>2</html>"},
+        {"World": "<html>1</html>", "United States": "<html>2</html>"},
+        {"United States": "<html>2</html>", "World": "<html>1</html>"},
+    ]
+
+    writer = PayloadArchive(archive_path).writer()
+
+    for timestamp, payload in enumerate(payloads):
+        writer.write(float(timestamp), payload)
+
+    writer.close()
+
+    replayed = [payload for _, payload in PayloadArchive(archive_path).records()]
+
+    assert replayed == payloads
+    assert [list(payload) for payload in replayed] == [list(payload) for payload in payloads]
+
+    with gzip.open(archive_path, "rt") as archive:
+        assert archive.read().count('"repeat": true') == 1
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from models.snapshot import LocationDelta, Snapshot, deltas_to_dataframe
+
+
+@pytest.fixture(scope="function")
+def stub_bno_dataframe():
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    data = [
+        ["Australia", "2", "1", "0", "0", "0", ""],
+        ["Sweden", "5,000", "2", "0", "0", "0", ""],
+    ]
+
+    yield pd.DataFrame(data, columns=columns)
+
+
+def test_snapshot_from_dataframe(stub_bno_dataframe):
+    snapshot = Snapshot.from_dataframe(stub_bno_dataframe)
+
+    assert len(snapshot) == 2
+    assert snapshot.row("sweden") == (5000, 2, 0, 0, 0)
+    assert snapshot.row("Narnia") is None
+
+
+def test_snapshot_diff(stub_bno_dataframe):
+    previous = Snapshot.from_dataframe(stub_bno_dataframe)
+
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    data = [
+        ["Australia", "3", "1", "0", "0", "0", ""],
+        ["Austria", "1", "0", "0", "0", "0", ""],
+    ]
+    current = Snapshot.from_dataframe(pd.DataFrame(data, columns=columns))
+
+    assert current.diff(previous) == [
+        LocationDelta("Australia", (2, 1, 0, 0, 0), (3, 1, 0, 0, 0), ""),
+        LocationDelta("Austria", None, (1, 0, 0, 0, 0), ""),
+        LocationDelta("Sweden", (5000, 2, 0, 0, 0), None, ""),
+    ]
+
+
+def test_snapshot_diff_without_changes(stub_bno_dataframe):
+    previous = Snapshot.from_dataframe(stub_bno_dataframe)
+    current = Snapshot.from_dataframe(stub_bno_dataframe)
+
+    assert current.diff(previous) == []
+
+
+def test_deltas_to_dataframe():
+    deltas = [
+        LocationDelta("Australia", (2, 1, 0, 0, 0), (3, 1, 0, 0, 0), ""),
+        LocationDelta("Austria", None, (1, 0, 0, 0, 0), ""),
+        LocationDelta("Sweden", (5, 2, 0, 0, 0), None, ""),
+    ]
+
+    expected = pd.DataFrame(
+        [
+            ["Australia", "2", "1", "0", "0", "0", ""],
+            ["Australia", "3", "1", "0", "0", "0", ""],
+            ["Austria", "1", "0", "0", "0", "0", ""],
+        ],
+        columns=["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"],
+    )
+
+    pd.testing.assert_frame_equal(expected, deltas_to_dataframe(deltas))
@@ -0,0 +1,114 @@
+import datetime
+import pandas as pd
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from models.snapshot import Snapshot
+from services.alert_service import AlertService
+from services.history_service import HistoryService
+
+START = datetime.datetime(2020, 3, 1, 12, 0, 0)
+
+
+def make_snapshot(data, minutes):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+
+    return Snapshot.from_dataframe(pd.DataFrame(data, columns=columns), START + datetime.timedelta(minutes=minutes))
+
+
+@pytest.fixture(scope="function")
+def history_service():
+    yield HistoryService()
+
+
+@pytest.fixture(scope="function")
+def alert_service(history_service):
+    rules = [
+        {"type": "growth", "metric": "cases", "threshold": 0.2, "window": 3600, "minimum": 50},
+        {"type": "first", "metric": "deaths"},
+    ]
+
+    yield AlertService(history_service, rules, MagicMock())
+
+
+def test_no_alerts_without_history(alert_service):
+    snapshot = make_snapshot([["Italy", "100", "1", "0", "0", "0", ""]], 0)
+
+    assert alert_service.evaluate(snapshot) == []
+
+
+def test_growth_alert(alert_service, history_service):
+    history_service.on_snapshot(
+        make_snapshot([["Italy", "100", "1", "0", "0", "0", ""], ["Spain", "100", "1", "0", "0", "0", ""]], 0), []
+    )
+    history_service.on_snapshot(
+        make_snapshot([["Italy", "110", "1", "0", "0", "0", ""], ["Spain", "105", "1", "0", "0", "0", ""]], 30), []
+    )
+
+    snapshot = make_snapshot([["Italy", "130", "1", "0", "0", "0", ""], ["Spain", "115", "1", "0", "0", "0", ""]], 60)
+
+    assert alert_service.evaluate(snapshot) == [
+        "**ALERT:** Cases in **Italy** are up 30% in the last 60 minutes, now 130"
+    ]
+
+
+def test_growth_alert_ignores_small_locations(alert_service, history_service):
+    history_service.on_snapshot(make_snapshot([["Malta", "2", "0", "0", "0", "0", ""]], 0), [])
+
+    snapshot = make_snapshot([["Malta", "10", "0", "0", "0", "0", ""]], 60)
+
+    assert alert_service.evaluate(snapshot) == []
+
+
+def test_first_death_alert_fires_once(alert_service, history_service):
+    history_service.on_snapshot(make_snapshot([["Malta", "2", "0", "0", "0", "0", ""]], 0), [])
+
+    snapshot = make_snapshot([["Malta", "2", "1", "0", "0", "0", ""]], 5)
+
+    assert alert_service.evaluate(snapshot) == ["**ALERT:** first death recorded in **Malta**"]
+
+    history_service.on_snapshot(snapshot, [])
+    snapshot = make_snapshot([["Malta", "2", "2", "0", "0", "0", ""]], 10)
+
+    assert alert_service.evaluate(snapshot) == []
+
+
+def test_first_alert_ignores_new_locations(alert_service, history_service):
+    history_service.on_snapshot(make_snapshot([["Malta", "2", "0", "0", "0", "0", ""]], 0), [])
+
+    snapshot = make_snapshot([["Malta", "2", "0", "0", "0", "0", ""], ["Gozo", "3", "1", "0", "0", "0", ""]], 5)
+
+    assert alert_service.evaluate(snapshot) == []
+
+
+def test_growth_alert_without_a_minimum_ignores_growth_from_zero(history_service):
+    alert_service = AlertService(
+        history_service, [{"type": "growth", "metric": "cases", "threshold": 0.2, "window": 3600}], MagicMock()
+    )
+    history_service.on_snapshot(
+        make_snapshot([["Malta", "0", "0", "0", "0", "0", ""], ["Italy", "10", "0", "0", "0", "0", ""]], 0), []
+    )
+
+    snapshot = make_snapshot([["Malta", "5", "0", "0", "0", "0", ""], ["Italy", "20", "0", "0", "0", "0", ""]], 60)
+
+    assert alert_service.evaluate(snapshot) == [
+        "**ALERT:** Cases in **Italy** are up 100% in the last 60 minutes, now 20"
+    ]
+
+
+def test_first_rules_share_one_alignment(history_service):
+    alert_service = AlertService(
+        history_service, [{"type": "first", "metric": "cases"}, {"type": "first", "metric": "deaths"}], MagicMock()
+    )
+    history_service.on_snapshot(make_snapshot([["Malta", "0", "0", "0", "0", "0", ""]], 0), [])
+
+    snapshot = make_snapshot([["Malta", "2", "1", "0", "0", "0", ""]], 5)
+
+    with patch.object(Snapshot, "align", autospec=True, side_effect=Snapshot.align) as align:
+        assert alert_service.evaluate(snapshot) == [
+            "**ALERT:** first case recorded in **Malta**",
+            "**ALERT:** first death recorded in **Malta**",
+        ]
+
+    assert align.call_count == 1
@@ -0,0 +1,104 @@
+import datetime
+import gzip
+import json
+import numpy as np
+import pytest
+
+from aiohttp.test_utils import make_mocked_request
+
+from models.snapshot import LocationDelta, Snapshot
+from services.api_service import ApiService
+from services.history_service import HistoryService
+
+
+def make_snapshot(hour, sweden_cases):
+    counts = np.array([[sweden_cases, 1, 0, 0, 0], [5, 0, 0, 0, 0]], dtype=np.int64)
+
+    return Snapshot(["Sweden", "Italy"], counts, ["", ""], datetime.datetime(2020, 3, 1, hour))
+
+
+@pytest.fixture(scope="function")
+def api_service():
+    history_service = HistoryService()
+    api_service = ApiService(history_service)
+
+    for subscriber in [history_service, api_service]:
+        subscriber.on_snapshot(make_snapshot(0, 10), [])
+
+    yield api_service
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_served_with_an_etag(api_service):
+    response = await api_service._handle_snapshot(make_mocked_request("GET", "/api/snapshot"))
+
+    assert json.loads(response.body)["locations"][0] == {
+        "location": "Sweden",
+        "region": "",
+        "parent": "",
+        "cases": 10,
+        "deaths": 1,
+        "serious": 0,
+        "critical": 0,
+        "recovered": 0,
+        "source": "",
+    }
+
+    cached = await api_service._handle_snapshot(
+        make_mocked_request("GET", "/api/snapshot", headers={"If-None-Match": response.headers["ETag"]})
+    )
+
+    assert cached.status == 304
+
+
+@pytest.mark.asyncio
+async def test_etag_only_changes_with_the_data(api_service):
+    etag = api_service.snapshot_json.etag
+
+    api_service.on_snapshot(make_snapshot(1, 10), [])
+
+    assert api_service.snapshot_json.etag == etag
+
+    api_service.on_snapshot(make_snapshot(2, 11), [LocationDelta("Sweden", (10, 1, 0, 0, 0), (11, 1, 0, 0, 0), "")])
+
+    assert api_service.snapshot_json.etag != etag
+
+
+@pytest.mark.asyncio
+async def test_responses_are_gzipped_on_request(api_service):
+    response = await api_service._handle_snapshot_csv(
+        make_mocked_request("GET", "/api/snapshot.csv", headers={"Accept-Encoding": "gzip, deflate"})
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.body).decode().startswith("location,region,parent,cases")
+
+
+@pytest.mark.asyncio
+async def test_history_range(api_service):
+    for hour, cases in [(1, 12), (2, 14)]:
+        api_service.history_service.on_snapshot(make_snapshot(hour, cases), [])
+        api_service.on_snapshot(make_snapshot(hour, cases), [LocationDelta("Sweden", None, None, "")])
+
+    request = make_mocked_request(
+        "GET", "/api/locations/sweden/history?since=2020-03-01T01:00:00", match_info={"location": "sweden"}
+    )
+    history = json.loads((await api_service._handle_history(request)).body)
+
+    assert history["location"] == "Sweden"
+    assert [point["cases"] for point in history["points"]] == [12, 14]
+
+
+@pytest.mark.asyncio
+async def test_history_range_with_a_utc_offset(api_service):
+    for hour, cases in [(1, 12), (2, 14)]:
+        api_service.history_service.on_snapshot(make_snapshot(hour, cases), [])
+
+    request = make_mocked_request(
+        "GET",
+        "/api/locations/sweden/history?since=2020-03-01T02:00:00Z&until=2020-03-01T03:00:00%2B01:00",
+        match_info={"location": "sweden"},
+    )
+    history = json.loads((await api_service._handle_history(request)).body)
+
+    assert [point["cases"] for point in history["points"]] == [14]
@@ -0,0 +1,44 @@
+import datetime
+import numpy as np
+import pytest
+
+from models.snapshot import LocationDelta, Snapshot
+from services.chart_service import ChartService
+from services.history_service import HistoryService
+
+pytest.importorskip("matplotlib")
+
+
+@pytest.fixture(scope="function")
+def chart_service():
+    history_service = HistoryService()
+
+    for hour in range(3):
+        counts = np.array([[10 * hour, hour, 0, 0, hour], [5, 0, 0, 0, 0]], dtype=np.int64)
+        history_service.on_snapshot(
+            Snapshot(["Sweden", "Italy"], counts, ["", ""], datetime.datetime(2020, 3, 1, hour, 30)), []
+        )
+
+    yield ChartService(history_service)
+
+
+@pytest.mark.asyncio
+async def test_chart_is_a_png(chart_service):
+    chart = await chart_service.chart("sweden")
+
+    assert chart.startswith(b"\x89PNG")
+    assert await chart_service.chart("Atlantis") is None
+
+
+@pytest.mark.asyncio
+async def test_chart_is_only_rerendered_when_its_location_changes(chart_service):
+    first = await chart_service.chart("Sweden")
+    italy = await chart_service.chart("Italy")
+
+    assert await chart_service.chart("Sweden") is first
+
+    chart_service.on_snapshot(None, [LocationDelta("Sweden", (20, 2, 0, 0, 2), (30, 2, 0, 0, 2), "")])
+
+    assert await chart_service.chart("Sweden") is not first
+    assert await chart_service.chart("Italy") is italy
+    assert chart_service.metrics_service.counters[("chart_cache_misses_total", ())] == 3
@@ -0,0 +1,90 @@
+from benchmarks.synthetic import generate_rows, render_sheet
+from models.snapshot import Snapshot
+from services.data_parser_service import DataParserService
+from services.query_service import QueryService
+
+
+def render_tab(*sections):
+    body = ""
+
+    for title, rows in sections:
+        body += f"<tr><td>{title}</td><td></td></tr>"
+        # A location without cases has no other counts yet either
+        body += "".join(
+            f"<tr><td>{name}</td><td>{cases}</td>"
+            + "".join(f"<td>{'' if cases == '' else 0}</td>" for _ in range(4))
+            + "</tr>"
+            for name, cases in rows
+        )
+        body += "<tr><td>TOTAL</td></tr>"
+
+    return f"<html><body><table><tbody>{body}</tbody></table></body></html>"
+
+
+def test_every_section_is_parsed():
+    data = DataParserService.create_dataframe_from_bno_data(render_sheet(generate_rows(2)))
+
+    assert data.Location.tolist() == ["Hubei", "Location 000000", "Location 000001"]
+    assert data.attrs["regions"] == ["CHINA", "OTHER PLACES", "OTHER PLACES"]
+    assert list(data.attrs["totals"]) == ["OTHER PLACES"]
+
+
+def test_tabs_are_merged_into_one_hierarchy():
+    rows = generate_rows(1)
+    data = DataParserService.create_dataframe_from_bno_data({"Global": render_sheet(rows), "Copy": render_sheet(rows)})
+
+    assert Snapshot.from_dataframe(data).hierarchy() == {
+        "CHINA": ["Hubei", "Hubei (China)"],
+        "OTHER PLACES": ["Location 000000", "Location 000000 (Other Places)"],
+    }
+
+
+def test_locations_broken_down_on_other_tabs_are_not_counted_twice():
+    raw_data = {
+        "World": render_tab(("INTERNATIONAL", [("United States", 100), ("Canada", 10)])),
+        "US": render_tab(("UNITED STATES", [("New York", 60), ("California", 40)])),
+    }
+    data = DataParserService.create_dataframe_from_bno_data(raw_data)
+    snapshot = Snapshot.from_dataframe(data)
+    query_service = QueryService()
+    query_service.on_snapshot(snapshot, snapshot.diff(None))
+
+    assert data.Location.tolist() == [
+        "United States",
+        "Canada",
+        "New York (United States)",
+        "California (United States)",
+    ]
+    assert data.attrs["parents"] == ["", "", "United States", "United States"]
+    assert query_service.total().startswith("Cases: 110,")
+
+
+def test_sub_tab_names_do_not_depend_on_order():
+    raw_data = {
+        "World": render_tab(("INTERNATIONAL", [("Canada", 10)])),
+        "US": render_tab(("UNITED STATES", [("Georgia", 5)])),
+    }
+
+    assert DataParserService.create_dataframe_from_bno_data(raw_data).Location.tolist() == [
+        "Canada",
+        "Georgia (United States)",
+    ]
+
+
+def test_locations_without_counts_do_not_start_a_section():
+    data = DataParserService.create_dataframe_from_bno_data(
+        render_tab(("INTERNATIONAL", [("Sweden", 5), ("Narnia", ""), ("Italy", 7)]))
+    )
+
+    assert data.Location.tolist() == ["Sweden", "Narnia", "Italy"]
+    assert data.attrs["regions"] == ["INTERNATIONAL"] * 3
+
+
+def test_capitalised_locations_without_counts_do_not_start_a_section():
+    data = DataParserService.create_dataframe_from_bno_data(
+        render_tab(("INTERNATIONAL", [("Sweden", 5), ("UAE", ""), ("Italy", 7)]), ("OTHER PLACES", [("Gozo", 1)]))
+    )
+
+    assert data.Location.tolist() == ["Sweden", "UAE", "Italy", "Gozo"]
+    assert data.attrs["regions"] == ["INTERNATIONAL"] * 3 + ["OTHER PLACES"]
+    assert list(data.attrs["totals"]) == ["INTERNATIONAL", "OTHER PLACES"]
@@ -0,0 +1,41 @@
+import datetime
+import pytest
+
+from models.snapshot import LocationDelta
+from services.debounce_service import DebounceService
+
+START = datetime.datetime(2020, 3, 1, 12, 0, 0)
+
+
+def at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+
+@pytest.fixture(scope="function")
+def debounce_service():
+    yield DebounceService(120)
+
+
+def test_changes_are_held_until_settled(debounce_service):
+    delta = LocationDelta("Italy", (100, 1, 0, 0, 0), (110, 1, 0, 0, 0), "")
+
+    debounce_service.add([delta], at(0))
+
+    assert debounce_service.flush(at(60)) == []
+    assert debounce_service.flush(at(120)) == [delta]
+    assert debounce_service.pending == {}
+
+
+def test_reverted_changes_are_dropped(debounce_service):
+    debounce_service.add([LocationDelta("Italy", (100, 1, 0, 0, 0), (1000, 1, 0, 0, 0), "")], at(0))
+    debounce_service.add([LocationDelta("Italy", (1000, 1, 0, 0, 0), (100, 1, 0, 0, 0), "")], at(60))
+
+    assert debounce_service.flush(at(120)) == []
+    assert debounce_service.pending == {}
+
+
+def test_successive_changes_are_merged(debounce_service):
+    debounce_service.add([LocationDelta("Italy", (100, 1, 0, 0, 0), (1000, 1, 0, 0, 0), "")], at(0))
+    debounce_service.add([LocationDelta("italy", (1000, 1, 0, 0, 0), (105, 1, 0, 0, 0), "")], at(60))
+
+    assert debounce_service.flush(at(120)) == [LocationDelta("Italy", (100, 1, 0, 0, 0), (105, 1, 0, 0, 0), "")]
@@ -0,0 +1,140 @@
+import asyncio
+import discord
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from services.delivery_service import DeliveryService
+from services.send_cache_service import SendCacheService
+
+
+class AsyncMock(MagicMock):
+    async def __call__(self, *args, **kwargs):
+        return super(AsyncMock, self).__call__(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_high_priority_messages_jump_the_queue():
+    delivery_service = DeliveryService(logger=MagicMock())
+
+    channel = MagicMock()
+    channel.send = AsyncMock()
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.side_effect = [False, False, False, True]
+
+    delivery_service.enqueue(1234567, "first update")
+    delivery_service.enqueue(1234567, "second update")
+    delivery_service.enqueue(1234567, "alert", DeliveryService.HIGH_PRIORITY)
+
+    await delivery_service.run(discord_client)
+
+    assert [c[0][0] for c in channel.send.call_args_list] == ["alert", "first update", "second update"]
+    assert delivery_service.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_messages_are_dropped():
+    delivery_service = DeliveryService(logger=MagicMock(), send_cache_service=SendCacheService())
+
+    channel = MagicMock()
+    channel.send = AsyncMock()
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.side_effect = [False] * 4 + [True]
+
+    # The same cycle processed twice, then a later cycle with the same content
+    for cycle in ["cycle-1", "cycle-1", "cycle-2"]:
+        with delivery_service.batch(cycle):
+            delivery_service.enqueue(1234567, "update")
+
+    with delivery_service.batch("cycle-2"):
+        delivery_service.enqueue(1234567, "other update")
+
+    await delivery_service.run(discord_client)
+
+    assert [c[0][0] for c in channel.send.call_args_list] == ["update", "update", "other update"]
+
+
+@pytest.mark.asyncio
+async def test_a_send_that_may_have_arrived_is_not_sent_again():
+    delivery_service = DeliveryService(logger=MagicMock(), send_cache_service=SendCacheService())
+
+    channel = MagicMock()
+    channel.send = AsyncMock(side_effect=[asyncio.TimeoutError(), None])
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.side_effect = [False, False, True]
+
+    with delivery_service.batch("cycle-1"):
+        delivery_service.enqueue(1234567, "update")
+
+    with patch.object(DeliveryService, "RETRY_DELAY", 0):
+        await delivery_service.run(discord_client)
+
+    assert channel.send.call_count == 1
+    assert delivery_service.metrics_service.counters[("duplicates_dropped_total", ())] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_and_server_errors_are_retried():
+    delivery_service = DeliveryService(logger=MagicMock())
+
+    channel = MagicMock()
+    channel.send = AsyncMock(side_effect=[discord.HTTPException(MagicMock(status=503), "unavailable"), None])
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.side_effect = [False, False, True]
+
+    delivery_service.enqueue(1234567, "update")
+
+    with patch.object(DeliveryService, "RETRY_DELAY", 0):
+        await delivery_service.run(discord_client)
+
+    assert channel.send.call_count == 2
+    assert delivery_service.metrics_service.counters[("send_retries_total", ())] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_channels_and_unexpected_errors_dont_stop_delivery():
+    delivery_service = DeliveryService(logger=MagicMock())
+
+    channel = MagicMock()
+    channel.send = AsyncMock(side_effect=[RuntimeError("connection reset"), None, None])
+
+    discord_client = MagicMock()
+    discord_client.get_channel.side_effect = lambda channel_id: channel if channel_id == 1234567 else None
+    discord_client.is_closed.side_effect = [False, False, False, False, True]
+
+    delivery_service.enqueue(7654321, "update")
+    delivery_service.enqueue(1234567, "update")
+    delivery_service.enqueue(1234567, "other update")
+
+    with patch.object(DeliveryService, "RETRY_DELAY", 0):
+        await delivery_service.run(discord_client)
+
+    assert sorted(c[0][0] for c in channel.send.call_args_list) == ["other update", "update", "update"]
+    assert delivery_service.metrics_service.counters[("missing_channels_total", ())] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelling_delivery_stops_it():
+    delivery_service = DeliveryService(logger=MagicMock())
+
+    channel = MagicMock()
+    channel.send = AsyncMock(side_effect=asyncio.CancelledError())
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.return_value = False
+
+    delivery_service.enqueue(1234567, "update")
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(delivery_service.run(discord_client), 1)
+
+    assert ("send_retries_total", ()) not in delivery_service.metrics_service.counters
@@ -0,0 +1,128 @@
+import asyncio
+import datetime
+import json
+import numpy as np
+import pytest
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from models.snapshot import LocationDelta, Snapshot
+from services.feed_service import FeedService
+
+SNAPSHOT = Snapshot(["Sweden"], np.array([[11, 1, 0, 0, 0]]), [""], datetime.datetime(2020, 3, 1))
+
+
+def make_deltas(cases):
+    return [LocationDelta("Sweden", (cases - 1, 1, 0, 0, 0), (cases, 1, 0, 0, 0), "")]
+
+
+def parse_event(event):
+    fields = dict(line.split(": ", 1) for line in event.decode().strip().split("\n"))
+
+    return fields["id"], json.loads(fields["data"])
+
+
+async def read_events(response, count):
+    events = []
+    event = b""
+
+    while len(events) < count:
+        line = await response.content.readline()
+        event += line
+
+        if line == b"\n":
+            events.append(event)
+            event = b""
+
+    return events
+
+
+def test_changes_are_serialised_once_with_a_sequence():
+    feed_service = FeedService(epoch=7)
+
+    feed_service.on_snapshot(SNAPSHOT, [])
+    feed_service.on_snapshot(SNAPSHOT, make_deltas(11))
+
+    sequence, data = parse_event(feed_service.events[-1][1])
+
+    assert sequence == "7-1"
+    assert data["changes"] == [
+        {
+            "location": "Sweden",
+            "before": {"cases": 10, "deaths": 1, "serious": 0, "critical": 0, "recovered": 0},
+            "after": {"cases": 11, "deaths": 1, "serious": 0, "critical": 0, "recovered": 0},
+            "source": "",
+        }
+    ]
+
+
+def test_replay_returns_missed_events_or_none_when_they_have_been_dropped():
+    feed_service = FeedService(buffer_size=2)
+
+    for cases in range(11, 14):
+        feed_service.on_snapshot(SNAPSHOT, make_deltas(cases))
+
+    assert [sequence for sequence, _ in feed_service.replay(1)] == [2, 3]
+    assert feed_service.replay(3) == []
+    assert feed_service.replay(0) is None
+    assert feed_service.replay(5) is None
+
+
+def test_slow_clients_are_disconnected_without_affecting_others():
+    feed_service = FeedService(client_buffer=2)
+    slow, fast = asyncio.Queue(maxsize=2), asyncio.Queue(maxsize=2)
+    feed_service.clients.update([slow, fast])
+
+    for cases in range(11, 14):
+        feed_service.on_snapshot(SNAPSHOT, make_deltas(cases))
+
+        if not fast.empty():
+            fast.get_nowait()
+
+    assert feed_service.clients == {fast}
+    assert slow.get_nowait() is None
+    assert feed_service.metrics_service.counters[("feed_slow_clients_total", ())] == 1
+
+
+@pytest.mark.asyncio
+async def test_clients_resume_from_the_last_event_id():
+    feed_service = FeedService(epoch=7)
+
+    for cases in range(11, 14):
+        feed_service.on_snapshot(SNAPSHOT, make_deltas(cases))
+
+    app = web.Application()
+    app.router.add_get("/feed", feed_service._handle_feed)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/feed", headers={"Last-Event-ID": "7-1"})
+        missed = await read_events(response, 2)
+
+        feed_service.on_snapshot(SNAPSHOT, make_deltas(14))
+        live = await read_events(response, 1)
+
+        response.close()
+
+    assert [parse_event(event)[0] for event in missed + live] == ["7-2", "7-3", "7-4"]
+
+
+@pytest.mark.asyncio
+async def test_clients_of_a_previous_process_are_reset():
+    feed_service = FeedService(epoch=8)
+    feed_service.on_snapshot(SNAPSHOT, make_deltas(11))
+
+    app = web.Application()
+    app.router.add_get("/feed", feed_service._handle_feed)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/feed", headers={"Last-Event-ID": "7-500"})
+        reset = await read_events(response, 1)
+
+        feed_service.on_snapshot(SNAPSHOT, make_deltas(12))
+        live = await read_events(response, 1)
+
+        response.close()
+
+    assert reset[0].startswith(b"event: reset")
+    assert parse_event(live[0])[0] == "8-2"
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from unittest.mock import MagicMock
+
+from models.snapshot import Snapshot
+from services.leaderboard_service import LeaderboardService
+from services.updater_service import UpdaterService
+
+
+def make_snapshot(data):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+
+    return Snapshot.from_dataframe(pd.DataFrame(data, columns=columns))
+
+
+INITIAL = [
+    ["Australia", "2", "1", "0", "0", "4", ""],
+    ["Sweden", "5", "2", "0", "0", "0", ""],
+    ["Italy", "9", "0", "0", "0", "1", ""],
+]
+
+
+@pytest.fixture(scope="function")
+def leaderboard_service():
+    service = LeaderboardService()
+    snapshot = make_snapshot(INITIAL)
+    service.on_snapshot(snapshot, snapshot.diff(None))
+
+    yield service
+
+
+def test_top(leaderboard_service):
+    assert leaderboard_service.top("cases", 2) == [("Italy", 9), ("Sweden", 5)]
+    assert leaderboard_service.top("recovered", 1) == [("Australia", 4)]
+
+
+def test_totals(leaderboard_service):
+    assert leaderboard_service.totals == [16, 3, 0, 0, 5]
+
+
+def test_deltas_update_rankings_and_totals(leaderboard_service):
+    snapshot = make_snapshot([["Australia", "12", "1", "0", "0", "4", ""], ["Sweden", "5", "2", "0", "0", "0", ""]])
+    leaderboard_service.on_snapshot(snapshot, snapshot.diff(make_snapshot(INITIAL)))
+
+    assert leaderboard_service.top("cases", 3) == [("Australia", 12), ("Sweden", 5)]
+    assert leaderboard_service.total("cases") == 17
+    assert leaderboard_service.total("recovered") == 4
+
+
+def test_locations_are_matched_ignoring_case(leaderboard_service):
+    snapshot = make_snapshot(
+        [["AUSTRALIA", "3", "1", "0", "0", "4", ""], ["Sweden", "5", "2", "0", "0", "0", ""], INITIAL[2]]
+    )
+    leaderboard_service.on_snapshot(snapshot, snapshot.diff(make_snapshot(INITIAL)))
+
+    assert leaderboard_service.top("cases", 3) == [("Italy", 9), ("Sweden", 5), ("AUSTRALIA", 3)]
+    assert leaderboard_service.total("cases") == 17
+
+
+def test_leaderboard_output(leaderboard_service):
+    updater_service = UpdaterService(
+        MagicMock(),
+        MagicMock(),
+        1,
+        1234567,
+        "leaderboard",
+        MagicMock(),
+        leaderboard_service=leaderboard_service,
+    )
+
+    messages = updater_service._make_update_message(None, None)
+
+    assert len(messages) == 1
+    assert "Italy (9)" in messages[0]
+    assert "16" in messages[0]
+
+
+def test_only_top_level_locations_are_counted():
+    service = LeaderboardService()
+    data = pd.DataFrame(
+        [["United States", "100", "0", "0", "0", "0", ""], ["New York (United States)", "60", "0", "0", "0", "0", ""]],
+        columns=["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"],
+    )
+    data.attrs["parents"] = ["", "United States"]
+    snapshot = Snapshot.from_dataframe(data)
+
+    service.on_snapshot(snapshot, snapshot.diff(None))
+
+    assert service.total("cases") == 100
+    assert service.top("cases", 10) == [("United States", 100)]
@@ -0,0 +1,68 @@
+import pytest
+import tracemalloc
+
+from unittest.mock import MagicMock, patch
+
+from services.memory_watchdog_service import MEGABYTE, MemoryWatchdogService
+
+
+@pytest.fixture(scope="function")
+def memory_watchdog_service():
+    yield MemoryWatchdogService(
+        sample_every=2,
+        soft_limit_mb=100,
+        hard_limit_mb=200,
+        trimmables=[MagicMock()],
+        persist=MagicMock(),
+        logger=MagicMock(),
+    )
+
+    tracemalloc.stop()
+
+
+def test_memory_is_only_sampled_every_n_cycles(memory_watchdog_service):
+    with patch.object(MemoryWatchdogService, "read_rss", return_value=50 * MEGABYTE) as read_rss:
+        memory_watchdog_service.on_cycle()
+        memory_watchdog_service.on_cycle()
+
+    read_rss.assert_called_once()
+
+
+def test_caches_are_trimmed_past_the_soft_limit(memory_watchdog_service):
+    with patch.object(MemoryWatchdogService, "read_rss", return_value=150 * MEGABYTE):
+        assert not memory_watchdog_service.on_cycle()
+        assert not memory_watchdog_service.on_cycle()
+
+    memory_watchdog_service.trimmables[0].trim.assert_called_once()
+    memory_watchdog_service.persist.assert_not_called()
+
+
+def test_allocations_are_traced_for_one_sample_past_the_soft_limit(memory_watchdog_service):
+    rss = [150, 150, 150, 50, 150]
+    tracing = []
+
+    with patch.object(MemoryWatchdogService, "read_rss", side_effect=[mb * MEGABYTE for mb in rss]):
+        for _ in rss:
+            memory_watchdog_service.on_cycle()
+            memory_watchdog_service.on_cycle()
+            tracing.append(tracemalloc.is_tracing())
+
+    assert tracing == [True, False, False, False, True]
+
+
+def test_sampling_more_than_every_cycle_is_rejected():
+    with pytest.raises(ValueError):
+        MemoryWatchdogService(sample_every=0)
+
+
+def test_state_is_persisted_past_the_hard_limit(memory_watchdog_service):
+    with patch.object(MemoryWatchdogService, "read_rss", return_value=250 * MEGABYTE):
+        memory_watchdog_service.on_cycle()
+        assert memory_watchdog_service.on_cycle()
+
+    memory_watchdog_service.persist.assert_called_once()
+    assert memory_watchdog_service.exit_code == MemoryWatchdogService.EXIT_CODE
+
+
+def test_rss_can_be_read():
+    assert MemoryWatchdogService.read_rss() > 0
@@ -0,0 +1,30 @@
+import pytest
+
+from services.metrics_service import MetricsService
+
+
+@pytest.fixture(scope="function")
+def metrics_service():
+    yield MetricsService()
+
+
+def test_counters_and_gauges_are_rendered(metrics_service):
+    metrics_service.increment("cycles_total")
+    metrics_service.increment("cycles_total")
+    metrics_service.set_gauge("sheet_rows", 200)
+
+    rendered = metrics_service.render()
+
+    assert "# TYPE coronavirus_bot_cycles_total counter\ncoronavirus_bot_cycles_total 2\n" in rendered
+    assert "coronavirus_bot_sheet_rows 200\n" in rendered
+
+
+def test_stage_timings_are_recorded_as_histograms(metrics_service):
+    with metrics_service.time("parse"):
+        pass
+
+    rendered = metrics_service.render()
+
+    assert "# TYPE coronavirus_bot_stage_duration_seconds histogram" in rendered
+    assert 'coronavirus_bot_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 1' in rendered
+    assert 'coronavirus_bot_stage_duration_seconds_count{stage="parse"} 1' in rendered
@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import discord
+import pytest
+
+from unittest.mock import MagicMock
+
+from services.delivery_service import Attachment, DeliveryService
+from services.outbox_service import OutboxService
+from utils.clock import VirtualClock
+
+
+class AsyncMock(MagicMock):
+    async def __call__(self, *args, **kwargs):
+        return super(AsyncMock, self).__call__(*args, **kwargs)
+
+
+def test_messages_round_trip(tmp_path):
+    outbox_service = OutboxService(str(tmp_path / "outbox.sqlite3"))
+    embed = discord.Embed(title="Update", timestamp=datetime.datetime(2020, 3, 1))
+    messages = ["update", embed, Attachment(embed, "changes.csv", b"Location\n")]
+
+    outbox_service.add(
+        [(1234567, message, DeliveryService.NORMAL_PRIORITY) for message in messages], datetime.datetime(2020, 3, 1)
+    )
+    pending = outbox_service.pending()
+
+    assert pending[0][2] == "update"
+    assert pending[0][4] == datetime.datetime(2020, 3, 1)
+    assert pending[1][2].to_dict() == embed.to_dict()
+    assert pending[2][2].data == b"Location\n"
+
+
+@pytest.mark.asyncio
+async def test_unsent_messages_are_resent_after_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+
+    delivery_service = DeliveryService(logger=MagicMock(), outbox_service=OutboxService(path))
+
+    with delivery_service.batch():
+        delivery_service.enqueue(1234567, "first update")
+        delivery_service.enqueue(1234567, "second update")
+
+    channel = MagicMock()
+    channel.send = AsyncMock()
+
+    discord_client = MagicMock()
+    discord_client.get_channel.return_value = channel
+    discord_client.is_closed.side_effect = [False, True]
+
+    await delivery_service.run(discord_client)
+
+    restarted_delivery_service = DeliveryService(logger=MagicMock(), outbox_service=OutboxService(path))
+    discord_client.is_closed.side_effect = [False, True]
+
+    await restarted_delivery_service.run(discord_client)
+
+    assert [c[0][0] for c in channel.send.call_args_list] == ["first update", "second update"]
+    assert restarted_delivery_service.outbox_service.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_stale_messages_are_not_resent_after_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    clock = VirtualClock()
+
+    DeliveryService(logger=MagicMock(), outbox_service=OutboxService(path), clock=clock).enqueue(1234567, "update")
+    clock.advance(7200)
+
+    restarted_delivery_service = DeliveryService(logger=MagicMock(), outbox_service=OutboxService(path), clock=clock)
+
+    assert restarted_delivery_service.depth() == 0
+    assert restarted_delivery_service.outbox_service.pending() == []
+
+
+def test_failed_batch_is_not_queued():
+    delivery_service = DeliveryService(logger=MagicMock())
+
+    with pytest.raises(ValueError):
+        with delivery_service.batch():
+            delivery_service.enqueue(1234567, "update")
+            raise ValueError()
+
+    assert delivery_service.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_not_shared_between_tasks():
+    delivery_service = DeliveryService(logger=MagicMock())
+    entered = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def failing_cycle():
+        with delivery_service.batch():
+            delivery_service.enqueue(1234567, "failed update")
+            entered.set()
+            await finished.wait()
+            raise ValueError()
+
+    async def successful_cycle():
+        await entered.wait()
+
+        with delivery_service.batch():
+            delivery_service.enqueue(1234567, "update")
+
+        finished.set()
+
+    results = await asyncio.gather(failing_cycle(), successful_cycle(), return_exceptions=True)
+
+    assert type(results[0]) == ValueError
+    assert delivery_service.depth() == 1
+    assert delivery_service.queue.get_nowait()[3] == "update"
@@ -0,0 +1,66 @@
+import asyncio
+import datetime
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_rows, render_sheet
+from models.snapshot import Snapshot
+from services.data_parser_service import DataParserService
+from services.metrics_service import MetricsService
+from services.parse_cache_service import ParseCacheService
+
+
+def test_identical_payloads_share_a_fingerprint():
+    html = render_sheet(generate_rows(3))
+
+    assert ParseCacheService.fingerprint(html) == ParseCacheService.fingerprint(str(html))
+    assert ParseCacheService.fingerprint(html) != ParseCacheService.fingerprint(html + " ")
+    assert ParseCacheService.fingerprint({"a": html}) != ParseCacheService.fingerprint({"b": html})
+
+
+def test_hits_are_restamped_and_counted():
+    parse_cache_service = ParseCacheService(metrics_service=MetricsService())
+    data = DataParserService.create_dataframe_from_bno_data(render_sheet(generate_rows(3)))
+    snapshot = Snapshot.from_dataframe(data, datetime.datetime(2020, 3, 1))
+
+    assert parse_cache_service.get("key", datetime.datetime(2020, 3, 1)) is None
+
+    parse_cache_service.put("key", data, snapshot)
+    cached_data, cached_snapshot = parse_cache_service.get("key", datetime.datetime(2020, 3, 2))
+
+    assert cached_data is data
+    assert cached_snapshot.timestamp == datetime.datetime(2020, 3, 2)
+    assert snapshot.timestamp == datetime.datetime(2020, 3, 1)
+    assert parse_cache_service.metrics_service.counters[("parse_cache_hits_total", ())] == 1
+    assert parse_cache_service.metrics_service.counters[("parse_cache_misses_total", ())] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    parse_cache_service = ParseCacheService(max_entries=2)
+    snapshot = Snapshot([], np.zeros((0, 5), dtype=np.int64), [])
+
+    parse_cache_service.put("a", None, snapshot)
+    parse_cache_service.put("b", None, snapshot)
+    parse_cache_service.get("a", None)
+    parse_cache_service.put("c", None, snapshot)
+
+    assert list(parse_cache_service.entries) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_a_payload_share_one_parse():
+    parse_cache_service = ParseCacheService()
+    data = DataParserService.create_dataframe_from_bno_data(render_sheet(generate_rows(3)))
+    parses = []
+
+    async def parse():
+        parses.append(1)
+        await asyncio.sleep(0)
+        return data, Snapshot.from_dataframe(data, datetime.datetime(2020, 3, 1))
+
+    results = await asyncio.gather(
+        *[parse_cache_service.get_or_parse("key", datetime.datetime(2020, 3, day), parse) for day in [1, 2]]
+    )
+
+    assert len(parses) == 1
+    assert [snapshot.timestamp.day for _, snapshot in results] == [1, 2]
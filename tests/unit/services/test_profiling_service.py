@@ -0,0 +1,58 @@
+import asyncio
+import os
+import pytest
+
+from unittest.mock import MagicMock
+
+from services.profiling_service import NULL_CONTEXT, ProfilingService
+
+
+def test_disabled_profiling_does_nothing(tmp_path):
+    profiling_service = ProfilingService(str(tmp_path), logger=MagicMock())
+
+    assert profiling_service.cycle() is NULL_CONTEXT
+    assert profiling_service.stage("parse") is NULL_CONTEXT
+
+
+def test_requested_cycles_are_profiled(tmp_path):
+    profiling_service = ProfilingService(str(tmp_path), logger=MagicMock())
+    profiling_service.request(1)
+
+    with profiling_service.cycle():
+        with profiling_service.stage("parse"):
+            sorted(range(1000), reverse=True)
+
+    files = sorted(os.listdir(tmp_path))
+
+    assert len(files) == 2
+    assert "Top allocations during stage 'parse'" in (tmp_path / files[1]).read_text()
+    assert profiling_service.cycle() is NULL_CONTEXT
+
+
+@pytest.mark.asyncio
+async def test_overlapping_cycles_are_profiled_one_at_a_time(tmp_path):
+    profiling_service = ProfilingService(str(tmp_path), logger=MagicMock())
+    profiling_service.request(2)
+    stages = []
+
+    async def pipeline(delay):
+        with profiling_service.cycle():
+            await asyncio.sleep(delay)
+            stages.append(profiling_service.stage("parse"))
+
+    await asyncio.gather(pipeline(0.02), pipeline(0.01))
+
+    assert stages[0] is NULL_CONTEXT and stages[1] is not NULL_CONTEXT
+    assert len(os.listdir(tmp_path)) == 2
+    assert profiling_service.remaining_cycles == 1
+
+
+def test_old_profiles_are_rotated(tmp_path):
+    profiling_service = ProfilingService(str(tmp_path), max_profiles=2, logger=MagicMock())
+    profiling_service.request(3)
+
+    for _ in range(3):
+        with profiling_service.cycle():
+            pass
+
+    assert len(os.listdir(tmp_path)) == 4
@@ -0,0 +1,104 @@
+import datetime
+import discord
+import pandas as pd
+import pytest
+
+from unittest.mock import MagicMock
+
+from models.snapshot import Snapshot
+from services.query_service import QueryService
+from services.region_service import RegionService
+
+
+def make_snapshot(data):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+
+    return Snapshot.from_dataframe(pd.DataFrame(data, columns=columns), datetime.datetime(2020, 3, 1))
+
+
+@pytest.fixture(scope="function")
+def query_service():
+    service = QueryService(logger=MagicMock())
+    snapshot = make_snapshot(
+        [["Australia", "2", "1", "0", "0", "0", ""], ["Sweden", "5", "2", "0", "0", "0", ""]]
+    )
+    service.on_snapshot(snapshot, snapshot.diff(None))
+
+    yield service
+
+
+def test_location_lookup_is_case_insensitive(query_service):
+    response = query_service.handle_command("!covid sWeDeN")
+
+    assert type(response) == discord.Embed
+    assert "Sweden" in response.title
+
+
+def test_unknown_location(query_service):
+    assert query_service.handle_command("!covid Narnia") == "No data found for **Narnia**"
+
+
+def test_non_commands_are_ignored(query_service):
+    assert query_service.handle_command("hello there") is None
+    assert query_service.handle_command("!unknown") is None
+
+
+def test_top(query_service):
+    expected = "1. **Sweden** - 5 cases\n2. **Australia** - 2 cases"
+
+    assert query_service.handle_command("!top 10") == expected
+
+
+def test_top_by_metric(query_service):
+    expected = "1. **Sweden** - 2 deaths"
+
+    assert query_service.handle_command("!top 1 deaths") == expected
+
+
+def test_total(query_service):
+    expected = "Cases: 7, Deaths: 3, Serious: 0, Critical: 0, Recovered: 0"
+
+    assert query_service.handle_command("!total") == expected
+
+
+def test_embed_cache_only_invalidated_for_changed_locations(query_service):
+    australia = query_service.handle_command("!covid australia")
+    sweden = query_service.handle_command("!covid sweden")
+
+    snapshot = make_snapshot([["Australia", "2", "1", "0", "0", "0", ""], ["Sweden", "6", "2", "0", "0", "0", ""]])
+    query_service.on_snapshot(snapshot, snapshot.diff(query_service.snapshot))
+
+    assert query_service.handle_command("!covid australia") is australia
+    assert query_service.handle_command("!covid sweden") is not sweden
+
+
+def test_embeds_are_built_on_first_query(query_service):
+    assert query_service.embed_cache == {}
+
+    query_service.handle_command("!covid sweden")
+
+    assert list(query_service.embed_cache) == ["sweden"]
+
+
+def test_latency_recorded(query_service):
+    query_service.handle_command("!total")
+
+    assert len(query_service.latencies) == 1
+    assert query_service.latency_percentile(99) >= 0
+
+
+def test_region():
+    region_service = RegionService()
+    query_service = QueryService(region_service=region_service)
+    snapshot = make_snapshot(
+        [["United States", "4", "1", "0", "0", "0", ""], ["Sweden", "5", "2", "0", "0", "0", ""]]
+    )
+
+    for subscriber in [region_service, query_service]:
+        subscriber.on_snapshot(snapshot, snapshot.diff(None))
+
+    assert query_service.handle_command("!region europe") == (
+        "**Europe** (1 locations) - Cases: 5, Deaths: 2, Serious: 0, Critical: 0, Recovered: 0"
+    )
+    assert query_service.handle_command("!region Narnia") == "No region or continent found called **Narnia**"
+    assert "United States" in query_service.handle_command("!covid usa").title
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from models.snapshot import Snapshot
+from services.region_service import RegionService
+
+
+def make_snapshot(rows):
+    locations, regions, counts = zip(*rows)
+    parents = ["United States" if region == "UNITED STATES" else "" for region in regions]
+
+    return Snapshot(locations, np.array(counts, dtype=np.int64), [""] * len(rows), regions=regions, parents=parents)
+
+
+@pytest.fixture(scope="function")
+def region_service():
+    service = RegionService()
+    snapshot = make_snapshot(
+        [
+            ["Sweden", "INTERNATIONAL", [5, 2, 0, 0, 0]],
+            ["Italy", "INTERNATIONAL", [100, 3, 0, 0, 0]],
+            ["United States", "INTERNATIONAL", [7, 0, 0, 0, 0]],
+            ["Georgia", "UNITED STATES", [7, 0, 0, 0, 0]],
+        ]
+    )
+    service.on_snapshot(snapshot, snapshot.diff(None))
+
+    yield service
+
+
+def test_metadata(region_service):
+    assert region_service.metadata("georgia") == ("Georgia", "United States", "North America", (), "United States")
+    assert region_service.metadata("Sweden").continent == "Europe"
+    assert region_service.metadata("Narnia") is None
+
+
+def test_rollups_by_region_and_continent(region_service):
+    assert region_service.rollup("europe") == ("Europe", (105, 5, 0, 0, 0), 2)
+    assert region_service.rollup("USA") == ("United States", (7, 0, 0, 0, 0), 1)
+    assert region_service.rollup("Asia") is None
+
+
+def test_sub_locations_only_count_towards_their_region(region_service):
+    assert region_service.rollup("North America") == ("North America", (7, 0, 0, 0, 0), 1)
+    assert region_service.rollup("International") == ("International", (112, 5, 0, 0, 0), 3)
+
+
+def test_rollups_are_updated_from_deltas(region_service):
+    previous = make_snapshot(
+        [
+            ["Sweden", "INTERNATIONAL", [5, 2, 0, 0, 0]],
+            ["Italy", "INTERNATIONAL", [100, 3, 0, 0, 0]],
+            ["United States", "INTERNATIONAL", [7, 0, 0, 0, 0]],
+            ["Georgia", "UNITED STATES", [7, 0, 0, 0, 0]],
+        ]
+    )
+    latest = make_snapshot(
+        [
+            ["Sweden", "INTERNATIONAL", [6, 2, 0, 0, 0]],
+            ["United States", "INTERNATIONAL", [7, 0, 0, 0, 0]],
+            ["Georgia", "UNITED STATES", [7, 0, 0, 0, 0]],
+            ["Japan", "INTERNATIONAL", [3, 0, 0, 0, 0]],
+        ]
+    )
+
+    region_service.on_snapshot(latest, latest.diff(previous))
+
+    assert region_service.rollup("Europe") == ("Europe", (6, 2, 0, 0, 0), 1)
+    assert region_service.rollup("Asia") == ("Asia", (3, 0, 0, 0, 0), 1)
+    assert region_service.rollup("International") == ("International", (16, 2, 0, 0, 0), 3)
+    assert region_service.metadata("Italy") is None
@@ -0,0 +1,98 @@
+import pytest
+
+from unittest.mock import MagicMock
+
+from benchmarks.synthetic import generate_rows, mutate_rows, render_sheet
+from models.snapshot import Snapshot
+from services.data_parser_service import DataParserService
+from services.sanity_service import SanityService
+
+
+def make_snapshot(rows):
+    return Snapshot.from_dataframe(DataParserService.create_dataframe_from_bno_data(render_sheet(rows)))
+
+
+@pytest.fixture(scope="function")
+def sanity_service():
+    yield SanityService(logger=MagicMock())
+
+
+def test_consistent_snapshot_is_admitted(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+    snapshot = make_snapshot(mutate_rows(rows, 0.1))
+
+    assert sanity_service.check(snapshot, previous, snapshot.diff(previous)) == []
+    assert sanity_service.admit(snapshot, previous, snapshot.diff(previous))
+
+
+def test_partial_load_is_quarantined_until_confirmed(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+    partial = make_snapshot(rows[:20])
+
+    assert not sanity_service.admit(partial, previous, partial.diff(previous))
+    assert sanity_service.admit(make_snapshot(rows[:20]), previous, partial.diff(previous))
+
+
+def test_different_suspicious_snapshot_restarts_the_quarantine(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+
+    assert not sanity_service.admit(make_snapshot(rows[:20]), previous, [])
+    assert not sanity_service.admit(make_snapshot(rows[:30]), previous, [])
+
+
+def test_mass_changes_are_flagged(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+    snapshot = make_snapshot(mutate_rows(rows, 0.8))
+
+    assert "40 of 51 locations changed at once" in sanity_service.check(snapshot, previous, snapshot.diff(previous))
+
+
+def test_counts_must_add_up_to_the_total_row(sanity_service):
+    rows = generate_rows(5)
+    missing_row = "<tr>" + "".join(f"<td>{value}</td>" for value in rows[4]) + "</tr>"
+    html = render_sheet(rows).replace(missing_row, "")
+    snapshot = Snapshot.from_dataframe(DataParserService.create_dataframe_from_bno_data(html))
+
+    problems = sanity_service.check(snapshot, None, [])
+
+    assert problems and all("in OTHER PLACES add up to" in problem for problem in problems)
+
+
+def test_burst_of_changes_is_admitted_when_it_keeps_tripping_the_same_check(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+    first = make_snapshot(mutate_rows(rows, 0.8, seed=1))
+    second = make_snapshot(mutate_rows(rows, 0.9, seed=2))
+
+    assert not sanity_service.admit(first, previous, first.diff(previous))
+    assert sanity_service.admit(second, previous, second.diff(previous))
+
+
+def test_changed_fraction_is_not_checked_while_catching_up(sanity_service):
+    rows = generate_rows(50)
+    previous = make_snapshot(rows)
+    snapshot = make_snapshot(mutate_rows(rows, 0.8))
+
+    sanity_service.catch_up()
+
+    assert sanity_service.admit(snapshot, previous, snapshot.diff(previous))
+    assert not sanity_service.catching_up
+
+
+def test_a_confirmed_drift_from_the_total_row_is_accepted_while_it_lasts(sanity_service):
+    rows = generate_rows(5)
+    missing_row = "<tr>" + "".join(f"<td>{value}</td>" for value in rows[4]) + "</tr>"
+    drifting = render_sheet(rows).replace(missing_row, "")
+
+    def admit(html):
+        snapshot = Snapshot.from_dataframe(DataParserService.create_dataframe_from_bno_data(html))
+
+        return sanity_service.admit(snapshot, None, [])
+
+    assert [admit(drifting) for _ in range(4)] == [False, True, True, True]
+    assert admit(render_sheet(rows))
+    assert not admit(drifting)
@@ -0,0 +1,78 @@
+import datetime
+import random
+
+from services.metrics_service import MetricsService
+from services.scheduler_service import AdaptiveScheduler, ExponentialBackoff, FixedScheduler
+from utils.clock import VirtualClock
+
+
+def make_scheduler(**kwargs):
+    return AdaptiveScheduler(
+        300,
+        min_interval=60,
+        max_interval=900,
+        metrics_service=MetricsService(),
+        clock=VirtualClock(datetime.datetime(2020, 3, 1)),
+        rng=random.Random(0),
+        **kwargs,
+    )
+
+
+def test_fixed_scheduler_always_returns_the_same_interval():
+    scheduler = FixedScheduler(300)
+
+    assert scheduler.next_interval(True) == 300
+    assert scheduler.next_interval(False) == 300
+
+
+def test_interval_tightens_while_data_changes_but_never_below_the_minimum():
+    scheduler = make_scheduler(jitter=0)
+
+    assert [scheduler.next_interval(True) for _ in range(4)] == [150, 75, 60, 60]
+
+
+def test_interval_backs_off_while_quiet_up_to_the_maximum():
+    scheduler = make_scheduler(jitter=0)
+
+    intervals = [scheduler.next_interval(False) for _ in range(5)]
+
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 900
+
+
+def test_jitter_stays_within_bounds():
+    scheduler = make_scheduler(jitter=0.1)
+
+    for _ in range(50):
+        interval = scheduler.next_interval(False)
+        assert 60 <= interval <= scheduler.interval * 1.1
+
+
+def test_interval_and_detection_delay_are_recorded():
+    scheduler = make_scheduler(jitter=0)
+
+    scheduler.next_interval(False)
+    scheduler.clock.advance(450)
+    scheduler.next_interval(True)
+
+    histogram = scheduler.metrics_service.histograms[("change_detection_delay_seconds", ())]
+
+    assert histogram.count == 1
+    assert histogram.sum == 450
+    assert scheduler.metrics_service.gauges[("poll_interval_seconds", ())] == 225
+
+
+def test_backoff_doubles_up_to_the_maximum_and_resets():
+    backoff = ExponentialBackoff(base_delay=20, max_delay=100, jitter=0)
+
+    assert [backoff.next_delay() for _ in range(4)] == [20, 40, 80, 100]
+
+    backoff.reset()
+
+    assert backoff.next_delay() == 20
+
+
+def test_backoff_keeps_to_the_minimum_delay():
+    backoff = ExponentialBackoff(base_delay=20, max_delay=100, jitter=0, min_delay=60)
+
+    assert [backoff.next_delay() for _ in range(4)] == [60, 60, 80, 100]
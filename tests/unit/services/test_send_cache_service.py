@@ -0,0 +1,70 @@
+import datetime
+import discord
+
+from services.delivery_service import Attachment
+from services.outbox_service import OutboxService
+from services.send_cache_service import SendCacheService
+from utils.clock import VirtualClock
+
+
+def make_send_cache_service(**kwargs):
+    return SendCacheService(window=600, clock=VirtualClock(datetime.datetime(2020, 3, 1)), **kwargs)
+
+
+def test_embed_timestamps_are_ignored():
+    first = discord.Embed(title="Update", timestamp=datetime.datetime(2020, 3, 1))
+    second = discord.Embed(title="Update", timestamp=datetime.datetime(2020, 3, 2))
+
+    assert SendCacheService.fingerprint(first) == SendCacheService.fingerprint(second)
+    assert SendCacheService.fingerprint(first) != SendCacheService.fingerprint(discord.Embed(title="Other"))
+    assert SendCacheService.fingerprint(Attachment(first, "a.csv", b"1")) != SendCacheService.fingerprint(
+        Attachment(first, "a.csv", b"2")
+    )
+
+
+def test_duplicates_are_per_channel_and_expire():
+    send_cache_service = make_send_cache_service()
+
+    send_cache_service.record(1, "update")
+
+    assert send_cache_service.is_duplicate(1, "update")
+    assert not send_cache_service.is_duplicate(2, "update")
+
+    send_cache_service.clock.advance(600)
+
+    assert not send_cache_service.is_duplicate(1, "update")
+
+
+def test_messages_for_different_cycles_are_not_duplicates():
+    send_cache_service = make_send_cache_service()
+
+    send_cache_service.record(1, "update", "cycle-1")
+
+    assert send_cache_service.is_duplicate(1, "update", "cycle-1")
+    assert not send_cache_service.is_duplicate(1, "update", "cycle-2")
+
+
+def test_cache_is_bounded():
+    send_cache_service = make_send_cache_service(max_entries=2)
+
+    for message in ["first", "second", "third"]:
+        send_cache_service.record(1, message)
+
+    assert not send_cache_service.is_duplicate(1, "first")
+    assert send_cache_service.is_duplicate(1, "third")
+
+
+def test_cache_survives_a_crash(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    send_cache_service = make_send_cache_service(outbox_service=OutboxService(path))
+
+    send_cache_service.record(1, "update", "cycle-1")
+
+    restarted_send_cache_service = make_send_cache_service(outbox_service=OutboxService(path))
+
+    assert restarted_send_cache_service.is_duplicate(1, "update", "cycle-1")
+
+    restarted_send_cache_service.clock.advance(600)
+    restarted_send_cache_service.record(1, "other update", "cycle-2")
+
+    assert len(OutboxService(path).sent_since(0)) == 1
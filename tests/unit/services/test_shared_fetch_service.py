@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+
+from unittest.mock import MagicMock
+
+from gateways.bno_news_gateway import BnoNewsGatewayError
+from services.shared_fetch_service import SharedFetchService
+from utils.clock import VirtualClock
+
+
+@pytest.fixture(scope="function")
+def shared_fetch_service():
+    gateway = MagicMock()
+    gateway.fetch_raw.return_value = "<html></html>"
+
+    yield SharedFetchService(gateway, freshness=30, clock=VirtualClock())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_one_request(shared_fetch_service):
+    results = await asyncio.gather(*[shared_fetch_service.fetch() for _ in range(5)])
+
+    assert results == ["<html></html>"] * 5
+    shared_fetch_service.gateway.fetch_raw.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_payload_is_reused_until_it_goes_stale(shared_fetch_service):
+    await shared_fetch_service.fetch()
+    shared_fetch_service.clock.advance(29)
+    await shared_fetch_service.fetch()
+
+    assert shared_fetch_service.gateway.fetch_raw.call_count == 1
+
+    shared_fetch_service.clock.advance(1)
+    await shared_fetch_service.fetch()
+
+    assert shared_fetch_service.gateway.fetch_raw.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiting_pipeline(shared_fetch_service):
+    shared_fetch_service.gateway.fetch_raw.side_effect = BnoNewsGatewayError("Test")
+
+    results = await asyncio.gather(*[shared_fetch_service.fetch() for _ in range(2)], return_exceptions=True)
+
+    assert all(type(result) == BnoNewsGatewayError for result in results)
+    assert shared_fetch_service.in_flight is None
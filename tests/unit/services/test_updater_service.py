@@ -1,11 +1,17 @@
+import datetime
 import pytest
 import pandas as pd
 
 from texttable import Texttable
 from unittest.mock import MagicMock, patch, call
 
-from gateways.bno_news_gateway import BnoNewsGatewayError
+from gateways.bno_news_gateway import BnoNewsGatewayError, BnoNewsGatewayUnavailableError
+from models.snapshot import Snapshot
+from services.delivery_service import Attachment
+from services.region_service import RegionService
+from services.scheduler_service import FixedScheduler
 from services.updater_service import UpdaterService
+from utils.clock import VirtualClock
 
 
 class AsyncMock(MagicMock):
@@ -32,9 +38,16 @@ def stub_bno_dataframe():
     yield pd.DataFrame(data, columns=columns)
 
 
+def make_gateway():
+    bno_news_gateway = MagicMock()
+    bno_news_gateway.fetch_raw.return_value = "<html></html>"
+
+    return bno_news_gateway
+
+
 @pytest.fixture(scope="function")
 def table_updater_service():
-    bno_news_gateway = MagicMock()
+    bno_news_gateway = make_gateway()
     data_parser_service = MagicMock()
     region = "all"
     update_interval = 1
@@ -49,7 +62,7 @@ def table_updater_service():
 
 @pytest.fixture(scope="function")
 def text_updater_service():
-    bno_news_gateway = MagicMock()
+    bno_news_gateway = make_gateway()
     data_parser_service = MagicMock()
     region = "all"
     update_interval = 1
@@ -641,3 +654,194 @@ async def test_fetching_latest_data_failure_handled(table_updater_service):
         await table_updater_service.update_loop(discord_client)
 
     table_updater_service.logger.critical.assert_called_once_with("Failed to fetch the latest virus data - Test")
+
+
+@pytest.mark.asyncio
+async def test_unavailable_notice_is_only_sent_once(table_updater_service):
+    table_updater_service.delivery_service = MagicMock()
+    table_updater_service.bno_news_gateway.fetch_raw.side_effect = [
+        BnoNewsGatewayError("Test"),
+        BnoNewsGatewayUnavailableError("Open"),
+        BnoNewsGatewayUnavailableError("Open"),
+    ]
+
+    for _ in range(3):
+        assert await table_updater_service._update() is None
+
+    table_updater_service.logger.critical.assert_called_once()
+    assert table_updater_service.delivery_service.enqueue.call_count == len(table_updater_service.discord_channel_ids)
+    assert table_updater_service.source_unavailable
+
+
+def test_digest_update(table_updater_service):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    before = [
+        ["Australia", "2", "1", "0", "0", "0", ""],
+        ["Sweden", "5", "2", "0", "0", "0", ""],
+        ["Italy", "100", "3", "0", "0", "0", ""],
+    ]
+    after = [
+        ["Australia", "3", "1", "0", "0", "0", ""],
+        ["Sweden", "6", "3", "0", "0", "0", ""],
+        ["Italy", "150", "4", "0", "0", "0", ""],
+    ]
+
+    joined_data = pd.concat([pd.DataFrame(before, columns=columns), pd.DataFrame(after, columns=columns)])
+    snapshot = Snapshot.from_dataframe(pd.DataFrame(after, columns=columns))
+
+    messages = table_updater_service._make_digest_update(joined_data, snapshot, datetime.datetime(2020, 3, 1))
+
+    assert len(messages) == 1
+    assert type(messages[0]) == Attachment
+    assert "**+52** case(s) and **+2** death(s)" in messages[0].embed.description
+    assert messages[0].embed.fields[0].value.startswith("**Italy** +50 (now 150)")
+    assert messages[0].data.decode().count("\n") == 4
+
+
+def test_digest_update_by_continent(table_updater_service):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    before = [["Australia", "2", "1", "0", "0", "0", ""], ["Sweden", "5", "2", "0", "0", "0", ""]]
+    after = [["Australia", "3", "1", "0", "0", "0", ""], ["Sweden", "9", "3", "0", "0", "0", ""]]
+
+    joined_data = pd.concat([pd.DataFrame(before, columns=columns), pd.DataFrame(after, columns=columns)])
+    snapshot = Snapshot.from_dataframe(pd.DataFrame(after, columns=columns))
+
+    table_updater_service.region_service = RegionService()
+    table_updater_service.region_service.on_snapshot(snapshot, snapshot.diff(None))
+
+    messages = table_updater_service._make_digest_update(joined_data, snapshot, datetime.datetime(2020, 3, 1))
+
+    assert messages[0].embed.fields[1].name == "**__By continent__**"
+    assert messages[0].embed.fields[1].value == "**Europe** +4 (now 9)\n**Oceania** +1 (now 3)"
+
+
+def test_state_round_trip(table_updater_service, tmp_path):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    data = pd.DataFrame([["Australia", "2,000", "1", "0", "0", "0", ""]], columns=columns)
+
+    table_updater_service.previous_data = data
+    table_updater_service.previous_snapshot = Snapshot.from_dataframe(data)
+    table_updater_service.save_state(str(tmp_path / "state.json"))
+
+    subscriber = MagicMock()
+    restored_updater_service = UpdaterService(
+        MagicMock(), MagicMock(), 1, 1234567, "table", MagicMock(), subscribers=[subscriber]
+    )
+    restored_updater_service.load_state(str(tmp_path / "state.json"))
+
+    pd.testing.assert_frame_equal(data, restored_updater_service.previous_data)
+    assert restored_updater_service.previous_snapshot.row("australia") == (2000, 1, 0, 0, 0)
+    subscriber.on_snapshot.assert_called_once()
+
+
+def test_state_round_trip_keeps_the_hierarchy(table_updater_service, tmp_path):
+    columns = ["Location", "Cases", "Deaths", "Serious", "Critical", "Recovered", "Source"]
+    data = pd.DataFrame(
+        [["United States", "100", "1", "0", "0", "0", ""], ["New York (United States)", "60", "1", "0", "0", "0", ""]],
+        columns=columns,
+    )
+    data.attrs["regions"] = ["INTERNATIONAL", "UNITED STATES"]
+    data.attrs["parents"] = ["", "United States"]
+
+    table_updater_service.previous_data = data
+    table_updater_service.previous_snapshot = Snapshot.from_dataframe(data)
+    table_updater_service.save_state(str(tmp_path / "state.json"))
+
+    restored_updater_service = UpdaterService(MagicMock(), MagicMock(), 1, 1234567, "table", MagicMock())
+    restored_updater_service.load_state(str(tmp_path / "state.json"))
+
+    assert list(restored_updater_service.previous_data.columns) == columns
+    assert restored_updater_service.previous_snapshot.parents == ["", "United States"]
+    assert restored_updater_service.previous_snapshot.total()[0] == 100
+
+
+@pytest.mark.asyncio
+async def test_a_week_of_cycles_on_a_virtual_clock(table_updater_service, stub_bno_dataframe):
+    cycles = 7 * 24 * 12
+
+    discord_client = MagicMock()
+    discord_client.is_closed.side_effect = [False] * cycles + [True]
+
+    table_updater_service.clock = VirtualClock(datetime.datetime(2020, 3, 1))
+    table_updater_service.scheduler = FixedScheduler(300)
+    table_updater_service.data_parser_service.create_dataframe_from_bno_data.return_value = stub_bno_dataframe
+
+    await table_updater_service.update_loop(discord_client)
+
+    assert table_updater_service.clock.now() == datetime.datetime(2020, 3, 8)
+    assert table_updater_service.bno_news_gateway.fetch_raw.call_count == cycles
+
+
+@pytest.mark.asyncio
+async def test_location_filter(stub_bno_dataframe):
+    delivery_service = MagicMock()
+    updater_service = UpdaterService(
+        make_gateway(), MagicMock(), 1, 1234567, "text", delivery_service=delivery_service, location_filter=["SWEDEN"]
+    )
+    before = stub_bno_dataframe.rename(columns={"Notes": "Source"})
+    after = before.copy()
+    after.loc[:, "Cases"] = ["3", "6"]
+    updater_service.data_parser_service.create_dataframe_from_bno_data.side_effect = [before, after]
+
+    await updater_service._update()
+    await updater_service._update()
+
+    messages = [call_args[0][1] for call_args in updater_service.delivery_service.enqueue.call_args_list]
+
+    assert len(messages) == 1
+    assert "Sweden" in messages[0] and "Australia" not in messages[0]
+
+
+@pytest.mark.asyncio
+async def test_location_filter_by_continent(stub_bno_dataframe):
+    region_service = RegionService()
+    updater_service = UpdaterService(
+        make_gateway(),
+        MagicMock(),
+        1,
+        1234567,
+        "text",
+        subscribers=[region_service],
+        delivery_service=MagicMock(),
+        location_filter=["Oceania"],
+        region_service=region_service,
+    )
+    before = stub_bno_dataframe.rename(columns={"Notes": "Source"})
+    after = before.copy()
+    after.loc[:, "Cases"] = ["3", "6"]
+    updater_service.data_parser_service.create_dataframe_from_bno_data.side_effect = [before, after]
+
+    await updater_service._update()
+    await updater_service._update()
+
+    messages = [call_args[0][1] for call_args in updater_service.delivery_service.enqueue.call_args_list]
+
+    assert len(messages) == 1
+    assert "Australia" in messages[0] and "Sweden" not in messages[0]
+
+
+@pytest.mark.asyncio
+async def test_a_dropped_row_is_not_reported_as_new(stub_bno_dataframe):
+    updater_service = UpdaterService(make_gateway(), MagicMock(), 1, 1234567, "text", delivery_service=MagicMock())
+    before = stub_bno_dataframe.rename(columns={"Notes": "Source"})
+    after = before.iloc[1:].copy()
+    after.loc[:, "Cases"] = ["6"]
+    updater_service.data_parser_service.create_dataframe_from_bno_data.side_effect = [before, after]
+
+    await updater_service._update()
+    await updater_service._update()
+
+    messages = [call_args[0][1] for call_args in updater_service.delivery_service.enqueue.call_args_list]
+
+    assert len(messages) == 1
+    assert "Sweden" in messages[0] and "Australia" not in messages[0]
+
+
+@pytest.mark.asyncio
+async def test_quarantined_snapshot_is_not_used(table_updater_service, stub_bno_dataframe):
+    table_updater_service.sanity_service = MagicMock()
+    table_updater_service.sanity_service.admit.return_value = False
+    table_updater_service.data_parser_service.create_dataframe_from_bno_data.return_value = stub_bno_dataframe
+
+    assert await table_updater_service._update() is None
+    assert table_updater_service.previous_snapshot is None
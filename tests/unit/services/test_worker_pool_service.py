@@ -0,0 +1,29 @@
+import datetime
+import pytest
+
+from benchmarks.synthetic import generate_rows, render_sheet
+from services.data_parser_service import DataParserService
+from services.worker_pool_service import WorkerPoolService, parse_payload
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        WorkerPoolService("fibers")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", WorkerPoolService.MODES)
+async def test_payload_is_parsed_in_every_mode(mode):
+    worker_pool_service = WorkerPoolService(mode, max_workers=1)
+    timestamp = datetime.datetime(2020, 3, 1)
+
+    try:
+        data, snapshot = await worker_pool_service.run(
+            parse_payload, DataParserService.create_dataframe_from_bno_data, render_sheet(generate_rows(3)), timestamp
+        )
+    finally:
+        worker_pool_service.shutdown()
+
+    assert len(data) == 4
+    assert snapshot.timestamp == timestamp
+    assert snapshot.regions == ["CHINA"] + ["OTHER PLACES"] * 3
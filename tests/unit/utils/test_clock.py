@@ -0,0 +1,23 @@
+import datetime
+import pytest
+
+from utils.clock import VirtualClock
+
+
+@pytest.mark.asyncio
+async def test_virtual_clock_advances_on_sleep():
+    clock = VirtualClock(datetime.datetime(2020, 3, 1))
+
+    await clock.sleep(3600)
+
+    assert clock.now() == datetime.datetime(2020, 3, 1, 1)
+    assert clock.monotonic() == 3600
+
+
+def test_virtual_clock_never_goes_backwards():
+    clock = VirtualClock(datetime.datetime(2020, 3, 1))
+
+    clock.advance_to(datetime.datetime(2020, 3, 2))
+    clock.advance_to(datetime.datetime(2020, 3, 1, 12))
+
+    assert clock.now() == datetime.datetime(2020, 3, 2)
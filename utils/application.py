@@ -1,7 +1,11 @@
+import json
 import logging
 
 from argparse import ArgumentParser
 
+from gateways.bno_news_gateway import DEFAULT_SHEET_HOST, DEFAULT_SOURCE_URL
+from services.chart_service import ChartService
+
 
 def parse_args():
     parser = ArgumentParser()
@@ -18,9 +22,18 @@ def parse_args():
     parser.add_argument(
         "-c",
         "--channel",
-        required=True,
+        required=False,
+        nargs="+",
+        default=[],
         type=int,
-        help="The channel ID where updates should be made (right click on channel in Discord -> Copy ID)",
+        help="The channel ID(s) where updates should be made (right click on channel in Discord -> Copy ID)",
+    )
+
+    parser.add_argument(
+        "--channels-file",
+        required=False,
+        default=None,
+        help="A file with more channel IDs to send updates to, one per line",
     )
 
     parser.add_argument(
@@ -32,6 +45,59 @@ def parse_args():
         help="Data check, refresh and update frequency (in seconds)",
     )
 
+    parser.add_argument(
+        "--workers",
+        required=False,
+        default="process",
+        choices=["inline", "thread", "process"],
+        help="Where parsing, diffing and rendering run, so large sheets don't block the event loop",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        required=False,
+        type=int,
+        help="The size of the worker pool (default: decided by Python from the number of CPUs)",
+    )
+
+    parser.add_argument(
+        "--parse-cache-size",
+        required=False,
+        default=8,
+        type=int,
+        help="How many parsed payloads are kept, so identical payloads are only parsed once (0 to disable)",
+    )
+
+    parser.add_argument(
+        "--no-sanity-checks",
+        required=False,
+        action="store_true",
+        help="Broadcast every snapshot, even ones that look like partial loads (see config/sanity.py)",
+    )
+
+    parser.add_argument(
+        "--adaptive",
+        required=False,
+        action="store_true",
+        help="Poll more often while the data is changing and back off while it's quiet, starting from --frequency",
+    )
+
+    parser.add_argument(
+        "--min-frequency",
+        required=False,
+        default=60,
+        type=int,
+        help="The shortest interval (in seconds) the adaptive scheduler will poll at",
+    )
+
+    parser.add_argument(
+        "--max-frequency",
+        required=False,
+        default=900,
+        type=int,
+        help="The longest interval (in seconds) the adaptive scheduler will back off to",
+    )
+
     parser.add_argument(
         "-s",
         "--severity",
@@ -46,11 +112,287 @@ def parse_args():
         "--output",
         required=False,
         default="embed",
-        choices=["table", "text", "embed"],
+        choices=["table", "text", "embed", "leaderboard", "chart"],
         help="How the updates should be sent to Discord Channels (in table format, or free text sentences)",
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--charts",
+        required=False,
+        action="store_true",
+        help="Answer !chart <location> with a graph of the location's history (needs matplotlib)",
+    )
+
+    parser.add_argument(
+        "--leaderboard-size",
+        required=False,
+        default=10,
+        type=int,
+        help="How many locations are ranked when using the leaderboard output",
+    )
+
+    parser.add_argument(
+        "--debounce",
+        required=False,
+        default=0,
+        type=int,
+        help="Hold changes for this many seconds before sending, merging or dropping edits that are reverted",
+    )
+
+    parser.add_argument(
+        "--digest-threshold",
+        required=False,
+        default=0,
+        type=int,
+        help="Send a single digest instead of per-location updates when more locations than this change at once",
+    )
+
+    parser.add_argument(
+        "--alerts",
+        required=False,
+        action="store_true",
+        help="Send high priority alerts for the growth and first occurrence rules in config/alerts.py",
+    )
+
+    parser.add_argument(
+        "--history-size",
+        required=False,
+        default=288,
+        type=int,
+        help="How many past snapshots are kept in memory for alerting and history",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        required=False,
+        default=None,
+        type=int,
+        help="Serve Prometheus metrics on http://127.0.0.1:<port>/metrics",
+    )
+
+    parser.add_argument(
+        "--api-port",
+        required=False,
+        type=int,
+        help="Serve the latest data and history as JSON and CSV on this local port",
+    )
+
+    parser.add_argument(
+        "--feed-port",
+        required=False,
+        type=int,
+        help="Stream each cycle's changes as Server-Sent Events on http://127.0.0.1:<port>/feed",
+    )
+
+    parser.add_argument(
+        "--feed-buffer",
+        required=False,
+        default=1000,
+        type=int,
+        help="How many past change events are kept for clients resuming the feed",
+    )
+
+    parser.add_argument(
+        "--profile",
+        required=False,
+        default=0,
+        type=int,
+        help="Profile the first N update cycles (send SIGUSR1 or use !profile to profile later cycles)",
+    )
+
+    parser.add_argument(
+        "--profile-directory",
+        required=False,
+        default="profiles",
+        help="Where profiles are written to (only the most recent 20 are kept)",
+    )
+
+    parser.add_argument(
+        "--outbox-file",
+        required=False,
+        default=None,
+        help="Store queued messages in this SQLite database until they're sent, resending any left over on startup",
+    )
+
+    parser.add_argument(
+        "--max-message-age",
+        required=False,
+        default=3600,
+        type=int,
+        help="Drop queued messages that couldn't be sent within this many seconds instead of sending them late",
+    )
+
+    parser.add_argument(
+        "--send-cache-window",
+        required=False,
+        default=600,
+        type=int,
+        help="Drop re-sends of a message already sent to the same channel for the same update cycle within this "
+        "many seconds (0 to disable)",
+    )
+
+    parser.add_argument(
+        "--state-file",
+        required=False,
+        default=None,
+        help="Where the last seen data is saved on shutdown and loaded from on startup",
+    )
+
+    parser.add_argument(
+        "--memory-sample-every",
+        required=False,
+        default=10,
+        type=int,
+        help="How many update cycles pass between memory usage samples",
+    )
+
+    parser.add_argument(
+        "--memory-soft-limit",
+        required=False,
+        default=None,
+        type=int,
+        help="Memory usage (in MB) above which caches are trimmed and the gateway session is reset",
+    )
+
+    parser.add_argument(
+        "--memory-hard-limit",
+        required=False,
+        default=None,
+        type=int,
+        help="Memory usage (in MB) above which state is saved and the bot exits (with code 3) to be restarted",
+    )
+
+    parser.add_argument(
+        "--source-url",
+        required=False,
+        default=DEFAULT_SOURCE_URL,
+        help="The BNO News page that embeds the data sheet",
+    )
+
+    parser.add_argument(
+        "--sheet-host",
+        required=False,
+        default=DEFAULT_SHEET_HOST,
+        help="The host of the data sheet embedded in the BNO News page",
+    )
+
+    parser.add_argument(
+        "--sheet-concurrency",
+        required=False,
+        default=4,
+        type=int,
+        help="How many of the data sheet's tabs are fetched at the same time",
+    )
+
+    parser.add_argument(
+        "--discord-api-url",
+        required=False,
+        default=None,
+        help="Override the Discord API base URL (used when running against a fake Discord server)",
+    )
+
+    parser.add_argument(
+        "--record",
+        required=False,
+        default=None,
+        help="Append every payload fetched from BNO to this archive",
+    )
+
+    parser.add_argument(
+        "--replay",
+        required=False,
+        default=None,
+        help="Replay the payloads in this archive instead of fetching from BNO, stopping at the end",
+    )
+
+    parser.add_argument(
+        "--replay-speed",
+        required=False,
+        default=1,
+        type=float,
+        help="When replaying, how many times faster than real time to run (0 to run as fast as possible)",
+    )
+
+    parser.add_argument(
+        "--pipelines",
+        required=False,
+        default=None,
+        help="A JSON file describing more pipelines to run alongside the one set up by the other arguments",
+    )
+
+    parser.add_argument(
+        "--fetch-freshness",
+        required=False,
+        default=30,
+        type=int,
+        help="How many seconds a fetched payload is shared between pipelines before it's fetched again",
+    )
+
+    args = parser.parse_args()
+
+    if args.channels_file:
+        with open(args.channels_file) as channels_file:
+            args.channel += [int(line) for line in channels_file if line.strip()]
+
+    if not args.channel:
+        parser.error("at least one channel is required, with -c/--channel or --channels-file")
+
+    args.pipelines = load_pipelines(args.pipelines, parser, args) if args.pipelines else []
+    args.charts = args.charts or "chart" in [args.output] + [pipeline["output"] for pipeline in args.pipelines]
+
+    if args.charts and not ChartService.available():
+        parser.error("--charts and the chart output need matplotlib, install it with pip install matplotlib")
+
+    return args
+
+
+def load_pipelines(path, parser, args):
+    """
+    Reads extra pipelines from a JSON list, e.g.
+    [{"channels": [123], "output": "embed", "frequency": 600, "locations": ["Sweden", "OTHER PLACES"]}]
+
+    Only channels is required. output, frequency, leaderboard_size, digest_threshold and debounce default to the
+    values of their command line arguments, and a pipeline without locations reports every location.
+
+    Params:
+    path (str) -> the file to read
+    parser (ArgumentParser) -> used to report mistakes in the file
+    args (Namespace) -> the parsed command line arguments, used for the defaults
+
+    Returns:
+    list of dict
+    """
+    PIPELINE_DEFAULTS = {
+        "output": args.output,
+        "frequency": args.frequency,
+        "locations": None,
+        "leaderboard_size": args.leaderboard_size,
+        "digest_threshold": args.digest_threshold,
+        "debounce": args.debounce,
+    }
+
+    try:
+        with open(path) as pipelines_file:
+            pipelines = json.load(pipelines_file)
+    except (OSError, ValueError) as e:
+        parser.error(f"couldn't read the pipelines file {path} - {str(e)}")
+
+    if type(pipelines) != list:
+        parser.error("the pipelines file should hold a list of pipelines")
+
+    for index, pipeline in enumerate(pipelines):
+        if not pipeline.get("channels"):
+            parser.error(f"pipeline {index + 1} in {path} needs at least one channel")
+
+        unknown = set(pipeline) - set(PIPELINE_DEFAULTS) - {"channels"}
+
+        if unknown:
+            parser.error(f"pipeline {index + 1} in {path} has unknown settings: {', '.join(sorted(unknown))}")
+
+        if pipeline.get("output", "embed") not in ["table", "text", "embed", "leaderboard", "chart"]:
+            parser.error(f"pipeline {index + 1} in {path} has an unknown output '{pipeline['output']}'")
+
+    return [{**PIPELINE_DEFAULTS, **pipeline} for pipeline in pipelines]
 
 
 def init_logger(severity):
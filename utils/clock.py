@@ -0,0 +1,49 @@
+import asyncio
+import datetime
+import time
+
+
+class Clock:
+    def now(self):
+        return datetime.datetime.utcnow()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    A clock whose time only moves when something sleeps on it (or it's advanced directly), so long stretches of
+    polling can be simulated in moments. With a speed set, sleeps also wait for real, speed times faster.
+    """
+
+    def __init__(self, start=None, speed=None):
+        self.start = start if start else datetime.datetime(2020, 1, 1)
+        self.elapsed = 0.0
+        self.speed = speed
+
+    def now(self):
+        return self.start + datetime.timedelta(seconds=self.elapsed)
+
+    def monotonic(self):
+        return self.elapsed
+
+    def advance(self, seconds):
+        self.elapsed += seconds
+
+    def advance_to(self, timestamp):
+        """
+        Moves the clock forward to a point in time. Points in the past are ignored, as time never goes backwards.
+
+        Params:
+        timestamp (datetime) -> the point in time to move to
+        """
+        self.elapsed = max(self.elapsed, (timestamp - self.start).total_seconds())
+
+    async def sleep(self, seconds):
+        self.advance(seconds)
+
+        await asyncio.sleep(seconds / self.speed if self.speed else 0)